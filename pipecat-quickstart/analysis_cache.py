@@ -0,0 +1,67 @@
+"""Cache of post-interview evaluations, keyed by transcript content.
+
+The bot evaluates each interview once, so this is a plain SQLite table
+with a TTL. The API server's analyzer has its own, larger cache
+(server/app/services/analysis_cache.py); the two never share entries.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+_TIMESTAMP_PREFIX = re.compile(r"^\[[^\]]*\]\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def make_key(transcript: str, prompt_version: str, model: str) -> str:
+    """Timestamps and spacing don't change the key, only what was said"""
+    lines = (_WHITESPACE.sub(" ", _TIMESTAMP_PREFIX.sub("", line)).strip() for line in transcript.splitlines())
+    text = "\n".join(line for line in lines if line)
+    payload = json.dumps({"transcript": text, "prompt_version": prompt_version, "model": model}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(
+        self,
+        path: str = os.getenv("ANALYSIS_CACHE_PATH", "analysis_cache.sqlite3"),
+        ttl: float = float(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600))),
+    ):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM evaluations WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO evaluations (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl),
+            )
+            conn.execute("DELETE FROM evaluations WHERE expires_at <= ?", (now,))
+            conn.commit()
+
+
+# Singleton
+analysis_cache = AnalysisCache()
@@ -19,66 +19,60 @@ Run the bot using::
     uv run bot.py
 """
 
+from __future__ import annotations
+
+from startup import FAST_START, models, timer
+
 import os
 import asyncio
 import aiohttp
 from dotenv import load_dotenv
 from loguru import logger
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 from datetime import datetime
 from fastapi import FastAPI
-from supabase import create_client, Client
 load_dotenv()
 
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
+from websocket_client import ws_client
+from geminiPrompt import InterviewEvaluator
+from transcript_sink import TranscriptSink
+from session import InterviewSession
+from context_loader import context_loader
 
-supabase: Client = None
-if supabase_url and supabase_key:
-    supabase = create_client(supabase_url, supabase_key)
+if TYPE_CHECKING:
+    from pipecat.frames.frames import TranscriptionMessage, TranscriptionUpdateFrame
+    from pipecat.processors.transcript_processor import TranscriptProcessor
+    from pipecat.runner.types import RunnerArguments
+    from pipecat.transports.base_transport import BaseTransport
 
 
 # app = FastAPI()
 # app.include_router(jobskillsroute.router, candidateroute.router)
 
 print("🚀 Starting Pipecat bot...")
-print("⏳ Loading models and imports (20 seconds, first run only)\n")
-
-logger.info("Loading Local Smart Turn Analyzer V3...")
-from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
-
-logger.info("✅ Local Smart Turn Analyzer V3 loaded")
-logger.info("Loading Silero VAD model...")
-from pipecat.audio.vad.silero import SileroVADAnalyzer
-
-logger.info("✅ Silero VAD model loaded")
-
-from pipecat.audio.vad.vad_analyzer import VADParams
-from pipecat.frames.frames import LLMRunFrame
-
-logger.info("Loading pipeline components...")
-from pipecat.pipeline.pipeline import Pipeline
-from pipecat.pipeline.runner import PipelineRunner
-from pipecat.pipeline.task import PipelineParams, PipelineTask
-from pipecat.processors.aggregators.llm_context import LLMContext
-from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
-from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
-from pipecat.runner.types import RunnerArguments
-from pipecat.runner.utils import create_transport
-from pipecat.services.cartesia.tts import CartesiaTTSService
-from pipecat.services.deepgram.stt import DeepgramSTTService
-from pipecat.services.google.llm import GoogleLLMService
-from pipecat.services.tavus.video import TavusVideoService
-from pipecat.transports.base_transport import BaseTransport, TransportParams
-from pipecat.transports.daily.transport import DailyParams
-from pipecat.processors.transcript_processor import TranscriptProcessor
-from pipecat.frames.frames import LLMRunFrame, TranscriptionMessage, TranscriptionUpdateFrame
-from websocket_client import ws_client
-from geminiPrompt import InterviewEvaluator
 
+# Models, pipeline modules, service SDKs and the Supabase client load in
+# background threads; see startup.py
+models.preload()
+if not FAST_START:
+    print("⏳ Loading models and imports (first run only)\n")
+    models.wait()
+
+# Supabase and Gemini clients are created on first use
 evaluator = InterviewEvaluator()
 
-logger.info("✅ All components loaded successfully!")
+# Load interview context as soon as the backend assigns an interview, before the client joins
+ws_client.on("start_interview", lambda data: context_loader.prefetch(data.get("candidate_id")))
+ws_client.on(
+    "context_invalidated",
+    lambda data: context_loader.invalidate(
+        candidate_id=data.get("candidate_id"),
+        job_id=data.get("job_id"),
+        company_id=data.get("company_id"),
+    ),
+)
+
+timer.report("Bot module ready" if FAST_START else "All components loaded")
 
 load_dotenv(override=True)
 
@@ -86,48 +80,50 @@ load_dotenv(override=True)
 class TranscriptHandler:
     """Handles real-time transcript processing and output.
 
-    Maintains a list of conversation messages and outputs them either to a log
-    or to a file as they are received. Each message includes its timestamp and role.
+    Maintains a list of conversation messages and hands each one to a
+    buffered TranscriptSink, which writes to disk off the event loop.
+    Each message includes its timestamp and role.
 
     Attributes:
         messages: List of all processed transcript messages
-        output_file: Optional path to file where transcript is saved. If None, outputs to log only.
+        sink: Optional TranscriptSink the transcript is written to. If None, messages are only kept in memory.
     """
 
-    def __init__(self, output_file: Optional[str] = None):
-        """Initialize handler with optional file output.
+    def __init__(self, sink: Optional[TranscriptSink] = None):
+        """Initialize handler with optional sink.
 
         Args:
-            output_file: Path to output file. If None, outputs to log only.
+            sink: Buffered transcript writer. Can be attached later, once the interview id is known.
         """
         self.messages: List[TranscriptionMessage] = []
-        self.output_file: Optional[str] = output_file
+        self.sink: Optional[TranscriptSink] = sink
         logger.debug(
-            f"TranscriptHandler initialized {'with output_file=' + output_file if output_file else 'with log output only'}"
+            f"TranscriptHandler initialized {'with sink=' + sink.path if sink else 'without sink'}"
         )
 
+    async def attach_sink(self, sink: TranscriptSink):
+        """Start writing to a sink, including any messages received before it was attached."""
+        if self.sink is sink:
+            return
+        await sink.start()
+        self.sink = sink
+        for message in self.messages:
+            await self.save_message(message)
+
     async def save_message(self, message: TranscriptionMessage):
         """Save a single transcript message.
 
-        Outputs the message to the log and optionally to a file.
+        Buffers the message in the sink; the sink flushes to disk in the background.
 
         Args:
             message: The message to save
         """
         timestamp = f"[{message.timestamp}] " if message.timestamp else ""
         line = f"{timestamp}{message.role}: {message.content}"
-        print(line)
+        logger.debug(f"Transcript: {line}")
 
-        # Always log the message
-        logger.info(f"Transcript: {line}")
-
-        # Optionally write to file
-        if self.output_file:
-            try:
-                with open(self.output_file, "a", encoding="utf-8") as f:
-                    f.write(line + "\n")
-            except Exception as e:
-                logger.error(f"Error saving transcript message to file: {e}")
+        if self.sink:
+            self.sink.write(line)
 
     async def on_transcript_update(
         self, processor: TranscriptProcessor, frame: TranscriptionUpdateFrame
@@ -145,43 +141,76 @@ class TranscriptHandler:
             await self.save_message(msg)
 
 async def getdetails(candidateid):
+    # Usually already prefetched when the backend sent start_interview
+    return await context_loader.get(candidateid)
+
+
+# Post-interview work still running after its pipeline ended
+_background_tasks = set()
+
+
+async def finish_interview(interview: InterviewSession):
+    """Upload the transcript and evaluate it without holding up the disconnect handler."""
+    interview_id = interview.interview_id
+    sink = interview.sink
+    transcript_content = None
     try:
-            candidatedetails=supabase.table("Candidate_Info").select("*").eq("id",candidateid).execute()
-            companyid=candidatedetails.data[0]["company_id"]
-            jobid=candidatedetails.data[0]["jobid"]
-            companydetails=supabase.table("Company").select("*").eq("_id",companyid).execute()
-            # jobdetails=supabase.table("Candidate_Info").select("*,Job_Requirements(*)").eq("_id",jobid).execute()
-            # jobdetails2 = supabase.table("Job_Requirements").select("*,Job_Requirements(*)").eq("job_id",jobid).execute()
-            jobdetails=supabase.table("Job").select("*,Job_Requirements(*)").eq("_id",jobid).execute()
-            
-            jobTitle = jobdetails.data[0]["title"]
-            jobRequirements = jobdetails.data[0]["Job_Requirements"]
-            companyName = companydetails.data[0]['name']
-            candidateName = candidatedetails.data[0]['name']
-            skills = ""
-            for i in jobRequirements:
-                skill = i['skill']
-                skills += skill + ", "
+        await sink.close()
+        transcript_content = await sink.read()
+        # Upload transcript
+        supabase = await models.supabase()
+        if supabase is None:
+            raise RuntimeError("Supabase is not configured")
+        await asyncio.to_thread(
+            lambda: supabase.table('Interview_Transcript').insert({
+                'interview_id': interview_id,
+                'transcript_data': transcript_content
+            }).execute()
+        )
+        logger.info(f"✅ Transcript for interview {interview_id} saved")
 
-            return f"Candidate Name - {candidateName}, Job title - {jobTitle}, Job Requirements - {jobRequirements}, Company Name - {companyName}, Required skillset to be interviewed on - {skills}"
+    except Exception as e:
+        logger.error(f"Failed to complete interview: {e}")
 
-            
+    try:
+        await interview.evaluator.run_async(
+            transcript_path=sink.path,
+            interviewID=interview_id,
+            transcript=transcript_content,
+        )
+        logger.info(f"Interview {interview_id} evaluated")
     except Exception as e:
-        logger.error(f"Error fetching job skills: {e}")
-        return ""
+        logger.error(f"❌ Error while evaluating interview: {e}")
 
 
 async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
     logger.info(f"Starting bot")
-    
-    # Connect to backend WebSocket
-    connected = await ws_client.connect()
+
+    # All per-interview state lives on the session, not in module globals
+    interview = InterviewSession.from_runner_args(runner_args, evaluator=evaluator)
+    context_loader.prefetch(interview.candidate_id)
+
+    # Connect to backend WebSocket (one connection shared by every session)
+    connected = await ws_client.ensure_connected()
     if connected:
-        asyncio.create_task(ws_client.listen())
         logger.info("Connected to backend WebSocket")
     else:
         logger.warning("WebSocket connection failed. Using fallback values.")
     
+    # Already imported by the model loader before the transport was created
+    from pipecat.frames.frames import LLMRunFrame, TranscriptionMessage
+    from pipecat.pipeline.pipeline import Pipeline
+    from pipecat.pipeline.runner import PipelineRunner
+    from pipecat.pipeline.task import PipelineParams, PipelineTask
+    from pipecat.processors.aggregators.llm_context import LLMContext
+    from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair
+    from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
+    from pipecat.processors.transcript_processor import TranscriptProcessor
+    from pipecat.services.cartesia.tts import CartesiaTTSService
+    from pipecat.services.deepgram.stt import DeepgramSTTService
+    from pipecat.services.google.llm import GoogleLLMService
+    from pipecat.services.tavus.video import TavusVideoService
+
     async with aiohttp.ClientSession() as session:
         stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
 
@@ -228,7 +257,7 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         context_aggregator = LLMContextAggregatorPair(context)
 
         transcript = TranscriptProcessor()
-        transcript_handler = TranscriptHandler(output_file="trialTranscript.txt")
+        transcript_handler = TranscriptHandler()
 
         rtvi = RTVIProcessor(config=RTVIConfig(config=[]))
 
@@ -263,24 +292,19 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         async def on_client_connected(transport, client):
             logger.info(f"Client connected")
 
-            global interview_id,candidate_id
-            interview_id = await ws_client.get_interview_id() or 39
-            candidate_id = await ws_client.get_candidate_id() or 2
-
-            logger.info(f"Using interview_id: {interview_id}, candidate_id: {candidate_id}")
-            
-            await ws_client.client_connected(interview_id)
+            await interview.resolve(ws_client)
+            context_loader.prefetch(interview.candidate_id)
+            await interview.channel.client_connected()
             
-            # Clear transcript file for new interview
+            # Per-interview transcript file (continued on reconnect), written in the background
             try:
-                with open('trialTranscript.txt', 'w', encoding='utf-8') as f:
-                    f.write('')
+                await transcript_handler.attach_sink(interview.sink)
             except Exception as e:
-                logger.error(f"Failed to clear transcript file: {e}")
+                logger.error(f"Failed to create transcript file: {e}")
 
             # Fetch job skills
-            logger.info(f"Fetching details for candidate_id: {candidate_id}")
-            relevantContext = await getdetails(candidateid=candidate_id)
+            logger.info(f"Fetching details for candidate_id: {interview.candidate_id}")
+            relevantContext = await getdetails(candidateid=interview.candidate_id)
 
             # Set system prompt with job skills
             system_prompt = f"""
@@ -302,34 +326,21 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
         async def on_client_disconnected(transport, client):
             logger.info(f"Client disconnected")
             logger.info(f"Interview transcript: {messages}")
-            interview_id = await ws_client.get_interview_id() or 39
-            
-            # Upload transcript and end interview
-            try:
-                with open('trialTranscript.txt', 'r', encoding='utf-8') as f:
-                    transcript_content = f.read()
-                # Upload transcript
-                supabase.table('Interview_Transcript').insert({
-                    'interview_id': interview_id,
-                    'transcript_data': transcript_content
-                }).execute()
-                logger.info("✅ Interview evaluation saved:", result)
+            if interview.channel is None:
+                await interview.resolve(ws_client)
+            interview_id = interview.interview_id
 
-            except Exception as e:
-                logger.error(f"Failed to complete interview: {e}") 
+            sink = interview.sink
+            if transcript_handler.sink is None:
+                await transcript_handler.attach_sink(sink)
 
-            try:
-                result = evaluator.run(
-                transcript_path="trialTranscript.txt",
-                interviewID=interview_id  # or DB id
-                )
-
-                logger.info(f"Interview {interview_id} completed and transcript uploaded")
-            except Exception as e:
-                logger.error(f"❌ Error while evaluating interview: {e}")
+            # Upload and evaluation run in the background so the loop keeps serving other interviews
+            finish = asyncio.create_task(finish_interview(interview))
+            _background_tasks.add(finish)
+            finish.add_done_callback(_background_tasks.discard)
 
              # Notify backend about disconnection
-            await ws_client.client_disconnected(interview_id)
+            await interview.channel.client_disconnected()
             
             await task.cancel()
 
@@ -341,6 +352,20 @@ async def run_bot(transport: BaseTransport, runner_args: RunnerArguments):
 async def bot(runner_args: RunnerArguments):
     """Main bot entry point for the bot starter."""
 
+    await models.pipeline()
+    from pipecat.audio.vad.vad_analyzer import VADParams
+    from pipecat.runner.utils import create_transport
+    from pipecat.transports.base_transport import TransportParams
+
+    # Build this session's analyzers while the backend connection comes up
+    vad_analyzer, turn_analyzer = (
+        await asyncio.gather(
+            models.analyzers(VADParams(stop_secs=0.2)),
+            ws_client.ensure_connected(),
+        )
+    )[0]
+    from pipecat.transports.daily.transport import DailyParams
+
     transport_params = {
         "daily": lambda: DailyParams(
             audio_in_enabled=True,
@@ -349,8 +374,8 @@ async def bot(runner_args: RunnerArguments):
             video_out_is_live=True,
             video_out_width=1280,
             video_out_height=720,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            turn_analyzer=LocalSmartTurnAnalyzerV3(),
+            vad_analyzer=vad_analyzer,
+            turn_analyzer=turn_analyzer,
         ),
         "webrtc": lambda: TransportParams(
             audio_in_enabled=True,
@@ -359,12 +384,13 @@ async def bot(runner_args: RunnerArguments):
             video_out_is_live=True,
             video_out_width=1280,
             video_out_height=720,
-            vad_analyzer=SileroVADAnalyzer(params=VADParams(stop_secs=0.2)),
-            turn_analyzer=LocalSmartTurnAnalyzerV3(),
+            vad_analyzer=vad_analyzer,
+            turn_analyzer=turn_analyzer,
         ),
     }
 
     transport = await create_transport(runner_args, transport_params)
+    timer.report_once("First session ready")
 
     await run_bot(transport, runner_args)
 
@@ -0,0 +1,142 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+CONTEXT_CACHE_TTL = float(os.getenv("CONTEXT_CACHE_TTL", "300"))
+
+# Candidate with its company, job and job requirements in one PostgREST request
+EMBEDDED_SELECT = "*, company:Company(*), job:Job(*, Job_Requirements(*))"
+
+
+def format_context(candidate: dict, company: dict, job: dict) -> str:
+    """Render the interviewer context the system prompt expects."""
+    requirements = job.get("Job_Requirements") or []
+    skills = "".join(f"{r['skill']}, " for r in requirements)
+    return (
+        f"Candidate Name - {candidate.get('name')}, Job title - {job.get('title')}, "
+        f"Job Requirements - {requirements}, Company Name - {company.get('name')}, "
+        f"Required skillset to be interviewed on - {skills}"
+    )
+
+
+class InterviewContextLoader:
+    """Loads and caches the candidate/company/job context for interviews.
+
+    Everything comes back in a single embedded-resource query through the
+    async Supabase client; if the schema has no foreign keys to embed
+    through, the company and job are fetched concurrently instead. Results
+    are cached for CONTEXT_CACHE_TTL seconds, concurrent loads of the same
+    candidate share one request, and `prefetch()` lets the load start as
+    soon as the backend announces an interview.
+
+    Attributes:
+        ttl: Seconds a loaded context stays valid.
+    """
+
+    def __init__(self, ttl: float = CONTEXT_CACHE_TTL):
+        self.ttl = ttl
+        self._client = None
+        self._client_lock = asyncio.Lock()
+        self._embedded = True
+        # candidate_id -> (expires_at, context, job_id, company_id)
+        self._cache: Dict[int, Tuple[float, str, Optional[int], Optional[int]]] = {}
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # Bumped by invalidate() so loads that started before it aren't cached
+        self._generation = 0
+
+    async def _db(self):
+        async with self._client_lock:
+            if self._client is None:
+                from supabase import acreate_client
+
+                self._client = await acreate_client(
+                    os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+                )
+            return self._client
+
+    async def _fetch(self, candidate_id: int) -> Tuple[str, Optional[int], Optional[int]]:
+        db = await self._db()
+        if self._embedded:
+            try:
+                result = await db.table("Candidate_Info").select(EMBEDDED_SELECT).eq(
+                    "id", candidate_id
+                ).execute()
+                candidate = result.data[0]
+                company = candidate.pop("company", None) or {}
+                job = candidate.pop("job", None) or {}
+                return format_context(candidate, company, job), candidate.get("jobid"), candidate.get("company_id")
+            except IndexError:
+                # Candidate doesn't exist; the fallback wouldn't find it either
+                raise
+            except Exception as e:
+                logger.warning(f"Embedded context query failed ({e}), falling back to parallel queries")
+                self._embedded = False
+
+        result = await db.table("Candidate_Info").select("*").eq("id", candidate_id).execute()
+        candidate = result.data[0]
+        company_id, job_id = candidate["company_id"], candidate["jobid"]
+        company_result, job_result = await asyncio.gather(
+            db.table("Company").select("*").eq("_id", company_id).execute(),
+            db.table("Job").select("*,Job_Requirements(*)").eq("_id", job_id).execute(),
+        )
+        return format_context(candidate, company_result.data[0], job_result.data[0]), job_id, company_id
+
+    async def _load(self, candidate_id: int) -> str:
+        start = time.perf_counter()
+        generation = self._generation
+        try:
+            context, job_id, company_id = await self._fetch(candidate_id)
+        finally:
+            self._inflight.pop(candidate_id, None)
+        if generation == self._generation:
+            self._cache[candidate_id] = (time.time() + self.ttl, context, job_id, company_id)
+        logger.info(f"Loaded context for candidate {candidate_id} in {time.perf_counter() - start:.2f}s")
+        return context
+
+    def prefetch(self, candidate_id: Optional[int]):
+        """Start loading in the background; get() will pick up the result."""
+        if candidate_id is None or self._cached(candidate_id) is not None:
+            return
+        if candidate_id not in self._inflight:
+            task = asyncio.create_task(self._load(candidate_id))
+            # Errors surface through get(); don't log them twice as unretrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[candidate_id] = task
+
+    def _cached(self, candidate_id: int) -> Optional[str]:
+        entry = self._cache.get(candidate_id)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._cache[candidate_id]
+            return None
+        return entry[1]
+
+    async def get(self, candidate_id: int) -> str:
+        """Context string for the candidate, or "" if it can't be loaded."""
+        cached = self._cached(candidate_id)
+        if cached is not None:
+            return cached
+        self.prefetch(candidate_id)
+        try:
+            return await asyncio.shield(self._inflight[candidate_id])
+        except Exception as e:
+            logger.error(f"Error fetching job skills: {e}")
+            return ""
+
+    def invalidate(self, candidate_id=None, job_id=None, company_id=None):
+        """Drop cached contexts that mention any of the given ids."""
+        self._generation += 1
+        for key, (_, _, cached_job, cached_company) in list(self._cache.items()):
+            if (
+                (candidate_id is not None and key == candidate_id)
+                or (job_id is not None and cached_job == job_id)
+                or (company_id is not None and cached_company == company_id)
+            ):
+                del self._cache[key]
+
+
+context_loader = InterviewContextLoader()
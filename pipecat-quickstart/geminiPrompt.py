@@ -1,9 +1,15 @@
 import os
 import json
 import time
-import google.generativeai as genai
+import asyncio
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from analysis_cache import analysis_cache, make_key
+
+# Bump whenever the evaluation prompt or schema changes
+PROMPT_VERSION = "1"
+
+MAX_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
 
 
 class InterviewEvaluator:
@@ -15,13 +21,12 @@ class InterviewEvaluator:
         # --------------------------
         self.SUPABASE_URL = os.getenv("SUPABASE_URL")
         self.SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-        self.supabase: Client = create_client(self.SUPABASE_URL, self.SUPABASE_KEY)
+        self._supabase = None
 
         # --------------------------
         # GOOGLE GEMINI CONFIG
         # --------------------------
         self.GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-        genai.configure(api_key=self.GOOGLE_API_KEY)
 
         self.schema = {
             "type": "object",
@@ -57,13 +62,31 @@ class InterviewEvaluator:
             ]
         }
 
-        self.model = genai.GenerativeModel(
-            "gemini-2.5-flash",
-            generation_config={
-                "response_mime_type": "application/json",
-                "response_schema": self.schema
-            }
-        )
+        self.model_name = "gemini-2.5-flash"
+        self.cache = analysis_cache
+        self._model = None
+
+    # Clients are built on first use so importing the bot stays fast
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            from supabase import create_client
+            self._supabase = create_client(self.SUPABASE_URL, self.SUPABASE_KEY)
+        return self._supabase
+
+    @property
+    def model(self):
+        if self._model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.GOOGLE_API_KEY)
+            self._model = genai.GenerativeModel(
+                self.model_name,
+                generation_config={
+                    "response_mime_type": "application/json",
+                    "response_schema": self.schema
+                }
+            )
+        return self._model
 
     # ------------------------------------------
     # 1️⃣ Load transcript text
@@ -75,35 +98,82 @@ class InterviewEvaluator:
     # ------------------------------------------
     # 2️⃣ Get JSON result from Gemini
     # ------------------------------------------
-    def evaluate(self, transcript: str) -> dict:
-        prompt = (
+    def _build_prompt(self, transcript: str) -> str:
+        return (
             f"You are an interview evaluator. Evaluate candidate based on transcript.\n\n"
             f"Context:\n{transcript}\n\n"
             f"Return a JSON object with numeric scores (0–100), recommendation, strengths, "
             f"improvement areas, and evidence quotes."
         )
 
-        MAX_RETRIES = 3
+    def _parse_response(self, response) -> dict:
+        """Return the parsed JSON, or None if Gemini sent nothing usable"""
+        try:
+            text = (response.text or "").strip()
+        except ValueError:
+            # Blocked / empty candidates raise instead of returning ""
+            return None
+        if not text:
+            return None
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            cleaned = text.replace("```json", "").replace("```", "").strip()
+            try:
+                return json.loads(cleaned)
+            except json.JSONDecodeError:
+                return None
+
+    def evaluate(self, transcript: str) -> dict:
+        cache_key = make_key(transcript, PROMPT_VERSION, self.model_name)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print("\n⚡ Using cached evaluation")
+            return cached
+
+        prompt = self._build_prompt(transcript)
         for attempt in range(1, MAX_RETRIES + 1):
             print(f"\n🔄 Attempt {attempt}/{MAX_RETRIES} ...")
-            response = self.model.generate_content(prompt)
+            data = self._parse_response(self.model.generate_content(prompt))
+            if data is not None:
+                self.cache.set(cache_key, data)
+                return data
+
+            time.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+        raise Exception("❌ Gemini failed to return valid JSON after retries.")
 
-            if response.text and response.text.strip():
-                try:
-                    return json.loads(response.text.strip())
-                except json.JSONDecodeError:
-                    cleaned = response.text.replace("```json", "").replace("```", "").strip()
-                    return json.loads(cleaned)
+    async def evaluate_async(self, transcript: str) -> dict:
+        """Same as evaluate() without blocking the event loop: the Gemini call is
+        awaited, cache I/O runs in a thread and retries back off with asyncio.sleep."""
+        cache_key = make_key(transcript, PROMPT_VERSION, self.model_name)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            print("\n⚡ Using cached evaluation")
+            return cached
 
-            time.sleep(1)
+        prompt = self._build_prompt(transcript)
+        for attempt in range(1, MAX_RETRIES + 1):
+            print(f"\n🔄 Attempt {attempt}/{MAX_RETRIES} ...")
+            try:
+                data = self._parse_response(await self.model.generate_content_async(prompt))
+            except Exception as e:
+                print(f"Gemini request failed: {e}")
+                data = None
+            if data is not None:
+                await asyncio.to_thread(self.cache.set, cache_key, data)
+                return data
+
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(RETRY_BASE_DELAY * 2 ** (attempt - 1))
 
         raise Exception("❌ Gemini failed to return valid JSON after retries.")
 
     # ------------------------------------------
     # 3️⃣ Insert into Supabase
     # ------------------------------------------
-    def save_to_supabase(self, data: dict, transcript: str, interviewID: int):
-        row = {
+    def _report_row(self, data: dict, transcript: str, interviewID: int) -> dict:
+        return {
             "interview_id": interviewID,
             "overallscore": data.get("Overall Score"),
             "communication": data.get("Communication"),
@@ -118,9 +188,15 @@ class InterviewEvaluator:
             "transcripturl": transcript  # TODO → replace with actual storage URL
         }
 
+    def save_to_supabase(self, data: dict, transcript: str, interviewID: int):
+        row = self._report_row(data, transcript, interviewID)
         result = self.supabase.table("Report").insert(row).execute()
         return result
 
+    async def save_to_supabase_async(self, data: dict, transcript: str, interviewID: int):
+        # supabase-py's sync client blocks on HTTP, so run it in a worker thread
+        return await asyncio.to_thread(self.save_to_supabase, data, transcript, interviewID)
+
     # ------------------------------------------
     # 4️⃣ Full pipeline runner
     # ------------------------------------------
@@ -140,6 +216,20 @@ class InterviewEvaluator:
         print(result)
         return result
 
+    async def run_async(self, transcript_path: str, interviewID: int = 0, transcript: str = None):
+        """Async pipeline runner for use inside the bot's event loop.
+
+        Pass `transcript` when it's already in memory to skip re-reading the file.
+        """
+        if transcript is None:
+            transcript = await asyncio.to_thread(self.load_transcript, transcript_path)
+
+        print(f"\n📌 Generating evaluation for interview {interviewID}...")
+        data = await self.evaluate_async(transcript)
+
+        print(f"\n📩 Inserting report for interview {interviewID}...")
+        return await self.save_to_supabase_async(data, transcript, interviewID)
+
 
 # -------------------------------
 # ✅ Example usage
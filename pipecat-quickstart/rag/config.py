@@ -6,3 +6,21 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# Embeddings: "gemini", or "fake" for the deterministic offline model
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "gemini")
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_REQUESTS_PER_MINUTE = float(os.getenv("EMBED_REQUESTS_PER_MINUTE", "600"))
+EMBED_MAX_RETRIES = int(os.getenv("EMBED_MAX_RETRIES", "5"))
+
+# Query-side caches in the RAG API
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+QUERY_RESULTS_CACHE_SIZE = int(os.getenv("QUERY_RESULTS_CACHE_SIZE", "1024"))
+QUERY_RESULTS_CACHE_TTL = float(os.getenv("QUERY_RESULTS_CACHE_TTL", "300"))
+
+# Vector store: "supabase" (match_ai_contexts RPC) or "local" (in-process NumPy index)
+VECTOR_STORE = os.getenv("VECTOR_STORE", "supabase")
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", "vector_index")
+IVF_LISTS = int(os.getenv("IVF_LISTS", "0"))  # 0 = exhaustive search
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
@@ -1,8 +1,161 @@
+import hashlib
+import math
+import random
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import google.generativeai as genai
-from config import GOOGLE_API_KEY
+from google.api_core import exceptions as google_exceptions
+from config import (
+    GOOGLE_API_KEY,
+    EMBEDDING_BACKEND,
+    EMBED_CONCURRENCY,
+    EMBED_REQUESTS_PER_MINUTE,
+    EMBED_MAX_RETRIES,
+)
 
 genai.configure(api_key=GOOGLE_API_KEY)
 
+EMBEDDING_MODEL = "models/text-embedding-004"  # Gemini embedding model
+# Most texts the embedding API accepts in one request
+MAX_BATCH_SIZE = 100
+
+# Worth retrying: rate limits, overload and timeouts
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    ConnectionError,
+    TimeoutError,
+)
+
+
+class GeminiEmbeddingModel:
+    """Gemini text-embedding-004, one API request per batch."""
+
+    name = EMBEDDING_MODEL
+
+    def embed_batch(self, texts: list) -> list:
+        result = genai.embed_content(model=EMBEDDING_MODEL, content=texts)
+        return result["embedding"]
+
+
+class FakeEmbeddingModel:
+    """Deterministic, offline stand-in for the embedding API.
+
+    The same text always maps to the same unit vector (seeded from its
+    sha256), so results are reproducible without network access. `latency`
+    simulates the per-request round trip for throughput benchmarks.
+    """
+
+    name = "fake"
+
+    def __init__(self, dim: int = 768, latency: float = 0.0):
+        self.dim = dim
+        self.latency = latency
+        self.requests = 0
+
+    def _vector(self, text: str) -> list:
+        values = []
+        counter = 0
+        while len(values) < self.dim:
+            digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+            # 8 unsigned 32-bit ints per digest, mapped to [-1, 1)
+            values.extend(v / 2**31 - 1.0 for v in struct.unpack("<8I", digest))
+            counter += 1
+        values = values[:self.dim]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def embed_batch(self, texts: list) -> list:
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+
+class RateLimiter:
+    """Spaces requests out to at most `per_minute`, shared across threads."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+model = FakeEmbeddingModel() if EMBEDDING_BACKEND == "fake" else GeminiEmbeddingModel()
+_rate_limiter = RateLimiter(EMBED_REQUESTS_PER_MINUTE)
+_executor = ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY, thread_name_prefix="embed")
+
+
+def _embed_with_retry(embedding_model, batch: list, max_retries: int = EMBED_MAX_RETRIES) -> list:
+    for attempt in range(max_retries + 1):
+        _rate_limiter.acquire()
+        try:
+            embeddings = embedding_model.embed_batch(batch)
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, got {len(embeddings)}")
+            return embeddings
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            delay = min(30.0, 2 ** attempt) * (0.5 + random.random() / 2)
+            print(f"Embedding batch failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def get_embeddings(texts: list, batch_size: int = MAX_BATCH_SIZE, embedding_model=None) -> list:
+    """Embed many texts, preserving order.
+
+    Texts are split into batches of at most `batch_size` (the provider's
+    limit), which run concurrently on EMBED_CONCURRENCY threads under a
+    shared rate limit, each retried with exponential backoff on transient errors.
+    """
+    if not texts:
+        return []
+    embedding_model = embedding_model or model
+    batches = [texts[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    if len(batches) == 1:
+        return _embed_with_retry(embedding_model, batches[0])
+    embeddings = []
+    # map() yields results in submission order regardless of completion order
+    for batch_embeddings in _executor.map(lambda b: _embed_with_retry(embedding_model, b), batches):
+        embeddings.extend(batch_embeddings)
+    return embeddings
+
+
 def get_embedding(text: str):
-    result = genai.embed_content(model="models/text-embedding-004", content=text)  # Gemini embedding model
-    return result["embedding"]
\ No newline at end of file
+    return get_embeddings([text])[0]
+
+
+if __name__ == "__main__":
+    # Local throughput benchmark against the offline model:
+    #   python generate_embeddings.py [texts] [latency_seconds]
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.2
+    fake = FakeEmbeddingModel(latency=latency)
+    texts = [f"benchmark text {i}" for i in range(count)]
+    start = time.perf_counter()
+    result = get_embeddings(texts, embedding_model=fake)
+    elapsed = time.perf_counter() - start
+    assert result == [fake._vector(t) for t in texts]
+    print(
+        f"{count} texts in {fake.requests} requests, {elapsed:.2f}s "
+        f"({count / elapsed:.0f} texts/s, concurrency {EMBED_CONCURRENCY})"
+    )
@@ -1,7 +1,9 @@
-from fastapi import FastAPI, Query
+import asyncio
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from query_embeddings import get_relevant_context
-from sync_to_vectordb import sync_rag_table
+from query_embeddings import get_relevant_context_async, get_relevant_contexts_async, retrieve, cache_stats
 
 app = FastAPI(title="TalentLoop RAG Backend")
 
@@ -19,18 +21,82 @@ async def get_context(query: str = Query(...), limit: int = 5):
     """
     Retrieve relevant context for a user query from vector DB.
     """
-    results = get_relevant_context(query, limit)
+    results = await get_relevant_context_async(query, limit)
     return {"results": results}
 
 
+class ContextQuery(BaseModel):
+    query: str
+    limit: int = 5
+
+
+class ContextBatchRequest(BaseModel):
+    queries: List[ContextQuery] = Field(..., max_length=50)
+
+
+@app.post("/get_context_batch")
+async def get_context_batch(request: ContextBatchRequest):
+    """
+    Retrieve context for several queries in one round trip.
+    Results come back in the same order as the queries.
+    """
+    results = await get_relevant_contexts_async([(q.query, q.limit) for q in request.queries])
+    return {"results": results}
+
+
+class RetrieveRequest(BaseModel):
+    source: Optional[str] = None
+    source_ids: Optional[List[int]] = Field(None, max_length=500)
+    query: Optional[str] = None
+    limit: int = 5
+
+
+class RetrieveBatchRequest(BaseModel):
+    requests: List[RetrieveRequest] = Field(..., max_length=50)
+
+
+async def _retrieve(request: RetrieveRequest):
+    try:
+        return await retrieve(request.source, request.source_ids, request.query, request.limit)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.post("/retrieve")
+async def retrieve_context(request: RetrieveRequest):
+    """
+    Filtered retrieval. With source + source_ids and no query, rows are fetched
+    directly by key; with a query they are ranked by similarity within the filter.
+    """
+    return {"results": await _retrieve(request)}
+
+
+@app.post("/retrieve_batch")
+async def retrieve_context_batch(request: RetrieveBatchRequest):
+    """
+    Several /retrieve requests in one round trip, results in request order.
+    """
+    return {"results": await asyncio.gather(*(_retrieve(r) for r in request.requests))}
+
+
+@app.get("/cache_stats")
+async def get_cache_stats():
+    """Hit rates of the query-embedding and results caches."""
+    return cache_stats()
+
+
 
 @app.post("/sync_rag")
-async def sync_rag():
+async def sync_rag(full: bool = False):
     """
-    Fetches data from normal tables and inserts embeddings into ai_context.
-    Useful for manual refresh or background cron jobs.
+    Embeds new and changed rows from normal tables into ai_context.
+    Useful for manual refresh or background cron jobs; pass full=true to
+    rescan every row (unchanged rows are still skipped).
     """
-    result = sync_rag_table()
+    # Imported here so the query API can start without Supabase (VECTOR_STORE=local)
+    from sync_to_vectordb import sync_rag_table
+
+    result = await asyncio.to_thread(sync_rag_table, full)
     return {"message": "RAG database synced successfully", "details": result}
 
 if __name__ == "__main__":
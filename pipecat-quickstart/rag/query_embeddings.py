@@ -1,10 +1,138 @@
-from supabase_client import supabase
-from generate_embeddings import get_embedding
+import asyncio
+import hashlib
+import re
+import struct
+from generate_embeddings import get_embedding, get_embeddings, model
+from vector_store import get_store
+from cache import TTLCache
+from config import (
+    QUERY_EMBEDDING_CACHE_SIZE,
+    QUERY_EMBEDDING_CACHE_TTL,
+    QUERY_RESULTS_CACHE_SIZE,
+    QUERY_RESULTS_CACHE_TTL,
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# (model, normalized query) -> embedding
+embedding_cache = TTLCache(QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL)
+# (embedding hash, limit, index version, filters) -> matches
+results_cache = TTLCache(QUERY_RESULTS_CACHE_SIZE, QUERY_RESULTS_CACHE_TTL)
+
+# Index version is the store's write counter, so results cached before an
+# in-process sync are never reused. Syncs run elsewhere (cron) are covered
+# by QUERY_RESULTS_CACHE_TTL.
+store = get_store()
+
+# Lookups in progress, so concurrent identical queries share one embed + RPC
+_inflight = {}
+
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip().casefold()
+
+
+def _embedding_key(embedding) -> str:
+    return hashlib.sha256(struct.pack(f"{len(embedding)}f", *embedding)).hexdigest()
+
+
+def _query_embedding(normalized: str):
+    key = (model.name, normalized)
+    embedding = embedding_cache.get(key)
+    if embedding is None:
+        embedding = get_embedding(normalized)
+        embedding_cache.set(key, embedding)
+    return embedding
+
 
 def get_relevant_context(query: str, limit: int = 5):
-    query_emb = get_embedding(query)
-    response = supabase.rpc(
-        "match_ai_contexts",
-        {"query_embedding": query_emb, "match_limit": limit}
-    ).execute()
-    return response.data
+    query_emb = _query_embedding(normalize_query(query))
+    results_key = (_embedding_key(query_emb), limit, store.version, _filters_key(None, None))
+    results = results_cache.get(results_key)
+    if results is None:
+        results = store.search(query_emb, limit)
+        results_cache.set(results_key, results)
+    return results
+
+
+def _filters_key(source, source_ids):
+    return (source, tuple(source_ids) if source_ids is not None else None)
+
+
+async def _lookup(normalized: str, limit: int, source=None, source_ids=None):
+    # Already counted by the fast path in get_relevant_context_async
+    key = (model.name, normalized)
+    query_emb = embedding_cache.get(key, count=False)
+    if query_emb is None:
+        # The embedding SDK is synchronous; keep it off the event loop
+        query_emb = await asyncio.to_thread(get_embedding, normalized)
+        embedding_cache.set(key, query_emb)
+
+    results_key = (_embedding_key(query_emb), limit, store.version, _filters_key(source, source_ids))
+    results = results_cache.get(results_key, count=False)
+    if results is None:
+        results = await store.asearch(query_emb, limit, source, source_ids)
+        results_cache.set(results_key, results)
+    return results
+
+
+async def get_relevant_context_async(query: str, limit: int = 5, source: str = None, source_ids: list = None):
+    """Cached, non-blocking version of get_relevant_context, optionally
+    restricted to one source and/or specific source_ids."""
+    normalized = normalize_query(query)
+    filters = _filters_key(source, source_ids)
+    # Fast path: both caches warm, no task or thread hop needed
+    query_emb = embedding_cache.get((model.name, normalized))
+    if query_emb is not None:
+        results = results_cache.get((_embedding_key(query_emb), limit, store.version, filters))
+        if results is not None:
+            return results
+
+    key = (normalized, limit, filters)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_lookup(normalized, limit, source, source_ids))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def get_relevant_contexts_async(queries: list) -> list:
+    """Results for several (query, limit) pairs, in order.
+
+    Uncached queries are embedded together in one batched request, then
+    all searches run concurrently.
+    """
+    normalized = [(normalize_query(query), limit) for query, limit in queries]
+    missing = list(dict.fromkeys(
+        text for text, _ in normalized if embedding_cache.get((model.name, text), count=False) is None
+    ))
+    if missing:
+        embeddings = await asyncio.to_thread(get_embeddings, missing)
+        for text, embedding in zip(missing, embeddings):
+            embedding_cache.set((model.name, text), embedding)
+    return await asyncio.gather(
+        *(get_relevant_context_async(text, limit) for text, limit in normalized)
+    )
+
+
+async def retrieve(source: str = None, source_ids: list = None, query: str = None, limit: int = 5):
+    """Metadata-filtered retrieval.
+
+    Without a query this is an exact (source, source_id) lookup: no
+    embedding, no similarity scan. With a query, matching rows are ranked
+    by similarity.
+    """
+    if query:
+        return await get_relevant_context_async(query, limit, source, source_ids)
+    if source is None or source_ids is None:
+        raise ValueError("Exact lookups need both source and source_ids")
+    return (await store.aget(source, source_ids))[:limit]
+
+
+def cache_stats() -> dict:
+    return {
+        "query_embeddings": embedding_cache.stats(),
+        "results": results_cache.stats(),
+        "index_version": store.version,
+    }
@@ -1,4 +1,16 @@
-from supabase import create_client
+import asyncio
+from supabase import create_client, acreate_client
 from config import SUPABASE_URL, SUPABASE_KEY
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+_async_supabase = None
+_async_lock = asyncio.Lock()
+
+async def get_async_supabase():
+    """Shared async client for request handlers, created on first use."""
+    global _async_supabase
+    async with _async_lock:
+        if _async_supabase is None:
+            _async_supabase = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+    return _async_supabase
\ No newline at end of file
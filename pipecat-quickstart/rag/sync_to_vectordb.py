@@ -1,64 +1,257 @@
+import hashlib
+import sys
+from datetime import datetime, timezone
 from supabase import create_client
-from generate_embeddings import get_embedding
+from generate_embeddings import get_embeddings
+from vector_store import get_store
 from config import SUPABASE_URL, SUPABASE_KEY
 
 supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def fetch_data_for_rag():
-    data_to_embed = []
+# Rows per bulk upsert request
+WRITE_BATCH_SIZE = 500
+# Rows per paged read from the source tables
+READ_PAGE_SIZE = 1000
+
+# How to find new or changed rows per source. Tables with timestamps use the
+# later of updatedAt/createdAt as a watermark. Tables without them have no
+# way to spot an edit, so every sync reads them in full and the content hash
+# decides what is re-embedded.
+SOURCES = {
+    "job": {"table": "Job", "id": "_id", "timestamps": ("updatedAt", "createdAt")},
+    "candidate": {"table": "Candidate_Info", "id": "id", "timestamps": None},
+    "interview": {"table": "interview", "id": "id", "timestamps": ("updatedAt", "createdAt")},
+    "company": {"table": "Company", "id": "_id", "timestamps": None},
+}
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _changed_since(query, source: str, watermark):
+    """Restrict a query to rows past the source's watermark."""
+    spec = SOURCES[source]
+    if watermark is None or not spec["timestamps"]:
+        return query
+    # gte: rows sharing the boundary timestamp are re-read, then skipped by hash
+    return query.or_(",".join(f'{col}.gte."{watermark}"' for col in spec["timestamps"]))
+
+
+def _row_watermark(source: str, row: dict):
+    spec = SOURCES[source]
+    if not spec["timestamps"]:
+        return None
+    return max((row.get(col) for col in spec["timestamps"] if row.get(col)), default=None)
+
+
+def _later(a, b):
+    if a is None or b is None:
+        return a if b is None else b
+    return max(a, b)
+
+
+def _paged(build_query, id_col: str, page_size: int = READ_PAGE_SIZE):
+    """Yield rows page by page using keyset pagination on id_col.
+
+    build_query must return a fresh query builder on each call.
+    """
+    last_id = None
+    while True:
+        query = build_query()
+        if last_id is not None:
+            query = query.gt(id_col, last_id)
+        rows = query.order(id_col).limit(page_size).execute().data
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1][id_col]
+
+
+def fetch_data_for_rag(watermarks: dict = None, seen: dict = None):
+    """Yield (source, source_id, text) for rows past each source's watermark.
+
+    Reads every table in keyset-paged queries; the companies and job titles
+    that jobs and interviews refer to are loaded once per run into lookup
+    maps instead of one query per row. Pass `seen` to collect the highest
+    watermark of each source read so far.
+    """
+    watermarks = watermarks or {}
+    seen = seen if seen is not None else {}
+
+    def track(source, row):
+        seen[source] = _later(seen.get(source), _row_watermark(source, row))
+
+    # --- DIMENSIONS (small, loaded once) ---
+    companies = {
+        c["_id"]: c
+        for c in _paged(lambda: supabase.table("Company").select("_id, name, industry, description"), "_id")
+    }
+    job_titles = {}
+
+    # --- COMPANIES (already in memory; no timestamps, so hash-guarded every run) ---
+    for company_id, company in companies.items():
+        text = f"[Company] {company['name']} ({company['industry']}): {company.get('description')}"
+        track("company", company)
+        yield ("company", company_id, text)
 
     # --- JOB DATA ---
-    jobs = supabase.table("Job").select("_id, title, description, company_id").execute().data
-    for job in jobs:
-        company = supabase.table("Company").select("name, industry").eq("_id", job["company_id"]).single().execute().data
-        text = f"[Job] {job['title']} at {company['name']} ({company['industry']}): {job['description']}"
-        data_to_embed.append(("job", job["_id"], text))
+    for job in _paged(
+        lambda: _changed_since(
+            supabase.table("Job").select('_id, title, description, company_id, "createdAt", "updatedAt"'),
+            "job", watermarks.get("job"),
+        ),
+        "_id",
+    ):
+        company = companies.get(job["company_id"]) or {}
+        text = f"[Job] {job['title']} at {company.get('name')} ({company.get('industry')}): {job['description']}"
+        job_titles[job["_id"]] = job["title"]
+        track("job", job)
+        yield ("job", job["_id"], text)
 
     # --- CANDIDATE INFO ---
-    candidates = supabase.table("Candidate_Info").select("id, name, email, resumeurl, jobid").execute().data
-    for cand in candidates:
-        text = f"[Candidate] Name: {cand['name']}, Email: {cand['email']}, Resume: {cand['resumeurl']}"
-        data_to_embed.append(("candidate", cand["id"], text))
+    for cand in _paged(
+        lambda: _changed_since(
+            supabase.table("Candidate_Info").select("id, name, email, jobid"),
+            "candidate", watermarks.get("candidate"),
+        ),
+        "id",
+    ):
+        # Resume text is chunked and embedded separately at upload time
+        # (source "resume", one chunk_index per chunk; see server resume_ingestion)
+        text = f"[Candidate] Name: {cand['name']}, Email: {cand['email']}"
+        track("candidate", cand)
+        yield ("candidate", cand["id"], text)
 
     # --- INTERVIEWS ---
-    interviews = supabase.table("interview").select("id, candidate_id, job_id, status").execute().data
-    for iv in interviews:
-        job = supabase.table("Job").select("title").eq("_id", iv["job_id"]).single().execute().data
-        text = f"[interview] For job '{job['title']}' | Status: {iv['status']}"
-        data_to_embed.append(("interview", iv["id"], text))
+    if watermarks.get("job") is not None or not job_titles:
+        # Incremental runs only saw changed jobs; interviews may point at any job
+        job_titles = {j["_id"]: j["title"] for j in _paged(lambda: supabase.table("Job").select("_id, title"), "_id")}
+    for iv in _paged(
+        lambda: _changed_since(
+            supabase.table("interview").select('id, candidate_id, job_id, status, "createdAt", "updatedAt"'),
+            "interview", watermarks.get("interview"),
+        ),
+        "id",
+    ):
+        text = f"[interview] For job '{job_titles.get(iv['job_id'])}' | Status: {iv['status']}"
+        track("interview", iv)
+        yield ("interview", iv["id"], text)
 
     # # --- REPORTS ---
     # reports = supabase.table("Report").select("id, feedback, recommendation, overallscore").execute().data
     # for rep in reports:
     #     text = f"[Report] Score: {rep['overallscore']} | Feedback: {rep['feedback']} | Recommendation: {rep['recommendation']}"
-    #     data_to_embed.append(("report", rep["id"], text))
+    #     yield ("report", rep["id"], text)
 
     # # --- SKILL SCORES ---
     # skills = supabase.table("Skill_Score").select("report_id, skill, score").execute().data
     # for s in skills:
     #     text = f"[Skill] {s['skill']}: {s['score']}/10"
-    #     data_to_embed.append(("skill_score", s["report_id"], text))
+    #     yield ("skill_score", s["report_id"], text)
 
-    return data_to_embed
 
+def load_watermarks() -> dict:
+    rows = supabase.table("rag_sync_state").select("source, watermark").execute().data
+    return {row["source"]: row["watermark"] for row in rows}
 
-def sync_rag_table():
-    """
-    Fetches data from relational tables, generates embeddings, and inserts into ai_context.
-    """
-    records = fetch_data_for_rag()
-    inserted = 0
 
-    for (source, source_id, content) in records:
-        emb = get_embedding(content)
-        supabase.table("ai_context").insert({
+def save_watermarks(watermarks: dict):
+    if not watermarks:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    supabase.table("rag_sync_state").upsert(
+        [{"source": s, "watermark": w, "synced_at": now} for s, w in watermarks.items() if w is not None],
+        on_conflict="source",
+    ).execute()
+
+
+def _store_changed(store, records: list) -> int:
+    """Embed and upsert the records whose content changed; returns how many were written."""
+    changed = []
+    by_source = {}
+    for record in records:
+        by_source.setdefault(record[0], []).append(record)
+    for source, source_records in by_source.items():
+        existing = store.content_hashes(source, [source_id for _, source_id, _ in source_records])
+        for (_, source_id, content) in source_records:
+            digest = content_hash(content)
+            if existing.get(source_id) != digest:
+                changed.append((source, source_id, content, digest))
+    if not changed:
+        return 0
+
+    embeddings = get_embeddings([content for _, _, content, _ in changed])
+    rows = [
+        {
             "source": source,
             "source_id": source_id,
             "content": content,
-            "embedding": emb
-        }).execute()
-        inserted += 1
+            "content_hash": digest,
+            "embedding": emb,
+        }
+        for (source, source_id, content, digest), emb in zip(changed, embeddings)
+    ]
+    store.upsert(rows)
+    return len(rows)
+
+
+def _delete_removed(store) -> int:
+    """Drop ai_context rows whose source row no longer exists; returns how many rows went."""
+    deleted = 0
+    for source, spec in SOURCES.items():
+        live = {
+            row[spec["id"]]
+            for row in _paged(lambda: supabase.table(spec["table"]).select(spec["id"]), spec["id"])
+        }
+        gone = store.source_ids(source) - live
+        if gone:
+            store.delete(source, list(gone))
+            deleted += len(gone)
+    return deleted
+
+
+def sync_rag_table(full: bool = False):
+    """
+    Embeds new and changed rows from the relational tables into ai_context.
+
+    Only rows past each source's watermark are read (all rows when full=True),
+    and only rows whose content hash differs from the stored one are embedded,
+    so a sync costs roughly what changed rather than the table size. Records
+    stream through in WRITE_BATCH_SIZE batches, so memory stays bounded, and
+    are upserted on (source, source_id), so re-running never creates duplicates.
+    Rows deleted from a source table are then removed from ai_context, which
+    costs one id-only read of each table.
+    """
+    store = get_store()
+    watermarks = {} if full else load_watermarks()
+    seen = {}
+    scanned = upserted = 0
+    batch = []
+    for record in fetch_data_for_rag(watermarks, seen):
+        batch.append(record)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            upserted += _store_changed(store, batch)
+            scanned += len(batch)
+            batch = []
+    if batch:
+        upserted += _store_changed(store, batch)
+        scanned += len(batch)
+    deleted = _delete_removed(store)
+    store.flush()
+
+    # Only advance watermarks once everything before them is stored
+    save_watermarks({s: _later(watermarks.get(s), w) for s, w in seen.items()})
+
+    return {
+        "status": "success",
+        "scanned_records": scanned,
+        "upserted_records": upserted,
+        "unchanged_records": scanned - upserted,
+        "deleted_records": deleted,
+    }
 
-    return {"status": "success", "inserted_records": inserted}
 
-sync_rag_table()
\ No newline at end of file
+if __name__ == "__main__":
+    # Nightly cron: python sync_to_vectordb.py [--full]
+    print(sync_rag_table(full="--full" in sys.argv))
@@ -0,0 +1,446 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from config import VECTOR_STORE, LOCAL_INDEX_PATH, IVF_LISTS, IVF_NPROBE
+
+
+def _parse_embedding(embedding):
+    # pgvector columns come back from PostgREST as "[0.1,0.2,...]"
+    return json.loads(embedding) if isinstance(embedding, str) else embedding
+
+
+class VectorStore(ABC):
+    """Where ai_context rows live and how nearest neighbours are found.
+
+    `version` changes whenever this process writes to the store, so callers
+    can key caches on it.
+    """
+
+    version = 0
+
+    @abstractmethod
+    def content_hashes(self, source: str, source_ids: list) -> dict:
+        """content_hash per source_id for the rows that already exist."""
+
+    @abstractmethod
+    def upsert(self, rows: list):
+        """Insert or replace rows with source, source_id, content, content_hash and embedding."""
+
+    @abstractmethod
+    def get(self, source: str, source_ids: list) -> list:
+        """Rows for exact (source, source_id) keys, without embeddings or ranking."""
+
+    async def aget(self, source: str, source_ids: list) -> list:
+        return self.get(source, source_ids)
+
+    @abstractmethod
+    def source_ids(self, source: str) -> set:
+        """Every source_id stored for a source."""
+
+    @abstractmethod
+    def delete(self, source: str, source_ids: list):
+        """Remove every chunk of the given rows."""
+
+    @abstractmethod
+    def search(self, embedding, limit: int = 5, source: str = None, source_ids: list = None) -> list:
+        """Closest rows as dicts with id, source, source_id, content and similarity,
+        optionally restricted to one source and/or specific source_ids."""
+
+    async def asearch(self, embedding, limit: int = 5, source: str = None, source_ids: list = None) -> list:
+        return self.search(embedding, limit, source, source_ids)
+
+    def flush(self):
+        """Persist pending writes (no-op for remote stores)."""
+
+
+class SupabaseVectorStore(VectorStore):
+    """ai_context in Supabase, searched by the match_ai_contexts RPC (pgvector ivfflat)."""
+
+    # Rows per hash lookup request
+    LOOKUP_BATCH_SIZE = 500
+
+    def __init__(self):
+        from supabase_client import supabase
+
+        self.supabase = supabase
+
+    def content_hashes(self, source, source_ids):
+        hashes = {}
+        for start in range(0, len(source_ids), self.LOOKUP_BATCH_SIZE):
+            batch = source_ids[start:start + self.LOOKUP_BATCH_SIZE]
+            rows = self.supabase.table("ai_context").select("source_id, content_hash").eq(
+                "source", source
+            ).in_("source_id", batch).execute().data
+            hashes.update({row["source_id"]: row["content_hash"] for row in rows})
+        return hashes
+
+    def upsert(self, rows):
+        self.supabase.table("ai_context").upsert(rows, on_conflict="source,source_id,chunk_index").execute()
+        self.version += 1
+
+    def source_ids(self, source):
+        ids, last_id = set(), 0
+        while True:
+            rows = self.supabase.table("ai_context").select("id, source_id").eq("source", source).gt(
+                "id", last_id
+            ).order("id").limit(self.LOOKUP_BATCH_SIZE).execute().data
+            ids.update(row["source_id"] for row in rows)
+            if len(rows) < self.LOOKUP_BATCH_SIZE:
+                return ids
+            last_id = rows[-1]["id"]
+
+    def delete(self, source, source_ids):
+        source_ids = list(source_ids)
+        for start in range(0, len(source_ids), self.LOOKUP_BATCH_SIZE):
+            batch = source_ids[start:start + self.LOOKUP_BATCH_SIZE]
+            self.supabase.table("ai_context").delete().eq("source", source).in_("source_id", batch).execute()
+        if source_ids:
+            self.version += 1
+
+    # Served by the unique (source, source_id, chunk_index) index
+    def _get_query(self, db, source, source_ids):
+        return db.table("ai_context").select("id, source, source_id, content").eq(
+            "source", source
+        ).in_("source_id", source_ids)
+
+    def get(self, source, source_ids):
+        return self._get_query(self.supabase, source, source_ids).execute().data
+
+    async def aget(self, source, source_ids):
+        from supabase_client import get_async_supabase
+
+        db = await get_async_supabase()
+        return (await self._get_query(db, source, source_ids).execute()).data
+
+    @staticmethod
+    def _rpc(db, embedding, limit, source, source_ids):
+        if source is None and source_ids is None:
+            return db.rpc("match_ai_contexts", {"query_embedding": embedding, "match_limit": limit})
+        return db.rpc("match_ai_contexts_filtered", {
+            "query_embedding": embedding,
+            "match_limit": limit,
+            "filter_source": source,
+            "filter_source_ids": source_ids,
+        })
+
+    def search(self, embedding, limit=5, source=None, source_ids=None):
+        return self._rpc(self.supabase, embedding, limit, source, source_ids).execute().data
+
+    async def asearch(self, embedding, limit=5, source=None, source_ids=None):
+        from supabase_client import get_async_supabase
+
+        db = await get_async_supabase()
+        return (await self._rpc(db, embedding, limit, source, source_ids).execute()).data
+
+
+class LocalVectorStore(VectorStore):
+    """In-process cosine index persisted under `path`.
+
+    Vectors are L2-normalised float32 rows in a memory-mapped file, so a
+    top-k lookup is one matrix-vector product plus argpartition. With
+    `ivf_lists` > 0 the rows are also clustered into that many k-means
+    partitions (like the ivfflat index in schema.sql) and a query only scans
+    the `nprobe` partitions whose centroids are closest.
+
+    Files: vectors.f32 (N x dim), meta.json (ids, content, hashes) and,
+    once partitioned, ivf.npz (centroids and row assignments).
+    """
+
+    def __init__(self, path: str = LOCAL_INDEX_PATH, ivf_lists: int = IVF_LISTS, nprobe: int = IVF_NPROBE):
+        self.path = path
+        self.ivf_lists = ivf_lists
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    # --- persistence ---
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        import numpy as np
+
+        self.rows = []  # metadata per vector row, same order as the matrix
+        self.positions = {}  # (source, source_id, chunk_index) -> row number
+        self.chunks = {}  # (source, source_id) -> row numbers of all its chunks
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.centroids = None
+        self.lists = None
+        self._buffer = None  # writable storage behind self.matrix once rows are added
+        self._source_index = {}  # source -> (row count when built, row numbers)
+        if not os.path.exists(self._file("meta.json")):
+            return
+        with open(self._file("meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        if self.rows:
+            self.matrix = np.memmap(
+                self._file("vectors.f32"), dtype=np.float32, mode="r",
+                shape=(len(self.rows), meta["dim"]),
+            )
+        for i, r in enumerate(self.rows):
+            self._index(i, r)
+        if os.path.exists(self._file("ivf.npz")):
+            ivf = np.load(self._file("ivf.npz"))
+            self._set_partitions(ivf["centroids"], ivf["assignments"])
+
+    def flush(self):
+        import numpy as np
+
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(self.path, exist_ok=True)
+            if self.ivf_lists:
+                self._build_partitions()
+            matrix = np.ascontiguousarray(self.matrix, dtype=np.float32)
+            # Write to temp files and swap them in so readers never see a half-written index
+            matrix.tofile(self._file("vectors.f32.tmp"))
+            with open(self._file("meta.json.tmp"), "w", encoding="utf-8") as f:
+                json.dump({"dim": int(matrix.shape[1]) if matrix.size else 0, "rows": self.rows}, f)
+            os.replace(self._file("vectors.f32.tmp"), self._file("vectors.f32"))
+            os.replace(self._file("meta.json.tmp"), self._file("meta.json"))
+            if self.centroids is not None:
+                np.savez(self._file("ivf.tmp.npz"), centroids=self.centroids, assignments=self._assignments)
+                os.replace(self._file("ivf.tmp.npz"), self._file("ivf.npz"))
+            elif os.path.exists(self._file("ivf.npz")):
+                os.remove(self._file("ivf.npz"))
+            self._dirty = False
+
+    @staticmethod
+    def _key(row: dict) -> tuple:
+        return (row["source"], row["source_id"], row.get("chunk_index") or 0)
+
+    def _index(self, position: int, row: dict):
+        self.positions[self._key(row)] = position
+        self.chunks.setdefault((row["source"], row["source_id"]), []).append(position)
+
+    def _chunk_positions(self, source, source_ids, rows):
+        return [
+            p
+            for source_id in source_ids
+            for p in self.chunks.get((source, source_id), ())
+            if p < len(rows)
+        ]
+
+    # --- writes ---
+    def content_hashes(self, source, source_ids):
+        hashes = {}
+        for source_id in source_ids:
+            position = self.positions.get((source, source_id, 0))
+            if position is not None:
+                hashes[source_id] = self.rows[position].get("content_hash")
+        return hashes
+
+    def _reserve(self, total: int, dim: int):
+        """Make room for `total` rows, doubling capacity so bulk loads stay linear."""
+        import numpy as np
+
+        buffer = self._buffer
+        if buffer is not None and buffer.shape[0] >= total:
+            return
+        capacity = max(total, 2 * (buffer.shape[0] if buffer is not None else 0), 1024)
+        grown = np.empty((capacity, dim), dtype=np.float32)
+        # The first write after loading copies the read-only memmap into memory
+        if self.rows:
+            grown[: len(self.rows)] = self.matrix[: len(self.rows)]
+        self._buffer = grown
+
+    def upsert(self, rows):
+        import numpy as np
+
+        if not rows:
+            return
+        vectors = np.asarray([_parse_embedding(r["embedding"]) for r in rows], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            new_rows = list(self.rows)
+            previous = self._buffer
+            self._reserve(len(new_rows) + len(rows), vectors.shape[1])
+            if self._buffer is previous and previous is not None and any(
+                self._key(row) in self.positions for row in rows
+            ):
+                # Copy on write: replaced vectors must not change under running searches
+                self._buffer = previous.copy()
+            for row, vector in zip(rows, vectors):
+                meta = {
+                    "id": row.get("id", row["source_id"]),
+                    "source": row["source"],
+                    "source_id": row["source_id"],
+                    "chunk_index": row.get("chunk_index") or 0,
+                    "content": row["content"],
+                    "content_hash": row.get("content_hash"),
+                }
+                position = self.positions.get(self._key(meta))
+                if position is None:
+                    position = len(new_rows)
+                    self._index(position, meta)
+                    new_rows.append(meta)
+                else:
+                    new_rows[position] = meta
+                self._buffer[position] = vector
+            # Swap in a new snapshot; searches already running keep the old one
+            # (appends land past its end, replacements went to a fresh buffer)
+            self.rows, self.matrix = new_rows, self._buffer[: len(new_rows)]
+            # Partitions are rebuilt on flush(); until then queries scan every row
+            self.centroids = self.lists = None
+            self._dirty = True
+            self.version += 1
+
+    def source_ids(self, source):
+        return {source_id for (s, source_id) in list(self.chunks) if s == source}
+
+    def delete(self, source, source_ids):
+        with self._lock:
+            drop = {p for source_id in source_ids for p in self.chunks.get((source, source_id), ())}
+            if not drop:
+                return
+            keep = [i for i in range(len(self.rows)) if i not in drop]
+            rows = [self.rows[i] for i in keep]
+            # A fresh buffer, so searches already running keep the old snapshot
+            buffer = self.matrix[keep].copy() if keep else None
+            self.positions, self.chunks, self._source_index = {}, {}, {}
+            for i, row in enumerate(rows):
+                self._index(i, row)
+            self._buffer = buffer
+            self.rows = rows
+            self.matrix = buffer if buffer is not None else self.matrix[:0]
+            self.centroids = self.lists = None
+            self._dirty = True
+            self.version += 1
+
+    # --- IVF partitioning ---
+    def _set_partitions(self, centroids, assignments):
+        import numpy as np
+
+        self.centroids = centroids.astype(np.float32)
+        self._assignments = assignments
+        self.lists = [np.flatnonzero(assignments == i) for i in range(len(centroids))]
+
+    def _build_partitions(self, iterations: int = 10):
+        """Spherical k-means over the current rows (caller holds the lock)."""
+        import numpy as np
+
+        n = self.matrix.shape[0]
+        lists = min(self.ivf_lists, n)
+        if lists < 2:
+            self.centroids = self.lists = None
+            return
+        rng = np.random.default_rng(0)
+        centroids = self.matrix[rng.choice(n, lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(self.matrix @ centroids.T, axis=1)
+            for i in range(lists):
+                members = self.matrix[assignments == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[i] = centroid / (np.linalg.norm(centroid) or 1)
+        self._set_partitions(centroids, np.argmax(self.matrix @ centroids.T, axis=1))
+
+    # --- lookup / search ---
+    @staticmethod
+    def _public(row: dict) -> dict:
+        return {f: row[f] for f in ("id", "source", "source_id", "content")}
+
+    def get(self, source, source_ids):
+        rows = self.rows
+        return [self._public(rows[p]) for p in self._chunk_positions(source, source_ids, rows)]
+
+    def _filter_positions(self, rows, source, source_ids):
+        """Row numbers matching the filters, or None when unfiltered."""
+        import numpy as np
+
+        if source_ids is not None:
+            return np.array(self._chunk_positions(source, source_ids, rows), dtype=int)
+        if source is None:
+            return None
+        cached = self._source_index.get(source)
+        if cached is None or cached[0] != len(rows):
+            cached = (len(rows), np.array([i for i, r in enumerate(rows) if r["source"] == source], dtype=int))
+            self._source_index[source] = cached
+        return cached[1]
+
+    def search_batch(self, embeddings, limit: int = 5, source=None, source_ids=None) -> list:
+        """Top-`limit` matches for each query embedding, best first.
+
+        With `source` / `source_ids` only matching rows are scored, so a
+        filtered search costs the size of the filter, not of the index.
+        """
+        import numpy as np
+
+        queries = np.asarray([_parse_embedding(e) for e in embeddings], dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries /= np.where(norms == 0, 1, norms)
+        # One consistent snapshot even if an upsert swaps these mid-search
+        matrix, rows, centroids, lists = self.matrix, self.rows, self.centroids, self.lists
+        if not rows:
+            return [[] for _ in queries]
+
+        filtered = self._filter_positions(rows, source, source_ids)
+        if filtered is None and centroids is None:
+            # Exhaustive: one matrix product scores every row for every query
+            all_scores = queries @ matrix.T
+        results = []
+        for q, query in enumerate(queries):
+            if filtered is not None:
+                candidates = filtered
+                scores = matrix[candidates] @ query
+            elif centroids is None:
+                candidates, scores = None, all_scores[q]
+            else:
+                probe = np.argsort(-(centroids @ query))[: self.nprobe]
+                candidates = np.concatenate([lists[i] for i in probe])
+                scores = matrix[candidates] @ query
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k] if k else np.empty(0, dtype=int)
+            top = top[np.argsort(-scores[top])]
+            matches = []
+            for i in top:
+                row = rows[int(candidates[i]) if candidates is not None else int(i)]
+                matches.append({**self._public(row), "similarity": float(scores[i])})
+            results.append(matches)
+        return results
+
+    def search(self, embedding, limit=5, source=None, source_ids=None):
+        return self.search_batch([embedding], limit, source, source_ids)[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> VectorStore:
+    """The configured store (VECTOR_STORE=supabase|local), created once per process."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalVectorStore() if VECTOR_STORE == "local" else SupabaseVectorStore()
+        return _store
+
+
+def export_from_supabase(store: "LocalVectorStore", page_size: int = 1000) -> int:
+    """Copy every ai_context row from Supabase into a local store."""
+    from supabase_client import supabase
+
+    copied, last_id = 0, 0
+    while True:
+        rows = supabase.table("ai_context").select("*").gt("id", last_id).order("id").limit(
+            page_size
+        ).execute().data
+        store.upsert(rows)
+        copied += len(rows)
+        if len(rows) < page_size:
+            break
+        last_id = rows[-1]["id"]
+    store.flush()
+    return copied
+
+
+if __name__ == "__main__":
+    # Build the local index from the hosted table: python vector_store.py
+    print(f"Copied {export_from_supabase(LocalVectorStore())} rows into {LOCAL_INDEX_PATH}")
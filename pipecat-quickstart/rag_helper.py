@@ -1,33 +1,85 @@
 import os
+import asyncio
 import httpx
 
 RAG_API_URL = os.getenv("RAG_API_URL", "http://localhost:8001")
+# Seconds interview setup waits for RAG before going ahead with what it has
+RAG_DEADLINE = float(os.getenv("RAG_DEADLINE", "2.0"))
+# 1 = one /retrieve_batch request instead of one request per lookup
+RAG_USE_BATCH = os.getenv("RAG_USE_BATCH", "0") == "1"
+# What the resume passages are ranked against, and how many are included
+RESUME_QUERY = os.getenv("RAG_RESUME_QUERY", "work experience, projects and technical skills")
+RESUME_PASSAGES = int(os.getenv("RAG_RESUME_PASSAGES", "3"))
 
-async def get_interview_context(job_id: int, candidate_id: int, company_id: int):
-    """Fetch relevant context from RAG for interview"""
+_client = None
+
+def get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client so lookups reuse connections to the RAG service"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=RAG_API_URL,
+            timeout=httpx.Timeout(RAG_DEADLINE * 2, connect=1.0),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10, keepalive_expiry=60),
+        )
+    return _client
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _retrieve(request: dict) -> list:
+    response = await get_client().post("/retrieve", json=request)
+    response.raise_for_status()
+    return response.json().get("results", [])
+
+async def _retrieve_batch(requests: list) -> list:
+    response = await get_client().post("/retrieve_batch", json={"requests": requests})
+    response.raise_for_status()
+    return response.json().get("results", [])
+
+async def get_interview_context(job_id: int, candidate_id: int, company_id: int,
+                                deadline: float = RAG_DEADLINE, resume_query: str = RESUME_QUERY):
+    """Fetch relevant context from RAG for interview.
+
+    The job, candidate and company rows are fetched by id (no embedding or
+    similarity search) and concurrently. From the candidate's resume only
+    the RESUME_PASSAGES chunks closest to `resume_query` are included.
+    Whatever has arrived by `deadline` seconds is returned, so a slow
+    lookup costs its section of the context rather than all of it.
+    """
+    requests = [
+        {"source": "job", "source_ids": [job_id]},
+        {"source": "candidate", "source_ids": [candidate_id]},
+        {"source": "company", "source_ids": [company_id]},
+        {"source": "resume", "source_ids": [candidate_id], "query": resume_query, "limit": RESUME_PASSAGES},
+    ]
     try:
-        async with httpx.AsyncClient() as client:
-            # Get job context
-            job_response = await client.get(
-                f"{RAG_API_URL}/get_context",
-                params={"query": f"job {job_id}", "limit": 2}
-            )
-            job_context = job_response.json().get("results", [])
-            
-            # Get candidate context
-            candidate_response = await client.get(
-                f"{RAG_API_URL}/get_context",
-                params={"query": f"candidate {candidate_id}", "limit": 2}
-            )
-            candidate_context = candidate_response.json().get("results", [])
-            
-            # Combine contexts
-            context_text = "\n".join([
-                item.get("content", "") 
-                for item in job_context + candidate_context
-            ])
-            
-            return context_text
+        if RAG_USE_BATCH:
+            # One round trip; all-or-nothing within the deadline
+            sections = await asyncio.wait_for(_retrieve_batch(requests), timeout=deadline)
+        else:
+            tasks = [asyncio.create_task(_retrieve(request)) for request in requests]
+            done, pending = await asyncio.wait(tasks, timeout=deadline)
+            for task in pending:
+                task.cancel()
+            if pending:
+                print(f"RAG deadline hit, using {len(done)}/{len(tasks)} context sections")
+            sections = []
+            for task in tasks:
+                if task in done and task.exception() is None:
+                    sections.append(task.result())
+                elif task in done:
+                    print(f"RAG fetch error: {task.exception()}")
     except Exception as e:
         print(f"RAG fetch error: {e}")
         return ""
+
+    # Combine contexts
+    return "\n".join([
+        item.get("content", "")
+        for section in sections
+        for item in section
+    ])
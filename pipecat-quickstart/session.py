@@ -0,0 +1,66 @@
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from loguru import logger
+
+from transcript_sink import TranscriptSink, transcript_path
+from websocket_client import BackendWebSocketClient, SessionChannel
+
+# Fallbacks used when neither the runner nor the backend supplies ids (local testing)
+DEFAULT_INTERVIEW_ID = 39
+DEFAULT_CANDIDATE_ID = 2
+
+
+@dataclass
+class InterviewSession:
+    """Per-interview state for one bot pipeline.
+
+    Everything that used to live in module globals (ids, transcript file,
+    backend channel) is carried here instead, so several PipelineTasks can
+    run in the same process and share its loaded models.
+
+    Attributes:
+        interview_id: Interview being conducted.
+        candidate_id: Candidate being interviewed.
+        sink: Transcript writer for this interview.
+        evaluator: Post-interview evaluator handle.
+        channel: Backend WebSocket channel bound to this interview.
+    """
+
+    interview_id: Optional[int] = None
+    candidate_id: Optional[int] = None
+    sink: Optional[TranscriptSink] = None
+    evaluator: Any = None
+    channel: Optional[SessionChannel] = None
+
+    @classmethod
+    def from_runner_args(cls, runner_args, evaluator=None) -> "InterviewSession":
+        """Take ids from the session start request body when the runner provides one."""
+        body = getattr(runner_args, "body", None) or {}
+        if not isinstance(body, dict):
+            body = {}
+        return cls(
+            interview_id=body.get("interview_id"),
+            candidate_id=body.get("candidate_id"),
+            evaluator=evaluator,
+        )
+
+    async def resolve(self, client: BackendWebSocketClient) -> "InterviewSession":
+        """Fill in missing ids from the backend and bind the per-session resources."""
+        if self.interview_id is None or self.candidate_id is None:
+            assignment = await client.claim_interview() or {}
+            if self.interview_id is None:
+                self.interview_id = assignment.get("interview_id")
+            if self.candidate_id is None:
+                self.candidate_id = assignment.get("candidate_id")
+
+        self.interview_id = self.interview_id or DEFAULT_INTERVIEW_ID
+        self.candidate_id = self.candidate_id or DEFAULT_CANDIDATE_ID
+        logger.info(
+            f"Session bound to interview_id: {self.interview_id}, candidate_id: {self.candidate_id}"
+        )
+
+        self.channel = client.channel(self.interview_id)
+        if self.sink is None:
+            self.sink = TranscriptSink(transcript_path(self.interview_id))
+        return self
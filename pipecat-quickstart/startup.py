@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from loguru import logger
+
+# BOT_FAST_START=1 (default): serve requests immediately and load models in the background.
+# BOT_FAST_START=0: block at import until every model is loaded (previous behaviour).
+FAST_START = os.getenv("BOT_FAST_START", "1").lower() not in ("0", "false", "no")
+
+_PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    """Records how long each startup phase took, from any thread.
+
+    Attributes:
+        phases: (name, seconds) in the order the phases finished.
+    """
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+        self._reported = False
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start))
+
+    def report(self, label: str):
+        """Log the breakdown plus the time since process start."""
+        with self._lock:
+            phases = list(self.phases)
+        breakdown = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in phases)
+        logger.info(
+            f"⏱️ {label} after {time.perf_counter() - _PROCESS_START:.2f}s ({breakdown or 'no phases'})"
+        )
+
+    def report_once(self, label: str):
+        if not self._reported:
+            self._reported = True
+            self.report(label)
+
+
+timer = StartupTimer()
+
+
+def _import_turn_analyzer():
+    from pipecat.audio.turn.smart_turn.local_smart_turn_v3 import LocalSmartTurnAnalyzerV3
+
+    return LocalSmartTurnAnalyzerV3
+
+
+def _import_vad_analyzer():
+    from pipecat.audio.vad.silero import SileroVADAnalyzer
+
+    return SileroVADAnalyzer
+
+
+def _import_services():
+    # Heavy service SDKs used by every pipeline
+    from pipecat.services.cartesia.tts import CartesiaTTSService  # noqa: F401
+    from pipecat.services.deepgram.stt import DeepgramSTTService  # noqa: F401
+    from pipecat.services.google.llm import GoogleLLMService  # noqa: F401
+    from pipecat.services.tavus.video import TavusVideoService  # noqa: F401
+    from pipecat.transports.daily.transport import DailyParams  # noqa: F401
+
+
+def _import_pipeline():
+    # Pipeline building blocks; bot.py imports them locally once these are loaded
+    from pipecat.audio.vad.vad_analyzer import VADParams  # noqa: F401
+    from pipecat.pipeline.pipeline import Pipeline  # noqa: F401
+    from pipecat.pipeline.runner import PipelineRunner  # noqa: F401
+    from pipecat.pipeline.task import PipelineParams, PipelineTask  # noqa: F401
+    from pipecat.processors.aggregators.llm_context import LLMContext  # noqa: F401
+    from pipecat.processors.aggregators.llm_response_universal import LLMContextAggregatorPair  # noqa: F401
+    from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor  # noqa: F401
+    from pipecat.processors.transcript_processor import TranscriptProcessor  # noqa: F401
+    from pipecat.runner.utils import create_transport  # noqa: F401
+    from pipecat.transports.base_transport import TransportParams  # noqa: F401
+
+
+def _create_supabase():
+    # None when the bot runs without a database (local testing)
+    url, key = os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_KEY")
+    if not (url and key):
+        return None
+    from supabase import create_client
+
+    return create_client(url, key)
+
+
+class ModelLoader:
+    """Imports the VAD/turn models, pipeline and service SDKs and creates the
+    Supabase client in parallel threads.
+
+    `preload()` starts every import at once and returns immediately; callers
+    that need a model await it, so only the first session ever waits and
+    it waits for the slowest import rather than the sum of all of them.
+    """
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="model-loader")
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _submit(self, name: str, fn) -> Future:
+        with self._lock:
+            future = self._futures.get(name)
+            if future is None:
+
+                def timed():
+                    with timer.phase(name):
+                        return fn()
+
+                future = self._executor.submit(timed)
+                self._futures[name] = future
+            return future
+
+    def preload(self):
+        """Start loading everything in the background."""
+        self._submit("turn model import", _import_turn_analyzer)
+        self._submit("vad model import", _import_vad_analyzer)
+        self._submit("service imports", _import_services)
+        self._submit("pipeline imports", _import_pipeline)
+        self._submit("supabase client", _create_supabase)
+
+    def wait(self):
+        """Block until everything started by preload() has loaded."""
+        self.preload()
+        for future in list(self._futures.values()):
+            future.result()
+
+    async def pipeline(self):
+        """Wait until the pipeline modules are importable without blocking."""
+        self.preload()
+        await asyncio.wrap_future(self._futures["pipeline imports"])
+
+    async def supabase(self):
+        """The shared Supabase client, or None when it isn't configured."""
+        self.preload()
+        return await asyncio.wrap_future(self._futures["supabase client"])
+
+    async def analyzers(self, vad_params=None):
+        """Build a fresh (vad_analyzer, turn_analyzer) pair for one session.
+
+        Both analyzers hold per-stream state, so each session gets its own;
+        their constructors load ONNX weights, so they run concurrently off the loop.
+        """
+        self.preload()
+        vad_cls, turn_cls, _ = await asyncio.gather(
+            asyncio.wrap_future(self._futures["vad model import"]),
+            asyncio.wrap_future(self._futures["turn model import"]),
+            asyncio.wrap_future(self._futures["service imports"]),
+        )
+        return await asyncio.gather(
+            asyncio.to_thread(lambda: vad_cls(params=vad_params) if vad_params else vad_cls()),
+            asyncio.to_thread(turn_cls),
+        )
+
+
+models = ModelLoader()
@@ -0,0 +1,30 @@
+import math
+
+import pytest
+
+from generate_embeddings import FakeEmbeddingModel, get_embeddings
+
+
+def test_fake_vectors_are_deterministic_unit_vectors():
+    model = FakeEmbeddingModel(dim=12)
+    first, second, other = model.embed_batch(["hello", "hello", "world"])
+    assert first == second
+    assert first != other
+    assert len(first) == 12
+    assert math.sqrt(sum(v * v for v in first)) == pytest.approx(1.0)
+    # Independent of the instance, so results are reproducible across runs
+    assert FakeEmbeddingModel(dim=12).embed_batch(["hello"]) == [first]
+
+
+def test_get_embeddings_batches_and_keeps_order():
+    model = FakeEmbeddingModel(dim=8)
+    texts = [f"text {i}" for i in range(25)]
+    embeddings = get_embeddings(texts, batch_size=10, embedding_model=model)
+    assert model.requests == 3
+    assert embeddings == FakeEmbeddingModel(dim=8).embed_batch(texts)
+
+
+def test_get_embeddings_of_nothing_makes_no_request():
+    model = FakeEmbeddingModel(dim=8)
+    assert get_embeddings([], embedding_model=model) == []
+    assert model.requests == 0
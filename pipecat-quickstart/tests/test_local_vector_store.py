@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from vector_store import LocalVectorStore
+
+
+def row(source_id, embedding, source="job", chunk_index=0, content=None, content_hash=None):
+    return {
+        "source": source, "source_id": source_id, "chunk_index": chunk_index,
+        "content": content or f"{source} {source_id}.{chunk_index}",
+        "content_hash": content_hash, "embedding": embedding,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalVectorStore(str(tmp_path / "index"), ivf_lists=0)
+
+
+def test_search_ranks_by_cosine_similarity(store):
+    store.upsert([row(1, [1, 0, 0]), row(2, [1, 1, 0]), row(3, [0, 0, 5])])
+    results = store.search([2, 0, 0], limit=2)
+    assert [r["source_id"] for r in results] == [1, 2]
+    assert results[0]["similarity"] == pytest.approx(1.0)
+    assert results[1]["similarity"] == pytest.approx(2 ** -0.5)
+    assert "embedding" not in results[0]
+
+
+def test_search_filters_by_source_and_ids(store):
+    store.upsert([row(1, [1, 0]), row(2, [1, 0.1]), row(1, [1, 0], source="candidate")])
+    assert {(r["source"], r["source_id"]) for r in store.search([1, 0], 5, "job")} == {("job", 1), ("job", 2)}
+    assert [r["source_id"] for r in store.search([1, 0], 5, "job", [2])] == [2]
+    assert store.search([1, 0], 5, "company") == []
+
+
+def test_upsert_replaces_rows_in_place(store):
+    store.upsert([row(1, [1, 0], content_hash="a"), row(2, [0, 1])])
+    store.upsert([row(1, [0, 1], content="edited", content_hash="b")])
+    assert len(store.rows) == 2
+    assert store.get("job", [1]) == [{"id": 1, "source": "job", "source_id": 1, "content": "edited"}]
+    assert store.content_hashes("job", [1, 2, 3]) == {1: "b", 2: None}
+    assert store.search([0, 1], 1)[0]["similarity"] == pytest.approx(1.0)
+
+
+def test_replacing_a_row_does_not_change_a_snapshot_in_use(store):
+    store.upsert([row(1, [1, 0])])
+    snapshot = store.matrix
+    store.upsert([row(1, [0, 1])])
+    assert np.allclose(snapshot[0], [1, 0])
+    assert np.allclose(store.matrix[0], [0, 1])
+
+
+def test_chunks_of_one_row_are_returned_together(store):
+    store.upsert([row(7, [1, 0], "resume", i) for i in range(3)] + [row(8, [1, 0], "resume")])
+    chunks = store.get("resume", [7])
+    assert sorted(c["content"] for c in chunks) == ["resume 7.0", "resume 7.1", "resume 7.2"]
+    assert store.source_ids("resume") == {7, 8}
+
+
+def test_delete_removes_every_chunk(store):
+    store.upsert([row(7, [1, 0], "resume", i) for i in range(3)] + [row(1, [1, 0]), row(2, [0, 1])])
+    store.delete("resume", [7])
+    store.delete("job", [99])
+    assert store.get("resume", [7]) == []
+    assert store.source_ids("job") == {1, 2}
+    assert [r["source_id"] for r in store.search([0, 1], 1)] == [2]
+
+
+def test_flush_persists_and_reloads(tmp_path):
+    path = str(tmp_path / "index")
+    store = LocalVectorStore(path, ivf_lists=0)
+    store.upsert([row(i, [1, i, 0]) for i in range(5)] + [row(9, [0, 0, 1], "company")])
+    store.flush()
+
+    reloaded = LocalVectorStore(path, ivf_lists=0)
+    assert len(reloaded.rows) == 6
+    assert reloaded.get("company", [9])[0]["content"] == "company 9.0"
+    assert reloaded.search([0, 0, 1], 1)[0]["source_id"] == 9
+
+    # Writes after a reload copy the read-only memmap before changing it
+    reloaded.upsert([row(9, [1, 0, 0], "company"), row(10, [0, 1, 0])])
+    reloaded.flush()
+    again = LocalVectorStore(path, ivf_lists=0)
+    assert len(again.rows) == 7
+    assert again.search([0, 1, 0], 1)[0]["source_id"] == 10
+
+
+def test_ivf_partitions_find_the_same_neighbours(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16))
+    path = str(tmp_path / "index")
+    exact = LocalVectorStore(str(tmp_path / "exact"), ivf_lists=0)
+    store = LocalVectorStore(path, ivf_lists=4, nprobe=4)
+    for s in (exact, store):
+        s.upsert([row(i, v.tolist()) for i, v in enumerate(vectors)])
+    store.flush()
+    assert store.centroids is not None
+
+    reloaded = LocalVectorStore(path, ivf_lists=4, nprobe=4)
+    query = vectors[17] + 0.01
+    # Probing every partition is exhaustive
+    assert [r["source_id"] for r in reloaded.search(query, 5)] == [r["source_id"] for r in exact.search(query, 5)]
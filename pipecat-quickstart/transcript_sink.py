@@ -0,0 +1,108 @@
+import asyncio
+import os
+from collections import deque
+from typing import List, Optional
+
+from loguru import logger
+
+TRANSCRIPT_DIR = os.getenv("TRANSCRIPT_DIR", "transcripts")
+
+
+def transcript_path(interview_id) -> str:
+    """Per-interview transcript file so concurrent interviews never share a file."""
+    return os.path.join(TRANSCRIPT_DIR, f"interview_{interview_id}.txt")
+
+
+class TranscriptSink:
+    """Buffered, non-blocking transcript writer.
+
+    Lines are appended to an in-memory ring buffer from the event loop and
+    written to disk in a worker thread, either periodically or once enough
+    lines are buffered. Disk latency therefore never reaches the audio pipeline.
+
+    Attributes:
+        path: File the transcript is written to.
+        flush_interval: Seconds between periodic flushes.
+        flush_lines: Buffered line count that triggers an early flush.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval: float = 2.0,
+        flush_lines: int = 20,
+        max_buffered_lines: int = 10000,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_lines = flush_lines
+        self._buffer: deque = deque(maxlen=max_buffered_lines)
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._periodic_task: Optional[asyncio.Task] = None
+        self._dropped = 0
+
+    async def start(self):
+        """Create the file if needed and begin periodic flushing.
+
+        An existing file is appended to, not truncated: it belongs to an
+        earlier connection of the same interview.
+        """
+        await asyncio.to_thread(self._create)
+        if self._periodic_task is None:
+            self._periodic_task = asyncio.create_task(self._flush_periodically())
+
+    def write(self, line: str):
+        """Queue a line for writing. Never blocks."""
+        if len(self._buffer) == self._buffer.maxlen:
+            self._dropped += 1
+        self._buffer.append(line)
+        if len(self._buffer) >= self.flush_lines and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        """Write all buffered lines to disk off the event loop."""
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            lines = list(self._buffer)
+            self._buffer.clear()
+            if self._dropped:
+                logger.warning(f"Transcript buffer overflowed, dropped {self._dropped} lines")
+                self._dropped = 0
+            try:
+                await asyncio.to_thread(self._append, lines)
+            except Exception as e:
+                logger.error(f"Error saving transcript to {self.path}: {e}")
+
+    async def close(self):
+        """Stop periodic flushing and write whatever is still buffered."""
+        if self._periodic_task is not None:
+            self._periodic_task.cancel()
+            self._periodic_task = None
+        await self.flush()
+
+    async def read(self) -> str:
+        """Read the full transcript back (after close())."""
+        return await asyncio.to_thread(self._read)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so close() can't cut a write in half and reorder lines
+            await asyncio.shield(self.flush())
+
+    def _create(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8"):
+            pass
+
+    def _append(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def _read(self) -> str:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
@@ -25,11 +25,25 @@ class BackendWebSocketClient:
         self.current_interview_id = None
         self.current_candidate_id = None
         self.data_ready = asyncio.Event()
+        # Identity assigned by the backend's worker pool (unset when run by hand)
+        self.worker_id = os.getenv("BOT_WORKER_ID")
+        self.heartbeat_interval = float(os.getenv("BOT_HEARTBEAT_INTERVAL", "5"))
+        self._heartbeat_task = None
+        # start_interview messages waiting to be claimed by a bot session
+        self.pending_interviews: asyncio.Queue = asyncio.Queue()
+        self.claimed_interviews = set()
+        self._connect_lock = asyncio.Lock()
+        self._listen_task = None
+        # event type -> callbacks run for every matching backend message
+        self._handlers = {}
     
     async def connect(self, retries=3, delay=2):
         for attempt in range(retries):
             try:
-                self.ws = await websockets.connect(self.backend_url)
+                url = self.backend_url
+                if self.worker_id:
+                    url += f"?worker_id={self.worker_id}"
+                self.ws = await websockets.connect(url)
                 print("✅ Connected to backend WebSocket")
                 return True
             except Exception as e:
@@ -41,6 +55,37 @@ class BackendWebSocketClient:
                     self.ws = None
                     return False
     
+    async def ensure_connected(self) -> bool:
+        """Connect once and start listening; shared by every session in this process"""
+        async with self._connect_lock:
+            if self.ws is not None:
+                return True
+            if not await self.connect():
+                return False
+            self._listen_task = asyncio.create_task(self.listen())
+            if self.worker_id and self._heartbeat_task is None:
+                self._heartbeat_task = asyncio.create_task(self.heartbeat())
+            return True
+
+    async def heartbeat(self):
+        """Report liveness and load to the backend scheduler"""
+        while True:
+            try:
+                await self.send_event("heartbeat", {
+                    "worker_id": self.worker_id,
+                    "active_sessions": len(self.claimed_interviews),
+                })
+            except Exception as e:
+                print(f"Heartbeat failed: {e}")
+            await asyncio.sleep(self.heartbeat_interval)
+
+    def on(self, event_type: str, callback):
+        """Call callback(data) for each backend message of this type. Callbacks must not block."""
+        self._handlers.setdefault(event_type, []).append(callback)
+
+    def channel(self, interview_id: int) -> "SessionChannel":
+        return SessionChannel(self, interview_id)
+
     async def send_event(self, event_type: str, data: dict = None):
         if not self.ws:
             return
@@ -49,12 +94,10 @@ class BackendWebSocketClient:
         await self.ws.send(json.dumps(message))
     
     async def client_connected(self, interview_id: int):
-        self.current_interview_id = interview_id
         await self.send_event("client_connected", {"interview_id": interview_id})
     
     async def client_disconnected(self, interview_id: int):
         await self.send_event("client_disconnected", {"interview_id": interview_id})
-        self.current_interview_id = None
     
     async def listen(self):
         if not self.ws:
@@ -63,13 +106,47 @@ class BackendWebSocketClient:
         try:
             async for message in self.ws:
                 data = json.loads(message)
-                if data.get("type") == "start_interview":
+                if data.get("type") == "ping":
+                    await self.send_event("pong", {"ts": data.get("ts")})
+                elif data.get("type") == "start_interview":
+                    if self.worker_id and data.get("worker_id") not in (None, self.worker_id):
+                        # Assigned to another worker in the pool
+                        continue
                     self.current_interview_id = data.get("interview_id")
                     self.current_candidate_id = data.get("candidate_id")
                     self.data_ready.set()
+                    self.pending_interviews.put_nowait(data)
                     print(f"📝 Interview {self.current_interview_id} started for candidate {self.current_candidate_id}")
+                for callback in self._handlers.get(data.get("type"), []):
+                    try:
+                        callback(data)
+                    except Exception as e:
+                        print(f"Handler for {data.get('type')} failed: {e}")
         except Exception as e:
             print(f"WebSocket error: {e}")
+        finally:
+            self.ws = None
+    
+    async def claim_interview(self, timeout=5):
+        """Take the next start_interview assignment not yet taken by another session"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                print("⚠️ Timeout waiting for interview data from backend")
+                return None
+            try:
+                data = await asyncio.wait_for(self.pending_interviews.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                continue
+            interview_id = data.get("interview_id")
+            if interview_id not in self.claimed_interviews:
+                self.claimed_interviews.add(interview_id)
+                return data
+    
+    def release_interview(self, interview_id: int):
+        self.claimed_interviews.discard(interview_id)
     
     async def wait_for_data(self, timeout=5):
         try:
@@ -87,4 +164,21 @@ class BackendWebSocketClient:
         await self.wait_for_data()
         return self.current_interview_id
 
+class SessionChannel:
+    """Backend events bound to a single interview session"""
+
+    def __init__(self, client: BackendWebSocketClient, interview_id: int):
+        self.client = client
+        self.interview_id = interview_id
+
+    async def client_connected(self):
+        await self.client.client_connected(self.interview_id)
+
+    async def client_disconnected(self):
+        await self.client.client_disconnected(self.interview_id)
+        self.client.release_interview(self.interview_id)
+
+    async def send_event(self, event_type: str, data: dict = None):
+        await self.client.send_event(event_type, {"interview_id": self.interview_id, **(data or {})})
+
 ws_client = BackendWebSocketClient()
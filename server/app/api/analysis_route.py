@@ -1,104 +1,63 @@
 """API routes for interview analysis"""
 from fastapi import APIRouter, HTTPException, Depends
 from typing import Dict, Any
-from ..models.analysis import AnalyzeInterviewRequest, AnalysisResponse, SkillScoreResponse
-from ..services.interview_analyzer import analyzer_service
+from ..models.analysis import AnalyzeInterviewRequest, AnalysisResponse, AnalysisJobResponse, SkillScoreResponse
+from ..services.analysis_queue import analysis_queue
+from ..services.analysis_cache import analysis_cache
 from ..core.database import get_db
-from supabase import Client
-import json
+from supabase import AsyncClient
 
 router = APIRouter()
 
-@router.post("/analyze-interview", response_model=AnalysisResponse)
-async def analyze_interview(
-    request: AnalyzeInterviewRequest,
-    db: Client = Depends(get_db)
-):
+@router.post("/analyze-interview", response_model=AnalysisJobResponse, status_code=202)
+async def analyze_interview(request: AnalyzeInterviewRequest):
     """
-    Receive transcript, analyze it, and store results in database
+    Queue transcript analysis and return the job immediately.
+    Poll /analysis-jobs/{job_id} or listen on /ws/pipecat for completion.
     """
     try:
-        # 1. Get job requirements from database
-        interview = db.table("interview")\
-            .select("*, Job(title, description, Job_Requirements(skill))")\
-            .eq("id", request.interview_id)\
-            .single()\
-            .execute()
-
-        if not interview.data:
-            raise HTTPException(status_code=404, detail="Interview not found")
-
-        job_data = interview.data["Job"]
-        job_requirements = [req["skill"] for req in job_data["Job_Requirements"]]
-
-        # 2. Analyze transcript using Gemini
-        analysis = await analyzer_service.analyze_interview(
+        job = await analysis_queue.enqueue(
             interview_id=request.interview_id,
-            transcript=[t.dict() for t in request.transcript],
-            job_requirements=job_requirements,
-            job_description=job_data["description"]
+            transcript=[t.model_dump() for t in request.transcript]
         )
-
-        # 3. Store transcript as JSON file (or in database)
-        transcript_data = json.dumps([t.dict() for t in request.transcript])
-
-        # 4. Insert Report into database
-        report = db.table("Report").insert({
-            "interview_id": request.interview_id,
-            "overallscore": analysis.overall_score,
-            "recommondation": analysis.recommendation,
-            "feedback": analysis.feedback,
-            "transcripturl": f"transcripts/{request.interview_id}.json"  # Or store in blob storage
-        }).execute()
-
-        report_id = report.data[0]["_id"]
-
-        # 5. Insert skill scores
-        skill_score_records = [
-            {
-                "skill": skill.skill,
-                "interview_id": request.interview_id,
-                "score": skill.score
-            }
-            for skill in analysis.skill_scores
-        ]
-
-        db.table("skill score").insert(skill_score_records).execute()
-
-        # 6. Update interview status
-        db.table("interview")\
-            .update({"status": "completed"})\
-            .eq("id", request.interview_id)\
-            .execute()
-
-        # 7. Return analysis response
-        return AnalysisResponse(
-            interview_id=request.interview_id,
-            overall_score=analysis.overall_score,
-            recommendation=analysis.recommendation,
-            feedback=analysis.feedback,
-            skill_scores=[
-                {"skill": s.skill, "score": s.score, "evidence": s.evidence}
-                for s in analysis.skill_scores
-            ],
-            sentiment=analysis.sentiment.dict(),
-            key_strengths=analysis.key_strengths,
-            areas_for_improvement=analysis.areas_for_improvement,
-            created_at=report.data[0].get("createdAt")
-        )
-
+        return _job_response(job)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to queue analysis: {str(e)}")
+
+@router.get("/analysis-jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(job_id: str):
+    """Poll the status of a queued analysis"""
+    job = await analysis_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Analysis job not found")
+    return _job_response(job)
+
+@router.get("/analysis-cache/stats")
+async def get_analysis_cache_stats():
+    """Hit/miss counters for the analysis cache"""
+    return analysis_cache.stats()
+
+def _job_response(job: Dict[str, Any]) -> AnalysisJobResponse:
+    return AnalysisJobResponse(
+        job_id=job["id"],
+        interview_id=job["interview_id"],
+        status=job["status"],
+        attempts=job["attempts"],
+        error=job["error"],
+        result=job["result"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
 
 @router.get("/interview/{interview_id}/analysis", response_model=AnalysisResponse)
 async def get_interview_analysis(
     interview_id: int,
-    db: Client = Depends(get_db)
+    db: AsyncClient = Depends(get_db)
 ):
     """Retrieve existing analysis for an interview"""
     try:
         # Get report data
-        report = db.table("Report")\
+        report = await db.table("Report")\
             .select("*")\
             .eq("interview_id", interview_id)\
             .maybe_single()\
@@ -110,7 +69,7 @@ async def get_interview_analysis(
         data = report.data
         
         # Get skill scores separately using interview_id
-        skill_scores = db.table("skill score")\
+        skill_scores = await db.table("skill score")\
             .select("*")\
             .eq("interview_id", interview_id)\
             .execute()
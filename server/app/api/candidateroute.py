@@ -1,65 +1,70 @@
-from fastapi import FastAPI,APIRouter,HTTPException,UploadFile,File
-from app.core.database import supabase
+from fastapi import FastAPI,APIRouter,HTTPException,UploadFile,File,Depends
+from app.core.database import get_db
+from supabase import AsyncClient
 from typing import List
-from py_pdf_parser.loaders import load_file
-import os
-import uuid
-import shutil
 
 from app.models.candidate import CandidateRequestBody
+from app.services.websocket_service import manager
+from app.services.resume_ingestion import resume_ingestion
+from app.services.resume_parser import resume_parser, ResumeTooLarge, ResumeParseError
 # from app.models.jobs_models import JobRequestBody,JobResponse,checkenum
 router=APIRouter()
 tablename="Candidate_Info"
-folderpath="upload"
+
 @router.post("/uploadresume/{candidateid}")
-def pdftotextresume(candidateid:int ,file: UploadFile = File(...)):
+async def pdftotextresume(candidateid:int ,file: UploadFile = File(...),db:AsyncClient=Depends(get_db)):
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Resume should be Pdf only")
-    unique_name = str(uuid.uuid4())
-    file_path=os.path.join(folderpath, f"{unique_name}_{file.filename}")
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
-    document = load_file(file_path)
-    resumetext = " ".join([element.text() for element in document.elements])
-    result=supabase.table(tablename).update({"resumeurl":resumetext}).eq("id",candidateid).execute()
-    os.remove(file_path)
+    # parsing runs in a process pool, straight from the spooled upload
+    try:
+        resumetext = await resume_parser.parse_upload(file)
+    except ResumeTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ResumeParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result= await db.table(tablename).update({"resumeurl":resumetext}).eq("id",candidateid).execute()
     if(result.data):
+        # chunk + embed in the background so the upload returns immediately
+        await resume_ingestion.enqueue(candidateid, resumetext)
         return resumetext
     raise HTTPException(status_code=500, detail="something went wrong when uploading resume text")
 
 @router.post("/addcandidate")
-def addcandidate(request:CandidateRequestBody):
+async def addcandidate(request:CandidateRequestBody,db:AsyncClient=Depends(get_db)):
     data=request.model_dump()
-    result=supabase.table(tablename).insert(data).execute()
+    result= await db.table(tablename).insert(data).execute()
     if result.data:
         return result.data[0]
     raise HTTPException(status_code=404, detail="Unable to add candidate info")
 
 @router.delete("/deletecandidate/{candidateid}")
-def deletecandidate(candidateid:int):
-    result=supabase.table(tablename).delete().eq("id",candidateid).execute()
+async def deletecandidate(candidateid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).delete().eq("id",candidateid).execute()
     if result.data:
+        await resume_ingestion.enqueue(candidateid, None)
+        await manager.notify_context_changed(candidate_id=candidateid)
         return result.data[0]
     raise HTTPException(status_code=404, detail="Unable to delete candidate info")
 
 @router.patch("/updatecandidate/{candidateid}")
-def updatecandidate(candidateid:int,request:CandidateRequestBody):
+async def updatecandidate(candidateid:int,request:CandidateRequestBody,db:AsyncClient=Depends(get_db)):
     data=request.model_dump()
-    result=supabase.table(tablename).update(data).eq("id",candidateid).execute()
+    result= await db.table(tablename).update(data).eq("id",candidateid).execute()
     if result.data:
+        await manager.notify_context_changed(candidate_id=candidateid)
         return result.data[0]
     raise HTTPException(status_code=404, detail="Unable to update candidate info")
 
 @router.get("/{candidateid}")
-def getcandidate(candidateid:int):
-    result=supabase.table(tablename).select("*").eq("id",candidateid).execute()
+async def getcandidate(candidateid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).select("*").eq("id",candidateid).execute()
     if result.data:
         return result.data[0]
     raise HTTPException(status_code=404, detail="Unable to get candidate info")
 
 @router.get("/")
-def getAllCandidates(jobid:int):
-    result=supabase.table(tablename).select("*").eq("jobid",jobid).execute()
+async def getAllCandidates(jobid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).select("*").eq("jobid",jobid).execute()
     if result.data:
         return result.data
     raise HTTPException(status_code=404, detail="Unable to get all candidates info")
\ No newline at end of file
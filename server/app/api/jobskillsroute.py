@@ -1,44 +1,64 @@
-from fastapi import FastAPI,APIRouter,HTTPException
-from app.core.database import supabase
-from typing import List
+from fastapi import FastAPI,APIRouter,HTTPException,Depends
+from app.core.database import get_db
+from supabase import AsyncClient
+import asyncio
+from typing import Dict, List
 from app.models.jobskils import JobSkill
+from app.services.websocket_service import manager
 router=APIRouter()
 tablename="Job_Requirements"
 
 @router.post("/add-jobskills/{jobid}",response_model=List[JobSkill])
-async def addJobSkills(jobid:int,request:List[str]):
+async def addJobSkills(jobid:int,request:List[str],db:AsyncClient=Depends(get_db)):
     data=[{"job_id":jobid,"skill":skill} for skill in request]
-    result= supabase.table(tablename).insert(data).execute()
+    result= await db.table(tablename).insert(data).execute()
     
     if(result.data):
+        await manager.notify_context_changed(job_id=jobid)
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when creating job requirements")
 
 @router.delete("/delete-jobskills/{jobid}",response_model=List[JobSkill])
-async def DeleteJobSkills(jobid:int):
-    result= supabase.table(tablename).delete().eq("job_id",jobid).execute()
+async def DeleteJobSkills(jobid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).delete().eq("job_id",jobid).execute()
     if(result.data):
+        await manager.notify_context_changed(job_id=jobid)
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when deleting job skill")
 @router.delete("/delete-jobskill/{jobid}",response_model=JobSkill)
-async def DeleteJobSkills(jobid:int,skill:str):
-    result= supabase.table(tablename).delete().eq("job_id",jobid).eq("skill",skill).execute()
+async def DeleteJobSkills(jobid:int,skill:str,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).delete().eq("job_id",jobid).eq("skill",skill).execute()
     if(result.data):
+        await manager.notify_context_changed(job_id=jobid)
         return result.data[0]
     raise HTTPException(status_code=500, detail="something went wrong when deleting job skill")
 
+@router.patch("/weights/{jobid}",response_model=List[JobSkill])
+async def setJobSkillWeights(jobid:int,request:Dict[str,float],db:AsyncClient=Depends(get_db)):
+    """Set per-skill weights ({skill: weight}) used by the weighted leaderboard score"""
+    results= await asyncio.gather(*(
+        db.table(tablename).update({"weight":weight}).eq("job_id",jobid).eq("skill",skill).execute()
+        for skill,weight in request.items()
+    ))
+    updated=[row for result in results for row in result.data]
+    if(updated):
+        # existing candidates' weighted scores use the old weights until recomputed
+        await db.rpc("rebuild_job_weighted_scores",{"p_job_id":jobid}).execute()
+        return updated
+    raise HTTPException(status_code=404, detail="none of these skills belong to the job")
+
 @router.get("/{jobid}",response_model=List[JobSkill])
-def getAllJobSkills(jobid:int):
-    result=supabase.table(tablename).select("*").eq("job_id",jobid).execute()
+async def getAllJobSkills(jobid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).select("*").eq("job_id",jobid).execute()
     if(result.data):
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when getting job skills")
 
 @router.get("/",response_model=List[JobSkill])
-async def getAllJobSkillsCompany(companyid:int):
-    jobs = supabase.table("Job").select("_id").eq("company_id",companyid ).execute()
+async def getAllJobSkillsCompany(companyid:int,db:AsyncClient=Depends(get_db)):
+    jobs = await db.table("Job").select("_id").eq("company_id",companyid ).execute()
     job_id = [job["_id"] for job in jobs.data]
-    result = supabase.table(tablename).select("*").in_("job_id", job_id).execute()
+    result = await db.table(tablename).select("*").in_("job_id", job_id).execute()
 
     if(result.data):
         return result.data
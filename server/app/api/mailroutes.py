@@ -1,78 +1,95 @@
 from fastapi import APIRouter,HTTPException, Depends, Body
-from app.models.mailerModel import InvitePayLoad
+from app.models.mailerModel import InvitePayLoad, BulkInvitePayload
 from app.services.mailer_service import TalentLoopMailer
-from supabase import Client, create_client
-from dotenv import load_dotenv
+from app.core.database import get_admin_db
+from supabase import AsyncClient
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-import os
-
-load_dotenv()
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+from app.services.password_hasher import password_hasher, HasherBusy
+from app.services.principal_cache import to_principal
 
 router = APIRouter()
 mailerService = TalentLoopMailer()
 
+async def _hash_or_503(password: str) -> str:
+    try:
+        return await mailerService.hash_password(password)
+    except HasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
 @router.post("/mailCandidate/{interviewid}")
-async def invite_candidates(interviewid:int):
-    result = supabase.table("interview").select("*, Candidate_Info(*)").eq("id", interviewid).execute()
+async def invite_candidates(interviewid:int, supabase: AsyncClient = Depends(get_admin_db)):
+    result = await supabase.table("interview").select("*, Candidate_Info(*)").eq("id", interviewid).execute()
     data=result.data[0]
-    print(result)
-    existing = mailerService.call_user_by_email(data["Candidate_Info"]["email"])
+    existing = await mailerService.call_user_by_email(data["Candidate_Info"]["email"])
     tempPass = mailerService.generate_temp_pass()
-    hashedPass = mailerService.hash_password(tempPass)
+    hashedPass = await _hash_or_503(tempPass)
 
     if existing:
-        supabase.table("User").update({
-            "password": hashedPass,
-            "must_reset_password": True,
-        }).eq("email",data["Candidate_Info"]["email"]).execute()
+        await mailerService.set_password(existing["_id"], hashedPass, must_reset=True)
 
         user = existing
     else:
-        user = mailerService.insert_user(data["Candidate_Info"]["name"],data["Candidate_Info"]["email"], hashedPass)
-
-
-    frontend_link = ""
-    html = f"""
-    <h3>Hi {data["Candidate_Info"]["email"]},</h3>
-    <p>Your interview is scheduled on <b>{data["Schedule_Date"]}</b> at <b>{data["Schedule_Time"]}</b>.</p>
-    <p>Use these credentials to sign in:</p>
-    <ul>
-      <li><b>Email:</b> {data["Candidate_Info"]["email"]}</li>
-      <li><b>Temporary password:</b> <code>{tempPass}</code></li>
-    </ul>
-    <p>Open the interview: <a href="{frontend_link}">Start Interview</a></p>
-    <p>You'll be asked to change your password after signing in.</p>
-    """
+        user = await mailerService.insert_user(data["Candidate_Info"]["name"],data["Candidate_Info"]["email"], hashedPass)
+
+
+    html = mailerService.invite_html(data, tempPass)
 
     await mailerService.send_mail(data["Candidate_Info"]["email"], "TalentLoop - Interview Invite", html)
     return {"message": "Invitation sent successfully to candidate.", "email":data["Candidate_Info"]["email"]}
 
+@router.post("/mailCandidates")
+async def invite_candidates_bulk(payload: BulkInvitePayload):
+    results = await mailerService.invite_interviews(payload.interview_ids)
+    sent = sum(1 for r in results if r["status"] == "sent")
+    return {"sent": sent, "failed": len(results) - sent, "results": results}
+
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     # username = email in this form
-    user = mailerService.call_user_by_email(form_data.username)
-    if not user or not mailerService.verify_password(form_data.password, user["password"]):
+    user = await mailerService.call_user_by_email(form_data.username)
+    try:
+        valid = bool(user) and await mailerService.verify_password(form_data.password, user["password"])
+    except HasherBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Incorrect credentials")
+    # warm the principal cache; the first authenticated call won't hit the DB
+    mailerService.principals.set(to_principal(user))
     # include minimal claims
-    token = mailerService.create_access_token({"sub": user["email"], "role": user.get("role", "candidate")})
+    token = mailerService.create_user_token(user)
     return {"access_token": token, "token_type": "bearer", "expires_in": mailerService.ACCESS_TOKEN_EXPIRES_MINUTES}
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/mail/login")
 
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> dict:
+    """Auth dependency: the signed claims plus a cached revocation check"""
+    return await mailerService.get_current_user(token)
+
+async def require_admin(current_user: dict = Depends(get_current_principal)) -> dict:
+    """Auth dependency for operational endpoints: admins only"""
+    if (current_user.get("role") or "").lower() != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
+
 @router.post("/reset-password")
-def reset_password(new_password: str = Body(...), token: str = Depends(oauth2_scheme)):
-    current_user = mailerService.get_current_user(token)
-    hashed = mailerService.hash_password(new_password)
-    mailerService.update_password(current_user["_id"], hashed)
+async def reset_password(new_password: str = Body(...), current_user: dict = Depends(get_current_principal)):
+    hashed = await _hash_or_503(new_password)
+    await mailerService.update_password(current_user["_id"], hashed)
     return {"message": "password updated"}
 
+@router.get("/hash-stats")
+async def get_hash_stats(_: dict = Depends(require_admin)):
+    """Queue depth, rejections and latency percentiles of the password hashing pool"""
+    return password_hasher.stats()
+
+@router.get("/auth-cache/stats")
+async def get_auth_cache_stats(_: dict = Depends(require_admin)):
+    """Hit/miss counters for the principal cache behind token checks"""
+    return mailerService.principals.stats()
+
 @router.get("/me")
-def get_current_candidate(token: str = Depends(oauth2_scheme)):
-    current_user = mailerService.get_current_user(token)
-    result = supabase.table("Candidate_Info").select("*").eq("email", current_user["email"]).execute()
+async def get_current_candidate(current_user: dict = Depends(get_current_principal), supabase: AsyncClient = Depends(get_admin_db)):
+    result = await supabase.table("Candidate_Info").select("*").eq("email", current_user["email"]).execute()
     if not result.data:
         raise HTTPException(status_code=404, detail="Candidate not found")
     return result.data[0]
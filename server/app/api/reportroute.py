@@ -1,47 +1,141 @@
-from fastapi import FastAPI,APIRouter,HTTPException
-from app.core.database import supabase
-from typing import List
-from app.models.report import ReportCreate,ReportResponse,skillscore
+from fastapi import FastAPI,APIRouter,HTTPException,Depends,Query
+from app.core.database import get_db
+from supabase import AsyncClient
+from postgrest import CountMethod
+import asyncio
+import base64
+import json
+import math
+from typing import List, Optional
+from app.models.report import (ReportCreate,ReportResponse,skillscore,InterviewScoreSummary,JobReportSummary,
+                               SkillDistribution,LeaderboardOrder,LeaderboardEntry,LeaderboardPage)
 router=APIRouter()
 tablename="Report"
 @router.post("/addskillscores")
-async def Addskillscore(request:List[skillscore]):
+async def Addskillscore(request:List[skillscore],db:AsyncClient=Depends(get_db)):
     data = [item.model_dump() for item in request]
-    result=supabase.table("skill score").insert(data).execute()
+    result= await db.table("skill score").insert(data).execute()
     if(result.data):
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when adding skill score")
 @router.get("/skillscores/{interviewid}")
-async def getallskill(interviewid:int):
-    result=supabase.table("skill score").select("*").eq("interview_id",interviewid).execute()
+async def getallskill(interviewid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table("skill score").select("*").eq("interview_id",interviewid).execute()
     if(result.data):
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when getting skill score of particular interview")
 
 @router.post("/CreateReport",response_model=ReportResponse)
-async def CreateReport(request:ReportCreate):
+async def CreateReport(request:ReportCreate,db:AsyncClient=Depends(get_db)):
     data=request.model_dump(mode="json")
-    skillscores=supabase.table("skill score").select("score").eq("interview_id",data["interview_id"]).execute()
-    overallscore=sum(score["score"] for score in skillscores.data)
-    if(not len(skillscores.data)==0):
-        data["overallscore"]=int(overallscore/len(skillscores.data))
-    result= supabase.table(tablename).insert(data).execute()
+    # average maintained by the "skill score" trigger, no need to pull every score
+    summary= await db.table("interview_score_summary").select("average_score").eq("interview_id",data["interview_id"]).execute()
+    if(summary.data and summary.data[0]["average_score"] is not None):
+        data["overallscore"]=int(float(summary.data[0]["average_score"]))
+    result= await db.table(tablename).insert(data).execute()
     if(result.data):
         return result.data[0]
     raise HTTPException(status_code=500, detail="something went wrong when creating report")
 
 
 @router.post("/",response_model=List[ReportResponse])
-async def getAllReportsOfAJob(interviewid:List[int]):
-    result= supabase.table(tablename).select("*").in_("interview_id",interviewid).execute()
+async def getAllReportsOfAJob(interviewid:List[int],db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).select("*").in_("interview_id",interviewid).execute()
     
     if(result.data):
         return result.data
     raise HTTPException(status_code=500, detail="something went wrong when creating report")
 
+@router.get("/summary/interview/{interviewid}",response_model=InterviewScoreSummary)
+async def getInterviewSummary(interviewid:int,db:AsyncClient=Depends(get_db)):
+    """Average skill score of an interview and its rank among the job's candidates"""
+    summary= await db.table("interview_score_summary").select("interview_id, job_id, skill_count, average_score").eq("interview_id",interviewid).execute()
+    if(not summary.data):
+        raise HTTPException(status_code=404, detail="No skill scores for this interview")
+    data=summary.data[0]
+    if(data["job_id"] is not None and data["skill_count"]>0):
+        ranking= await db.rpc("job_score_ranking",{"p_job_id":data["job_id"]}).eq("interview_id",interviewid).execute()
+        if(ranking.data):
+            data["rank"]=ranking.data[0]["rank"]
+            data["percentile_rank"]=ranking.data[0]["percentile_rank"]
+    return data
+
+@router.get("/summary/job/{jobid}",response_model=JobReportSummary)
+async def getJobSummary(jobid:int,db:AsyncClient=Depends(get_db)):
+    """Precomputed score overview and per-skill distributions for a job's candidates"""
+    overview,skills= await asyncio.gather(
+        db.rpc("job_score_overview",{"p_job_id":jobid}).execute(),
+        db.table("job_skill_stats").select("*").eq("job_id",jobid).gt("score_count",0).order("skill").execute(),
+    )
+    data=overview.data[0] if overview.data else {"candidates":0}
+    distributions=[]
+    for row in skills.data:
+        count=row["score_count"]
+        average=row["score_total"]/count
+        variance=max(row["score_sq_total"]/count-average*average,0.0)
+        distributions.append(SkillDistribution(skill=row["skill"],count=count,average=average,
+                                               stddev=math.sqrt(variance),histogram=row["histogram"]))
+    return JobReportSummary(job_id=jobid,skills=distributions,**data)
+
+LEADERBOARD_COLUMNS={LeaderboardOrder.overall:"overall_score",LeaderboardOrder.weighted:"weighted_score"}
+
+def _encode_cursor(score,interviewid:int,position:int)->str:
+    return base64.urlsafe_b64encode(json.dumps([score,interviewid,position]).encode()).decode()
+
+def _decode_cursor(cursor:str):
+    try:
+        score,interviewid,position=json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if isinstance(score,(int,float)) and not isinstance(score,bool):
+            return score,int(interviewid),int(position)
+    except (ValueError,TypeError):
+        pass
+    raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/leaderboard/{jobid}",response_model=LeaderboardPage)
+async def getLeaderboard(jobid:int,order:LeaderboardOrder=LeaderboardOrder.overall,limit:int=Query(20,ge=1,le=100),
+                         cursor:Optional[str]=None,db:AsyncClient=Depends(get_db)):
+    """Candidates for a job, best first, with their skill scores, in one call.
+
+    Reads the trigger-maintained interview_score_summary through its
+    (job_id, score DESC, interview_id DESC) index and pages by keyset, so
+    each page costs the same however many candidates applied.
+    """
+    column=LEADERBOARD_COLUMNS[order]
+    query=db.table("interview_score_summary").select(
+        "interview_id, overall_score, weighted_score, average_score, interview(candidate_id, status, Candidate_Info(name, email))",
+        count=None if cursor else CountMethod.exact,
+    ).eq("job_id",jobid).not_.is_(column,"null")
+    position=0
+    if cursor:
+        score,lastid,position=_decode_cursor(cursor)
+        query=query.or_(f"{column}.lt.{score},and({column}.eq.{score},interview_id.lt.{lastid})")
+    # one extra row tells us whether there is a next page
+    result= await query.order(column,desc=True).order("interview_id",desc=True).limit(limit+1).execute()
+    rows=result.data[:limit]
+
+    scores={}
+    if rows:
+        skillrows= await db.table("skill score").select("skill, interview_id, score").in_("interview_id",[r["interview_id"] for r in rows]).execute()
+        for row in skillrows.data:
+            scores.setdefault(row["interview_id"],[]).append(row)
+
+    items=[]
+    for offset,row in enumerate(rows,1):
+        interview=row.pop("interview",None) or {}
+        candidate=interview.get("Candidate_Info") or {}
+        items.append(LeaderboardEntry(
+            position=position+offset,candidate_id=interview.get("candidate_id"),status=interview.get("status"),
+            name=candidate.get("name"),email=candidate.get("email"),skill_scores=scores.get(row["interview_id"],[]),**row,
+        ))
+    next_cursor=None
+    if len(result.data)>limit:
+        last=rows[-1]
+        next_cursor=_encode_cursor(last[column],last["interview_id"],position+len(rows))
+    return LeaderboardPage(job_id=jobid,order=order,total=result.count,items=items,next_cursor=next_cursor)
+
 @router.get("/{reportid}",response_model=ReportResponse)
-async def getReport(reportid:int):
-    result= supabase.table(tablename).select("*").eq("_id",reportid).execute()
+async def getReport(reportid:int,db:AsyncClient=Depends(get_db)):
+    result= await db.table(tablename).select("*").eq("_id",reportid).execute()
     
     if(result.data):
         return result.data[0]
@@ -21,7 +21,7 @@ async def create_interview(config: InterviewCreate):
 @router.get("/interviews/{session_id}", response_model=InterviewResponse)
 async def get_interview(session_id: int):
     """Get interview session details"""
-    session = interview_service.get_session(session_id)
+    session = await interview_service.get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
@@ -32,7 +32,7 @@ async def start_interview(session_id: int):
     success = await interview_service.start_session(session_id)
     if not success:
         raise HTTPException(status_code=404, detail="Session not found")
-    session = interview_service.get_session(session_id)
+    session = await interview_service.get_session(session_id)
     return {
         "message": "Interview started", 
         "session_id": session_id,
@@ -53,6 +53,11 @@ async def get_interview_report(session_id: int):
     report = await interview_service.create_report(session_id, "")
     return report
 
+@router.get("/bots/status")
+async def bot_pool_status():
+    """Bot worker pool capacity, health and queued interviews"""
+    return interview_service.pipecat_service.pool_status()
+
 @router.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "AI Interview API"}
@@ -61,7 +66,7 @@ async def health_check():
 async def list_interviews(candidate_id: int = None):
     """List all interviews or filter by candidate_id"""
     try:
-        interviews = interview_service.list_all_sessions(candidate_id)
+        interviews = await interview_service.list_all_sessions(candidate_id)
         return interviews
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
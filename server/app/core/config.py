@@ -14,11 +14,83 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_ROLE_KEY:str=""
+
+    DB_HTTP2: bool = True
+    DB_POOL_MAX_CONNECTIONS: int = 100
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    DB_TIMEOUT: float = 30.0
     SMTP_HOST:str=""
     SMTP_PORT:str=""
     SMTP_USER:str=""
     SMTP_PASS:str=""
     JWT_SECRET:str=""
+
+    # Authenticated users are cached this long between token checks
+    AUTH_PRINCIPAL_CACHE_TTL: float = 60.0
+    AUTH_PRINCIPAL_CACHE_SIZE: int = 10000
+
+    # Pooled SMTP connections (per host) and bulk invites
+    SMTP_POOL_SIZE: int = 10
+    SMTP_MAX_ATTEMPTS: int = 3
+    SMTP_RETRY_DELAY: float = 1.0
+    SMTP_TIMEOUT: float = 30.0
+    INVITE_DB_CONCURRENCY: int = 20
+
+    # bcrypt thread pool; calls beyond HASH_MAX_PENDING get a 503
+    HASH_WORKERS: int = 4
+    HASH_MAX_PENDING: int = 64
+
+    # Background analysis queue
+    ANALYSIS_QUEUE_PATH: str = "analysis_jobs.sqlite3"
+    ANALYSIS_WORKERS: int = 4
+    ANALYSIS_MAX_ATTEMPTS: int = 3
+    ANALYSIS_RETRY_DELAY: float = 2.0
+
+    # Analysis result cache
+    ANALYSIS_CACHE_PATH: str = "analysis_cache.sqlite3"
+    ANALYSIS_CACHE_MEMORY_ENTRIES: int = 256
+    ANALYSIS_CACHE_DISK_ENTRIES: int = 10000
+    ANALYSIS_CACHE_TTL: float = 7 * 24 * 3600
+
+    # Long transcripts are analyzed in windows of this many (estimated) tokens
+    ANALYSIS_CHUNK_TOKENS: int = 6000
+    ANALYSIS_CHUNK_CONCURRENCY: int = 4
+
+    # Pipecat bot worker pool
+    PIPECAT_PATH: str = ""
+    BOT_BASE_URL: str = "http://localhost:7861"
+    BOT_WORKERS: int = 0
+    BOT_WORKER_URLS: str = ""
+    BOT_WORKER_CAPACITY: int = 2
+    BOT_WORKER_COMMAND: str = "uv run bot.py --port {port}"
+    BOT_HOST: str = "localhost"
+    BOT_BASE_PORT: int = 7861
+    BOT_HEARTBEAT_INTERVAL: float = 5.0
+    BOT_HEARTBEAT_TIMEOUT: float = 15.0
+
+    # /ws/pipecat hub
+    WS_SEND_QUEUE_SIZE: int = 100
+    WS_SEND_TIMEOUT: float = 5.0
+    WS_PING_INTERVAL: float = 10.0
+    WS_PING_TIMEOUT: float = 30.0
+    WS_MAX_PENDING: int = 1000
+
+    # Resume PDF parsing
+    RESUME_PARSE_WORKERS: int = 2
+    RESUME_MAX_BYTES: int = 10 * 1024 * 1024
+    RESUME_MAX_PAGES: int = 20
+    RESUME_PARSE_CACHE_SIZE: int = 256
+
+    # Resume chunking and embedding at upload time
+    RESUME_CHUNK_CHARS: int = 1200
+    RESUME_CHUNK_OVERLAP: int = 200
+    RESUME_EMBED_BATCH: int = 100
+    RESUME_INGEST_QUEUE_PATH: str = "resume_jobs.sqlite3"
+    RESUME_INGEST_WORKERS: int = 2
+    RESUME_INGEST_MAX_ATTEMPTS: int = 3
+    RESUME_INGEST_RETRY_DELAY: float = 2.0
+
     class Config:
         env_file = ".env"
 
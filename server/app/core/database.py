@@ -1,20 +1,70 @@
-from supabase import create_client, Client
-import os
+from typing import Optional
+
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 from .config import settings
 
 load_dotenv()
 
-def get_db() -> Client:
-    """Get Supabase client"""
-    return create_client(
+# Shared async clients, created once in the app lifespan (see main.py).
+# Each Supabase client owns its own bounded HTTP/2 pool so requests reuse
+# warm TLS connections instead of building a new client per call.
+_db: Optional[AsyncClient] = None
+_admin_db: Optional[AsyncClient] = None
+_http_clients: list = []
+
+
+def _pooled_http_client() -> httpx.AsyncClient:
+    client = httpx.AsyncClient(
+        http2=settings.DB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY,
+        ),
+        timeout=settings.DB_TIMEOUT,
+    )
+    _http_clients.append(client)
+    return client
+
+
+async def _create(key: str) -> AsyncClient:
+    return await acreate_client(
         settings.SUPABASE_URL,
-        settings.SUPABASE_KEY   
+        key,
+        options=AsyncClientOptions(
+            httpx_client=_pooled_http_client(),
+            postgrest_client_timeout=settings.DB_TIMEOUT,
+        ),
     )
 
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
 
-supabase: Client = None
-if supabase_url and supabase_key:
-    supabase = create_client(supabase_url, supabase_key)
+async def init_db():
+    """Create the shared Supabase clients (called on app startup)"""
+    global _db, _admin_db
+    if not (settings.SUPABASE_URL and settings.SUPABASE_KEY):
+        return
+    if _db is None:
+        _db = await _create(settings.SUPABASE_KEY)
+    if _admin_db is None and settings.SUPABASE_SERVICE_ROLE_KEY:
+        _admin_db = await _create(settings.SUPABASE_SERVICE_ROLE_KEY)
+
+
+async def close_db():
+    """Close the pooled HTTP connections (called on app shutdown)"""
+    global _db, _admin_db
+    while _http_clients:
+        await _http_clients.pop().aclose()
+    _db = None
+    _admin_db = None
+
+
+def get_db() -> Optional[AsyncClient]:
+    """Get the shared async Supabase client (None when not configured)"""
+    return _db
+
+
+def get_admin_db() -> Optional[AsyncClient]:
+    """Get the shared service-role Supabase client"""
+    return _admin_db or _db
@@ -27,4 +27,14 @@ class AnalysisResponse(BaseModel):
     sentiment: Dict[str, Any]
     key_strengths: List[str]
     areas_for_improvement: List[str]
-    created_at: datetime
\ No newline at end of file
+    created_at: datetime
+
+class AnalysisJobResponse(BaseModel):
+    job_id: str
+    interview_id: int
+    status: str
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[AnalysisResponse] = None
+    created_at: datetime
+    updated_at: datetime
\ No newline at end of file
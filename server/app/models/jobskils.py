@@ -4,3 +4,4 @@ from typing import Optional, List
 class JobSkill(BaseModel):
     job_id:int
     skill:str
+    weight:float=1
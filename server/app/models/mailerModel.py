@@ -1,4 +1,4 @@
-from pydantic import BaseModel,EmailStr
+from pydantic import BaseModel,EmailStr,Field
 from typing import Optional, List
 from datetime import datetime
 from enum import Enum
@@ -9,4 +9,7 @@ class InvitePayLoad(BaseModel):
     company_id: int
     job_id: int
     schedule_date: str
-    schedule_time: str
\ No newline at end of file
+    schedule_time: str
+
+class BulkInvitePayload(BaseModel):
+    interview_ids: List[int] = Field(min_length=1, max_length=1000)
@@ -21,3 +21,51 @@ class skillscore(BaseModel):
     skill:str
     interview_id:int
     score:int
+
+
+class InterviewScoreSummary(BaseModel):
+    interview_id:int
+    job_id:Optional[int]=None
+    skill_count:int
+    average_score:Optional[float]=None
+    rank:Optional[int]=None
+    percentile_rank:Optional[float]=None
+
+class SkillDistribution(BaseModel):
+    skill:str
+    count:int
+    average:float
+    stddev:float
+    histogram:List[int]=Field(description="Score counts in buckets 0-9, 10-19, ..., 90-100")
+
+class JobReportSummary(BaseModel):
+    job_id:int
+    candidates:int
+    average_score:Optional[float]=None
+    p25:Optional[float]=None
+    median:Optional[float]=None
+    p75:Optional[float]=None
+    skills:List[SkillDistribution]
+
+class LeaderboardOrder(str,Enum):
+    overall="overall"
+    weighted="weighted"
+
+class LeaderboardEntry(BaseModel):
+    position:int
+    interview_id:int
+    candidate_id:Optional[int]=None
+    name:Optional[str]=None
+    email:Optional[str]=None
+    status:Optional[str]=None
+    overall_score:Optional[int]=None
+    weighted_score:Optional[float]=None
+    average_score:Optional[float]=None
+    skill_scores:List[skillscore]=Field(default_factory=list)
+
+class LeaderboardPage(BaseModel):
+    job_id:int
+    order:LeaderboardOrder
+    total:Optional[int]=Field(default=None, description="Ranked candidates; first page only")
+    items:List[LeaderboardEntry]
+    next_cursor:Optional[str]=None
@@ -0,0 +1,157 @@
+"""Content-addressed cache for LLM interview analyses"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Union
+
+from app.core.config import settings
+
+_TIMESTAMP_PREFIX = re.compile(r"^\[[^\]]*\]\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_transcript(transcript: Union[str, List[Dict]]) -> str:
+    """Reduce a transcript to speaker/text lines so cosmetic differences
+    (timestamps, spacing, blank lines) don't change the cache key"""
+    if isinstance(transcript, str):
+        lines = [_TIMESTAMP_PREFIX.sub("", line) for line in transcript.splitlines()]
+    else:
+        lines = [f"{entry.get('speaker', 'unknown')}: {entry.get('text', '')}" for entry in transcript]
+    lines = [_WHITESPACE.sub(" ", line).strip() for line in lines]
+    return "\n".join(line for line in lines if line)
+
+
+def make_key(
+    transcript: Union[str, List[Dict]],
+    job_requirements: Optional[List[str]],
+    prompt_version: str,
+    model: str,
+    job_description: str = ""
+) -> str:
+    payload = json.dumps({
+        "transcript": normalize_transcript(transcript),
+        "requirements": sorted({r.strip().lower() for r in (job_requirements or [])}),
+        "description": _WHITESPACE.sub(" ", job_description or "").strip(),
+        "prompt_version": prompt_version,
+        "model": model,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Two-tier cache: in-memory LRU in front of a SQLite file.
+
+    Both tiers expire entries after `ttl` seconds and evict the least
+    recently used entries once they hold more than their size limit.
+    """
+
+    def __init__(
+        self,
+        path: str = settings.ANALYSIS_CACHE_PATH,
+        memory_entries: int = settings.ANALYSIS_CACHE_MEMORY_ENTRIES,
+        disk_entries: int = settings.ANALYSIS_CACHE_DISK_ENTRIES,
+        ttl: float = settings.ANALYSIS_CACHE_TTL,
+    ):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl = ttl
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_cache_accessed ON analysis_cache(accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _remember(self, key: str, value: Dict, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return entry[1]
+                del self._memory[key]
+
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value, expires_at FROM analysis_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                if row is not None:
+                    conn.execute("DELETE FROM analysis_cache WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE analysis_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            self.disk_hits += 1
+            return value
+
+    def set(self, key: str, value: Dict):
+        now = time.time()
+        expires_at = now + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            conn.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM analysis_cache WHERE key IN ("
+                "SELECT key FROM analysis_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_entries,),
+            )
+            conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
+
+
+# Singleton
+analysis_cache = AnalysisCache()
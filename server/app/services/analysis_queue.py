@@ -0,0 +1,272 @@
+"""Durable background queue for interview transcript analysis"""
+import asyncio
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.services.interview_analyzer import analyzer_service
+
+
+class JobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+ACTIVE_STATUSES = (JobStatus.QUEUED, JobStatus.RUNNING)
+
+
+class AnalysisQueue:
+    """SQLite-backed job queue with an asyncio worker pool.
+
+    Jobs survive restarts: anything still queued or running when the
+    process stopped is picked up again on start(). At most one active
+    job exists per interview_id, so repeated submissions are deduplicated.
+    """
+
+    def __init__(
+        self,
+        db_path: str = settings.ANALYSIS_QUEUE_PATH,
+        workers: int = settings.ANALYSIS_WORKERS,
+        max_attempts: int = settings.ANALYSIS_MAX_ATTEMPTS,
+        retry_delay: float = settings.ANALYSIS_RETRY_DELAY,
+    ):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    # --- Storage ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    interview_id INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_active
+                ON analysis_jobs(interview_id) WHERE status IN ('queued', 'running')
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return rows
+
+    async def _run(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job.pop("payload", None)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # --- Public API ---
+    async def enqueue(self, interview_id: int, transcript: List[Dict]) -> Dict:
+        """Queue an analysis, or return the job already active for this interview"""
+        existing = await self._run(
+            "SELECT * FROM analysis_jobs WHERE interview_id = ? AND status IN (?, ?)",
+            (interview_id, *ACTIVE_STATUSES),
+        )
+        if existing:
+            return self._to_dict(existing[0])
+
+        job_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc).isoformat()
+        try:
+            await self._run(
+                "INSERT INTO analysis_jobs (id, interview_id, status, payload, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, interview_id, JobStatus.QUEUED, json.dumps(transcript), now, now),
+            )
+        except sqlite3.IntegrityError:
+            # Lost a race with a concurrent submission for the same interview
+            return await self.get_active(interview_id) or await self.enqueue(interview_id, transcript)
+
+        if self._queue is not None:
+            self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        rows = await self._run("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+        return self._to_dict(rows[0]) if rows else None
+
+    async def get_active(self, interview_id: int) -> Optional[Dict]:
+        rows = await self._run(
+            "SELECT * FROM analysis_jobs WHERE interview_id = ? AND status IN (?, ?)",
+            (interview_id, *ACTIVE_STATUSES),
+        )
+        return self._to_dict(rows[0]) if rows else None
+
+    async def start(self):
+        """Recover unfinished jobs and start the worker pool"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        await self._run(
+            "UPDATE analysis_jobs SET status = ? WHERE status = ?",
+            (JobStatus.QUEUED, JobStatus.RUNNING),
+        )
+        pending = await self._run(
+            "SELECT id FROM analysis_jobs WHERE status = ? ORDER BY created_at",
+            (JobStatus.QUEUED,),
+        )
+        for row in pending:
+            self._queue.put_nowait(row["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop workers; running jobs are resumed on next start()"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Workers ---
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except Exception as e:
+                print(f"Analysis worker error for job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: str):
+        rows = await self._run("SELECT * FROM analysis_jobs WHERE id = ?", (job_id,))
+        if not rows or rows[0]["status"] != JobStatus.QUEUED:
+            return
+        row = rows[0]
+        interview_id = row["interview_id"]
+        transcript = json.loads(row["payload"])
+        attempts = row["attempts"]
+
+        while True:
+            attempts += 1
+            await self._run(
+                "UPDATE analysis_jobs SET status = ?, attempts = ?, updated_at = ? WHERE id = ?",
+                (JobStatus.RUNNING, attempts, datetime.now(timezone.utc).isoformat(), job_id),
+            )
+            try:
+                result = await analyze_and_store(interview_id, transcript)
+            except Exception as e:
+                if attempts < self.max_attempts:
+                    await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
+                    continue
+                await self._finish(job_id, interview_id, JobStatus.FAILED, error=str(e))
+                return
+            await self._finish(job_id, interview_id, JobStatus.COMPLETED, result=result)
+            return
+
+    async def _finish(self, job_id: str, interview_id: int, status: str,
+                      result: Optional[Dict] = None, error: Optional[str] = None):
+        await self._run(
+            "UPDATE analysis_jobs SET status = ?, result = ?, error = ?, payload = '[]', updated_at = ? WHERE id = ?",
+            (status, json.dumps(result) if result else None, error,
+             datetime.now(timezone.utc).isoformat(), job_id),
+        )
+
+        # Push the outcome to connected listeners
+        from app.services.websocket_service import manager
+        try:
+            await manager.send_to_pipecat({
+                "type": "analysis_completed" if status == JobStatus.COMPLETED else "analysis_failed",
+                "job_id": job_id,
+                "interview_id": interview_id,
+                "error": error,
+            })
+        except Exception as e:
+            print(f"Failed to notify analysis result for job {job_id}: {e}")
+
+
+async def analyze_and_store(interview_id: int, transcript: List[Dict]) -> Dict:
+    """Run the Gemini analysis for an interview and persist the report"""
+    db = get_db()
+
+    # 1. Get job requirements from database
+    interview = await db.table("interview")\
+        .select("*, Job(title, description, Job_Requirements(skill))")\
+        .eq("id", interview_id)\
+        .single()\
+        .execute()
+
+    if not interview.data:
+        raise ValueError(f"Interview {interview_id} not found")
+
+    job_data = interview.data["Job"]
+    job_requirements = [req["skill"] for req in job_data["Job_Requirements"]]
+
+    # 2. Analyze transcript using Gemini
+    analysis = await analyzer_service.analyze_interview(
+        interview_id=interview_id,
+        transcript=transcript,
+        job_requirements=job_requirements,
+        job_description=job_data["description"]
+    )
+
+    # 3. Store report, skill scores and status in one transaction; the RPC
+    # replaces any earlier result for this interview so retries are safe
+    await db.rpc("store_interview_analysis", {
+        "p_interview_id": interview_id,
+        "p_overall_score": analysis.overall_score,
+        "p_recommendation": analysis.recommendation,
+        "p_feedback": analysis.feedback,
+        "p_transcripturl": f"transcripts/{interview_id}.json",  # Or store in blob storage
+        "p_skill_scores": [
+            {"skill": skill.skill, "score": skill.score}
+            for skill in analysis.skill_scores
+        ],
+    }).execute()
+
+    return {
+        "interview_id": interview_id,
+        "overall_score": analysis.overall_score,
+        "recommendation": analysis.recommendation,
+        "feedback": analysis.feedback,
+        "skill_scores": [
+            {"skill": s.skill, "score": s.score, "evidence": s.evidence}
+            for s in analysis.skill_scores
+        ],
+        "sentiment": analysis.sentiment.model_dump(),
+        "key_strengths": analysis.key_strengths,
+        "areas_for_improvement": analysis.areas_for_improvement,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+# Singleton
+analysis_queue = AnalysisQueue()
@@ -1,8 +1,16 @@
 import os
 import json
-from typing import Dict, List, Any
+import re
+import asyncio
+from collections import Counter
+from typing import Dict, List, Any, Optional, Tuple
 from google import generativeai as genai
 from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.services.analysis_cache import analysis_cache, make_key
+
+# Bump whenever the prompt below changes so cached analyses are not reused
+PROMPT_VERSION = "1"
 
 # ---------- Define JSON Schema ----------
 
@@ -29,10 +37,17 @@ class InterviewAnalysis(BaseModel):
 
 # ---------- Core Analyzer ----------
 
+class AnalysisError(Exception):
+    """The transcript could not be analyzed (API error or unparseable response)"""
+
 class InterviewAnalyzerService:
     def __init__(self):
         genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
+        self.model_name = "gemini-2.0-flash"
+        self.model = genai.GenerativeModel(self.model_name)
+        self.cache = analysis_cache
+        self.chunk_tokens = settings.ANALYSIS_CHUNK_TOKENS
+        self.chunk_concurrency = settings.ANALYSIS_CHUNK_CONCURRENCY
 
     def _format_transcript(self, transcript: List[Dict]) -> str:
         formatted = []
@@ -43,16 +58,39 @@ class InterviewAnalyzerService:
             formatted.append(f"[{timestamp}] {speaker}: {text}")
         return "\n".join(formatted)
 
-    async def analyze_interview(
+    def _estimate_tokens(self, text: str) -> int:
+        # ~4 characters per token is close enough for budgeting prompts
+        return len(text) // 4 + 1
+
+    def _chunk_transcript(self, transcript: List[Dict]) -> List[List[Dict]]:
+        """Split a transcript at speaker-turn boundaries into token-budgeted windows"""
+        windows, current, used = [], [], 0
+        for entry in transcript:
+            cost = self._estimate_tokens(self._format_transcript([entry]))
+            if current and used + cost > self.chunk_tokens:
+                windows.append(current)
+                current, used = [], 0
+            current.append(entry)
+            used += cost
+        if current:
+            windows.append(current)
+        return windows
+
+    def _build_prompt(
         self,
-        interview_id: int,
-        transcript: List[Dict],
+        transcript_text: str,
         job_requirements: List[str],
-        job_description: str
-    ) -> InterviewAnalysis:
+        job_description: str,
+        part: Optional[Tuple[int, int]] = None
+    ) -> str:
+        part_note = ""
+        if part:
+            part_note = (
+                f"\nNOTE: This is part {part[0]} of {part[1]} of a longer interview. "
+                "Score only what this part provides evidence for and leave out skills "
+                "that are not discussed in it.\n"
+            )
 
-        transcript_text = self._format_transcript(transcript)
-        
         # Create a detailed prompt that instructs Gemini to return the exact JSON structure
         prompt = f"""
 You are an expert technical interviewer analyzing a candidate's interview performance.
@@ -62,7 +100,7 @@ JOB DESCRIPTION:
 
 REQUIRED SKILLS:
 {', '.join(job_requirements) if job_requirements else 'General skills assessment'}
-
+{part_note}
 INTERVIEW TRANSCRIPT:
 {transcript_text}
 
@@ -96,10 +134,95 @@ Be sure to return ONLY valid JSON, no markdown or explanations:
 
 Analyze the transcript thoroughly and provide realistic scores based on the actual content.
 """
+        return prompt
+
+    async def analyze_interview(
+        self,
+        interview_id: int,
+        transcript: List[Dict],
+        job_requirements: List[str],
+        job_description: str
+    ) -> InterviewAnalysis:
+
+        cache_key = make_key(transcript, job_requirements, PROMPT_VERSION, self.model_name, job_description)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            return InterviewAnalysis(**{**cached, "interview_id": interview_id})
+
+        windows = self._chunk_transcript(transcript)
+        if len(windows) <= 1:
+            analysis = await self._analyze_window(
+                interview_id, transcript, job_requirements, job_description
+            )
+            complete = True
+        else:
+            analysis, complete = await self._analyze_chunked(
+                interview_id, windows, job_requirements, job_description
+            )
+
+        if analysis is None:
+            # Let the caller (the analysis queue) retry instead of storing a made-up report
+            raise AnalysisError(f"Gemini analysis failed for interview {interview_id}")
+
+        # A merge missing some windows is returned but never cached, so the
+        # next analysis of this transcript gets another chance at all of them
+        if complete:
+            await asyncio.to_thread(self.cache.set, cache_key, analysis.model_dump())
+        return analysis
+
+    async def _analyze_chunked(
+        self,
+        interview_id: int,
+        windows: List[List[Dict]],
+        job_requirements: List[str],
+        job_description: str
+    ) -> Tuple[Optional[InterviewAnalysis], bool]:
+        """Map: analyze windows concurrently. Reduce: merge into one analysis.
+
+        Failed windows are retried once. Returns the merged analysis and
+        whether every window contributed to it.
+        """
+        semaphore = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def analyze(index: int):
+            async with semaphore:
+                return await self._analyze_window(
+                    interview_id, windows[index], job_requirements, job_description,
+                    part=(index + 1, len(windows))
+                )
+
+        results = await asyncio.gather(*(analyze(i) for i in range(len(windows))))
+        failed = [i for i, analysis in enumerate(results) if analysis is None]
+        if failed:
+            retried = await asyncio.gather(*(analyze(i) for i in failed))
+            for index, analysis in zip(failed, retried):
+                results[index] = analysis
+
+        parts = [
+            (self._estimate_tokens(self._format_transcript(window)), analysis)
+            for window, analysis in zip(windows, results)
+            if analysis is not None
+        ]
+        if not parts:
+            return None, False
+        if len(parts) < len(windows):
+            print(f"Interview {interview_id}: {len(windows) - len(parts)} of {len(windows)} windows failed")
+        return merge_analyses(interview_id, parts), len(parts) == len(windows)
+
+    async def _analyze_window(
+        self,
+        interview_id: int,
+        transcript: List[Dict],
+        job_requirements: List[str],
+        job_description: str,
+        part: Optional[Tuple[int, int]] = None
+    ) -> Optional[InterviewAnalysis]:
+        transcript_text = self._format_transcript(transcript)
+        prompt = self._build_prompt(transcript_text, job_requirements, job_description, part)
 
         try:
             # Use Gemini without schema validation - just ask for JSON
-            response = await self.model.generate_content(
+            response = await self.model.generate_content_async(
                 prompt,
                 generation_config=genai.GenerationConfig(
                     response_mime_type="application/json",
@@ -122,7 +245,6 @@ Analyze the transcript thoroughly and provide realistic scores based on the actu
             print(f"Raw response: {response.text}")
             
             # Try to extract JSON from the response if it's wrapped in markdown
-            import re
             json_match = re.search(r'```json\s*(.*?)\s*```', response.text, re.DOTALL)
             if json_match:
                 try:
@@ -131,37 +253,89 @@ Analyze the transcript thoroughly and provide realistic scores based on the actu
                     return InterviewAnalysis(**analysis_data)
                 except:
                     pass
-            
-            # Return a default analysis if parsing fails
-            return self._create_default_analysis(interview_id, transcript_text)
+            return None
             
         except Exception as e:
             print(f"Error during analysis: {str(e)}")
-            return self._create_default_analysis(interview_id, transcript_text)
-
-    def _create_default_analysis(self, interview_id: int, transcript: str) -> InterviewAnalysis:
-        """Create a default analysis when API calls fail"""
-        return InterviewAnalysis(
-            interview_id=interview_id,
-            overall_score=50,
-            skill_scores=[
-                SkillAssessment(
-                    skill="Communication",
-                    score=60,
-                    evidence="Based on transcript analysis"
-                )
-            ],
-            sentiment=SentimentAnalysis(
-                overall_sentiment="neutral",
-                confidence_level="medium",
-                nervousness_indicators=[]
-            ),
-            recommendation="maybe - requires further evaluation",
-            feedback="The interview transcript was analyzed. Further assessment recommended.",
-            key_strengths=["Participated in interview"],
-            areas_for_improvement=["More detailed responses needed"],
-            response_quality={"depth": 5, "clarity": 5, "relevance": 5}
-        )
+            return None
+
+# ---------- Chunk Reducer ----------
+
+def _weighted_mean(values: List[Tuple[int, float]]) -> int:
+    total = sum(weight for weight, _ in values)
+    return int(round(sum(weight * value for weight, value in values) / total)) if total else 0
+
+def _vote(labels: List[Tuple[int, str]], default: str) -> str:
+    """Token-weighted majority; ties resolve to the label seen first"""
+    tally = Counter()
+    for weight, label in labels:
+        if label:
+            tally[label] += weight
+    if not tally:
+        return default
+    best = max(tally.values())
+    return next(label for _, label in labels if tally.get(label) == best)
+
+def _unique(items: List[str], limit: int) -> List[str]:
+    seen, result = set(), []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            result.append(item.strip())
+    return result[:limit]
+
+def merge_analyses(interview_id: int, parts: List[Tuple[int, InterviewAnalysis]]) -> InterviewAnalysis:
+    """Deterministically combine per-window analyses, weighting each window
+    by its token count. Parts must be in transcript order."""
+    skills: Dict[str, Dict[str, Any]] = {}
+    for weight, analysis in parts:
+        for s in analysis.skill_scores:
+            entry = skills.setdefault(s.skill.strip().lower(), {"skill": s.skill, "scores": [], "evidence": []})
+            entry["scores"].append((weight, s.score))
+            if s.evidence:
+                entry["evidence"].append((s.score, s.evidence))
+
+    skill_scores = []
+    for entry in skills.values():
+        # Keep the evidence behind the strongest scores, in transcript order on ties
+        evidence = _unique([text for _, text in sorted(entry["evidence"], key=lambda e: -e[0])], 2)
+        skill_scores.append(SkillAssessment(
+            skill=entry["skill"],
+            score=_weighted_mean(entry["scores"]),
+            evidence=" ... ".join(evidence)
+        ))
+
+    recommendations = [(w, a.recommendation.split("-")[0].strip().lower()) for w, a in parts]
+    verdict = _vote(recommendations, "maybe")
+    reasoning = next((
+        a.recommendation for w, a in sorted(parts, key=lambda p: -p[0])
+        if a.recommendation.split("-")[0].strip().lower() == verdict
+    ), verdict)
+
+    metrics: Dict[str, List[Tuple[int, float]]] = {}
+    for weight, analysis in parts:
+        for name, value in analysis.response_quality.items():
+            if isinstance(value, (int, float)):
+                metrics.setdefault(name, []).append((weight, value))
+
+    return InterviewAnalysis(
+        interview_id=interview_id,
+        overall_score=_weighted_mean([(w, a.overall_score) for w, a in parts]),
+        skill_scores=skill_scores,
+        sentiment=SentimentAnalysis(
+            overall_sentiment=_vote([(w, a.sentiment.overall_sentiment) for w, a in parts], "neutral"),
+            confidence_level=_vote([(w, a.sentiment.confidence_level) for w, a in parts], "medium"),
+            nervousness_indicators=_unique(
+                [i for _, a in parts for i in a.sentiment.nervousness_indicators], 10
+            )
+        ),
+        recommendation=reasoning,
+        feedback="\n\n".join(_unique([a.feedback for _, a in parts], len(parts))),
+        key_strengths=_unique([i for _, a in parts for i in a.key_strengths], 8),
+        areas_for_improvement=_unique([i for _, a in parts for i in a.areas_for_improvement], 8),
+        response_quality={name: _weighted_mean(values) for name, values in metrics.items()}
+    )
 
 # Singleton
 analyzer_service = InterviewAnalyzerService()
\ No newline at end of file
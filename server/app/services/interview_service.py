@@ -3,18 +3,19 @@ from typing import Optional
 from datetime import datetime
 from app.models.interview import Interview, InterviewCreate
 from app.models.report import ReportCreate, skillscore
-from app.services.pipecat_service import PipecatService
-from app.core.database import supabase
+from app.services.pipecat_service import pipecat_service
+from app.core.database import get_db
 
 class InterviewService:
     def __init__(self):
-        self.pipecat_service = PipecatService()
+        self.pipecat_service = pipecat_service
         self.sessions = {}
     
     async def create_session(self, config: InterviewCreate) -> Interview:
         """Create a new interview session"""
-        if supabase:
-            result = supabase.table("interview").insert({
+        db = get_db()
+        if db:
+            result = await db.table("interview").insert({
                 "candidate_id": config.candidate_id,
                 "company_id": config.company_id,
                 "job_id": config.job_id,
@@ -39,12 +40,13 @@ class InterviewService:
     
     async def start_session(self, session_id: int) -> bool:
         """Start an interview session"""
-        session = self.get_session(session_id)
+        db = get_db()
+        session = await self.get_session(session_id)
         if not session:
             return False
         
-        if supabase:
-            supabase.table("interview").update({
+        if db:
+            await db.table("interview").update({
                 "status": "in_progress",
                 "updatedAt": datetime.now().isoformat()
             }).eq("id", session_id).execute()
@@ -61,8 +63,8 @@ class InterviewService:
         bot_info = await self.pipecat_service.start_bot(session_id, bot_config)
         bot_url = bot_info.get("bot_url")
         
-        if supabase:
-            supabase.table("interview").update({
+        if db:
+            await db.table("interview").update({
                 "bot_url": bot_url
             }).eq("id", session_id).execute()
         else:
@@ -72,8 +74,9 @@ class InterviewService:
     
     async def end_session(self, session_id: int) -> bool:
         """End an interview session"""
-        if supabase:
-            supabase.table("interview").update({
+        db = get_db()
+        if db:
+            await db.table("interview").update({
                 "status": "completed",
                 "updatedAt": datetime.now().isoformat()
             }).eq("id", session_id).execute()
@@ -81,31 +84,34 @@ class InterviewService:
         await self.pipecat_service.stop_bot(session_id)
         return True
     
-    def get_session(self, session_id: int) -> Optional[Interview]:
+    async def get_session(self, session_id: int) -> Optional[Interview]:
         """Get session by ID"""
-        if not supabase:
+        db = get_db()
+        if not db:
             return self.sessions.get(session_id)
-        result = supabase.table("interview").select("*").eq("id", session_id).execute()
+        result = await db.table("interview").select("*").eq("id", session_id).execute()
         if result.data:
             return Interview(**result.data[0])
         return None
     
-    def list_all_sessions(self, candidate_id: int = None):
+    async def list_all_sessions(self, candidate_id: int = None):
         """List all interview sessions or filter by candidate_id"""
-        if not supabase:
+        db = get_db()
+        if not db:
             return list(self.sessions.values())
         
-        query = supabase.table("interview").select("*")
+        query = db.table("interview").select("*")
         if candidate_id:
             query = query.eq("candidate_id", candidate_id)
         
-        result = query.execute()
+        result = await query.execute()
         return result.data if result.data else []
     
     async def create_report(self, interview_id: int, transcript: str) -> ReportCreate:
         """Create interview report with scores"""
-        if supabase:
-            result = supabase.table("Report").insert({
+        db = get_db()
+        if db:
+            result = await db.table("Report").insert({
                 "interview_id": interview_id,
                 "overallscore": 0,
                 "recommondation": "Analysis pending",
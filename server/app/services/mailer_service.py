@@ -1,17 +1,24 @@
+import asyncio
 import os, random, string
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 
 from dotenv import load_dotenv
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from pydantic import BaseModel, EmailStr
-from supabase import create_client, Client
-from passlib.context import CryptContext
+from supabase import AsyncClient
 from jose import jwt, JWTError
-import aiosmtplib
 from email.mime.text import MIMEText
 from app.models.mailerModel import InvitePayLoad
+from app.core.config import settings
+from app.core.database import get_admin_db
+from app.services.smtp_pool import get_pool
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import PrincipalCache, to_principal
+
+# Ids / emails per `in.(...)` filter, keeping request URLs reasonably short
+LOOKUP_BATCH_SIZE = 200
 
 
 class TalentLoopMailer:
@@ -30,12 +37,13 @@ class TalentLoopMailer:
         self.SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
         self.SMTP_USER = os.getenv("SMTP_USER")
         self.SMTP_PASS = os.getenv("SMTP_PASS")
+        self.SMTP_START_TLS = os.getenv("SMTP_START_TLS", "true").lower() != "false"
         
         self.FRONTEND_BASE = os.getenv("FRONTEND_BASE", "http://localhost:3000")
 
         # --- Initialize clients ---
-        self.supabase: Client = create_client(self.SUPABASE_URL, self.SUPABASE_SERVICE_ROLE_KEY)
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self.pwd_context = password_hasher.context
+        self.principals = PrincipalCache()
         self.oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/mail/login")
         self.app = FastAPI(title="TalentLoop Auth Service")
 
@@ -44,11 +52,15 @@ class TalentLoopMailer:
         chars = string.ascii_letters + string.digits
         return ''.join(random.choice(chars) for _ in range(10))
 
-    def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+    # bcrypt runs on the shared hashing pool, never on the event loop
+    async def hash_password(self, password: str) -> str:
+        return await password_hasher.hash(password)
+
+    async def hash_passwords(self, passwords: List[str]) -> List[str]:
+        return await password_hasher.hash_many(passwords)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
         to_encode = data.copy()
@@ -57,32 +69,47 @@ class TalentLoopMailer:
         token = jwt.encode(to_encode, self.JWT_SECRET, algorithm=self.JWT_ALGORITHM)
         return token
 
+    def invite_html(self, interview: dict, temp_pass: str) -> str:
+        candidate = interview["Candidate_Info"]
+        frontend_link = ""
+        return f"""
+    <h3>Hi {candidate["email"]},</h3>
+    <p>Your interview is scheduled on <b>{interview["Schedule_Date"]}</b> at <b>{interview["Schedule_Time"]}</b>.</p>
+    <p>Use these credentials to sign in:</p>
+    <ul>
+      <li><b>Email:</b> {candidate["email"]}</li>
+      <li><b>Temporary password:</b> <code>{temp_pass}</code></li>
+    </ul>
+    <p>Open the interview: <a href="{frontend_link}">Start Interview</a></p>
+    <p>You'll be asked to change your password after signing in.</p>
+    """
+
     async def send_mail(self, to_email: str, subject: str, html: str):
         msg = MIMEText(html, "html")
         msg["From"] = self.SMTP_USER
         msg["To"] = to_email
         msg["Subject"] = subject
 
-        await aiosmtplib.send(
-            msg,
-            hostname=self.SMTP_HOST,
-            port=self.SMTP_PORT,
-            username=self.SMTP_USER,
-            password=self.SMTP_PASS,
-            start_tls=True,
-        )
+        # persistent connections shared by every send to this server
+        pool = get_pool(self.SMTP_HOST, self.SMTP_PORT, self.SMTP_USER, self.SMTP_PASS, self.SMTP_START_TLS)
+        await pool.send(msg)
+
+    @property
+    def supabase(self) -> AsyncClient:
+        # shared pooled service-role client, created in the app lifespan
+        return get_admin_db()
 
     # --- Database Methods ---
-    def call_user_by_email(self, email: str):
+    async def call_user_by_email(self, email: str):
         try:
-            response = self.supabase.table("User").select("*").eq("email", email).limit(1).execute()
+            response = await self.supabase.table("User").select("*").eq("email", email).limit(1).execute()
             return response.data[0] if response.data else None
         except Exception as e:
             raise Exception(f"Failed to call user {e}")
 
-    def insert_user(self, name, email, hashed_password):
+    async def insert_user(self, name, email, hashed_password):
         try:
-            response = self.supabase.table("User").insert({
+            response = await self.supabase.table("User").insert({
                 "name": name,
                 "email": email,
                 "password": hashed_password,
@@ -93,20 +120,27 @@ class TalentLoopMailer:
         except Exception as e:
             raise Exception(f"Failed to insert user {e}")
 
-    def update_password(self, user_id, hashed_password):
+    async def set_password(self, user_id, hashed_password, must_reset: bool):
+        """Set a new password and bump token_version, revoking every token issued before"""
         try:
-            res = self.supabase.table("User").update({
-                "password": hashed_password,
-                "must_reset_password": False,
-                "updatedAt": datetime.utcnow().isoformat()
-            }).eq("_id", user_id).execute()
-            return res.data[0]
+            res = await self.supabase.rpc("set_user_password", {
+                "p_user_id": user_id,
+                "p_password": hashed_password,
+                "p_must_reset": must_reset,
+            }).execute()
         except Exception as e:
             raise Exception(f"Failed to update password {e}")
+        if not res.data:
+            raise Exception(f"Failed to update password: user {user_id} not found")
+        self.principals.invalidate(res.data[0]["email"])
+        return res.data[0]
+
+    async def update_password(self, user_id, hashed_password):
+        return await self.set_password(user_id, hashed_password, must_reset=False)
 
-    def insert_candidate(self, name, email, company_id, job_id):
+    async def insert_candidate(self, name, email, company_id, job_id):
         try:
-            response = self.supabase.table("Candidate_Info").insert({
+            response = await self.supabase.table("Candidate_Info").insert({
                 "name": name,
                 "email": email,
                 "company_id": company_id,
@@ -116,9 +150,9 @@ class TalentLoopMailer:
         except Exception as e:
             raise Exception(f"Failed to insert candidate {e}")
 
-    def insert_interview(self, candidate_id, company_id, job_id, schedule_date, schedule_time, bot_url):
+    async def insert_interview(self, candidate_id, company_id, job_id, schedule_date, schedule_time, bot_url):
         try:
-            response = self.supabase.table("interview").insert({
+            response = await self.supabase.table("interview").insert({
                 "candidate_id": candidate_id,
                 "company_id": company_id,
                 "job_id": job_id,
@@ -130,8 +164,127 @@ class TalentLoopMailer:
         except Exception as e:
             raise Exception(f"Failed to insert interview {e}")
         
+    # --- Bulk invites ---
+    async def _select_in(self, table: str, columns: str, field: str, values: list) -> List[dict]:
+        batches = [values[i:i + LOOKUP_BATCH_SIZE] for i in range(0, len(values), LOOKUP_BATCH_SIZE)]
+        results = await asyncio.gather(*(
+            self.supabase.table(table).select(columns).in_(field, batch).execute() for batch in batches
+        ))
+        return [row for result in results for row in result.data]
+
+    async def _reset_users(self, users: List[dict], hashes: Dict[str, str]) -> Dict[str, str]:
+        """Store new temporary passwords; returns email -> error for users that failed"""
+        errors = {}
+        limit = asyncio.Semaphore(settings.INVITE_DB_CONCURRENCY)
+
+        async def update(user: dict):
+            async with limit:
+                try:
+                    await self.set_password(user["_id"], hashes[user["email"]], must_reset=True)
+                except Exception as e:
+                    errors[user["email"]] = f"Failed to update user {e}"
+
+        await asyncio.gather(*(update(user) for user in users))
+        return errors
+
+    async def invite_interviews(self, interview_ids: List[int]) -> List[dict]:
+        """Invite the candidates of many interviews at once.
+
+        Interviews and users are looked up in batched `in` queries, new
+        users are created in one insert, temporary passwords are hashed on
+        a thread pool and mails go out concurrently over the pooled SMTP
+        connections. Returns one result per interview id, in order.
+
+        Existing users' passwords are reset before their mail goes out, so
+        `password_reset` marks results where the old password no longer
+        works; if such a mail failed, the candidate needs a re-invite.
+        """
+        interview_ids = list(dict.fromkeys(interview_ids))
+        interviews = {
+            row["id"]: row
+            for row in await self._select_in("interview", "*, Candidate_Info(*)", "id", interview_ids)
+        }
+        results = {
+            interview_id: {"interview_id": interview_id, "email": None, "status": "not_found",
+                           "error": "Interview not found", "password_reset": False}
+            for interview_id in interview_ids if interview_id not in interviews
+        }
+        candidates = {}
+        for interview_id, interview in interviews.items():
+            candidate = interview.get("Candidate_Info") or {}
+            if not candidate.get("email"):
+                results[interview_id] = {"interview_id": interview_id, "email": None, "status": "failed",
+                                         "error": "Interview has no candidate email", "password_reset": False}
+            else:
+                candidates[candidate["email"]] = candidate
+
+        # One temporary password per person, even if they have several interviews
+        emails = list(candidates)
+        passwords = {email: self.generate_temp_pass() for email in emails}
+        hashes = dict(zip(emails, await self.hash_passwords([passwords[e] for e in emails])))
+
+        existing = await self._select_in("User", "_id, email", "email", emails)
+        existing_emails = {user["email"] for user in existing}
+        errors = await self._reset_users(existing, hashes)
+        reset_emails = existing_emails - set(errors)
+        new_users = [
+            {
+                "name": candidates[email]["name"],
+                "email": email,
+                "password": hashes[email],
+                "role": "Candidate",
+                "must_reset_password": True,
+            }
+            for email in emails if email not in existing_emails
+        ]
+        if new_users:
+            try:
+                await self.supabase.table("User").insert(new_users).execute()
+            except Exception as e:
+                errors.update({user["email"]: f"Failed to insert user {e}" for user in new_users})
+
+        async def send(interview_id: int, interview: dict):
+            email = interview["Candidate_Info"]["email"]
+            result = {"interview_id": interview_id, "email": email, "status": "sent", "error": None,
+                      "password_reset": email in reset_emails}
+            if email in errors:
+                return {**result, "status": "failed", "error": errors[email]}
+            try:
+                await self.send_mail(email, "TalentLoop - Interview Invite",
+                                     self.invite_html(interview, passwords[email]))
+            except Exception as e:
+                error = f"Failed to send mail {e}"
+                if result["password_reset"]:
+                    error += "; password was already reset, re-invite required"
+                return {**result, "status": "failed", "error": error}
+            return result
+
+        sent = await asyncio.gather(*(
+            send(interview_id, interview)
+            for interview_id, interview in interviews.items() if interview_id not in results
+        ))
+        results.update({result["interview_id"]: result for result in sent})
+        return [results[interview_id] for interview_id in interview_ids]
+
 #      AUTH
-    def get_current_user(self, token: str):
+    def create_user_token(self, user: dict) -> str:
+        """Access token whose claims are enough to authorize a request"""
+        return self.create_access_token({
+            "sub": user["email"],
+            "uid": user["_id"],
+            "role": user.get("role", "candidate"),
+            "ver": user.get("token_version") or 0,
+        })
+
+    async def get_current_user(self, token: str):
+        """Principal for a bearer token.
+
+        The signature and expiry come from the JWT itself; the only thing
+        that needs the database is whether the token has been revoked
+        (its `ver` claim is older than the user's token_version). That
+        check is served from a short-TTL principal cache, so the hot path
+        makes no Supabase request.
+        """
         cred_exc = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -145,7 +298,14 @@ class TalentLoopMailer:
         except JWTError:
             raise cred_exc
 
-        user = self.call_user_by_email(email)
-        if not user:
+        principal = self.principals.get(email)
+        if principal is None:
+            user = await self.call_user_by_email(email)
+            if not user:
+                raise cred_exc
+            principal = to_principal(user)
+            self.principals.set(principal)
+        # Tokens from before the last password change are revoked
+        if payload.get("ver", 0) != principal["token_version"]:
             raise cred_exc
-        return user
+        return principal
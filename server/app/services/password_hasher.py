@@ -0,0 +1,141 @@
+"""bcrypt hashing and verification on a dedicated, bounded thread pool"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+
+class HasherBusy(Exception):
+    """Too many hash/verify calls are already waiting; try again shortly"""
+
+
+class LatencyStats:
+    """Count plus percentiles over the most recent `window` samples (seconds)"""
+
+    def __init__(self, window: int = 1000):
+        self.count = 0
+        self.total = 0.0
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self._samples.append(seconds)
+
+    def summary(self) -> Dict:
+        samples = sorted(self._samples)
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000 if samples else 0.0
+
+        return {
+            "count": self.count,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": samples[-1] * 1000 if samples else 0.0,
+        }
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop on its own small thread pool.
+
+    bcrypt releases the GIL, so `workers` hashes run in parallel without
+    touching the threadpool Starlette uses for everything else. At most
+    `max_pending` calls may be running or queued; past that, calls fail
+    fast with HasherBusy instead of piling up, so a login storm can't
+    make every other request wait behind it. Queue wait and bcrypt time
+    are recorded separately for stats().
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.HASH_WORKERS,
+        max_pending: int = settings.HASH_MAX_PENDING,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._queue_wait = LatencyStats()
+        self._timings = {"hash": LatencyStats(), "verify": LatencyStats()}
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, operation: str, fn, *args):
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusy("Password hashing is overloaded, please retry")
+        self._pending += 1
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._queue_wait.add(started - submitted)
+                    self._timings[operation].add(finished - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), timed)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run("verify", self.context.verify, password, hashed)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch without hogging the pool: only `workers` of its
+        hashes are queued at a time, so interactive calls interleave, and
+        the batch backs off rather than fails while the pool is busy."""
+        limit = asyncio.Semaphore(self.workers)
+
+        async def one(password: str) -> str:
+            async with limit:
+                while True:
+                    try:
+                        return await self.hash(password)
+                    except HasherBusy:
+                        await asyncio.sleep(0.05)
+
+        return await asyncio.gather(*(one(p) for p in passwords))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "rejected": self.rejected,
+                "queue_wait": self._queue_wait.summary(),
+                "hash": self._timings["hash"].summary(),
+                "verify": self._timings["verify"].summary(),
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Singleton
+password_hasher = PasswordHasher()
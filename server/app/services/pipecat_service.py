@@ -1,16 +1,225 @@
 import os
-import subprocess
-from typing import Optional
+import asyncio
+import shlex
+import time
+from collections import deque
+from typing import Dict, Optional
 import httpx
+from app.core.config import settings
+
+class BotWorker:
+    """One bot process (spawned or external) and the interviews assigned to it"""
+
+    def __init__(self, worker_id: str, url: str, capacity: int, port: Optional[int] = None):
+        self.worker_id = worker_id
+        self.url = url
+        self.port = port
+        self.capacity = capacity
+        self.sessions: set = set()
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.healthy = False
+        self.last_heartbeat: Optional[float] = None
+
+    @property
+    def load(self) -> float:
+        return len(self.sessions) / self.capacity if self.capacity else 1.0
+
+    def has_capacity(self) -> bool:
+        return self.healthy and len(self.sessions) < self.capacity
+
+    def to_dict(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "url": self.url,
+            "capacity": self.capacity,
+            "active_sessions": sorted(self.sessions),
+            "healthy": self.healthy,
+            "last_heartbeat": self.last_heartbeat,
+            "pid": self.process.pid if self.process else None,
+        }
 
 class PipecatService:
+    """Schedules interviews onto a pool of pre-warmed bot workers.
+
+    BOT_WORKERS processes are spawned at startup (each loads its VAD and
+    turn models once), plus any external BOT_WORKER_URLS. Health comes from
+    heartbeats: periodic HTTP probes, and heartbeat messages workers send
+    over /ws/pipecat. Interviews go to the least-loaded healthy worker and
+    wait in a FIFO queue when every worker is full.
+    """
+
     def __init__(self):
         self.active_bots = {}
-        self.pipecat_path = "/mnt/e/Coding Playground/QuantumHex/AI Avatar Interview Website/pipecat-quickstart"
-        self.bot_base_url = "http://localhost:7861"
-    
+        self.pipecat_path = settings.PIPECAT_PATH or os.path.abspath(
+            os.path.join(os.path.dirname(__file__), "..", "..", "..", "pipecat-quickstart")
+        )
+        self.bot_base_url = settings.BOT_BASE_URL
+        self.workers: Dict[str, BotWorker] = {}
+        self.assignments: Dict[int, str] = {}
+        self.waiting: deque = deque()
+        self._lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    # --- Pool lifecycle ---
+    async def start(self):
+        """Spawn the worker pool and start health checks (app startup)"""
+        self._http = httpx.AsyncClient(timeout=settings.BOT_HEARTBEAT_TIMEOUT)
+        for i in range(settings.BOT_WORKERS):
+            port = settings.BOT_BASE_PORT + i
+            worker = BotWorker(f"worker-{i}", f"http://{settings.BOT_HOST}:{port}",
+                               settings.BOT_WORKER_CAPACITY, port=port)
+            self.workers[worker.worker_id] = worker
+            await self._spawn(worker)
+        for i, url in enumerate(u.strip() for u in settings.BOT_WORKER_URLS.split(",") if u.strip()):
+            worker = BotWorker(f"external-{i}", url, settings.BOT_WORKER_CAPACITY)
+            self.workers[worker.worker_id] = worker
+        if self.workers:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self):
+        """Stop health checks and terminate spawned workers (app shutdown)"""
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        for worker in self.workers.values():
+            if worker.process and worker.process.returncode is None:
+                worker.process.terminate()
+                try:
+                    await asyncio.wait_for(worker.process.wait(), timeout=10)
+                except asyncio.TimeoutError:
+                    worker.process.kill()
+        if self._http:
+            await self._http.aclose()
+            self._http = None
+
+    async def _spawn(self, worker: BotWorker):
+        command = shlex.split(settings.BOT_WORKER_COMMAND.format(port=worker.port))
+        env = {**os.environ, "BOT_WORKER_ID": worker.worker_id}
+        try:
+            worker.process = await asyncio.create_subprocess_exec(*command, cwd=self.pipecat_path, env=env)
+        except Exception as e:
+            print(f"Failed to spawn bot {worker.worker_id}: {e}")
+            worker.process = None
+        worker.healthy = False
+
+    async def _health_loop(self):
+        while True:
+            try:
+                await asyncio.gather(*(self._check(w) for w in list(self.workers.values())))
+                await self._drain_waiting()
+            except Exception as e:
+                print(f"Bot health check failed: {e}")
+            await asyncio.sleep(settings.BOT_HEARTBEAT_INTERVAL)
+
+    async def _check(self, worker: BotWorker):
+        if worker.port is not None and (worker.process is None or worker.process.returncode is not None):
+            print(f"Bot {worker.worker_id} is not running, respawning")
+            await self._requeue(worker)
+            await self._spawn(worker)
+            return
+        try:
+            response = await self._http.get(worker.url)
+            alive = response.status_code < 500
+        except httpx.HTTPError:
+            alive = False
+        if alive:
+            self.record_heartbeat(worker.worker_id)
+        elif worker.last_heartbeat is None or time.time() - worker.last_heartbeat > settings.BOT_HEARTBEAT_TIMEOUT:
+            worker.healthy = False
+
+    def record_heartbeat(self, worker_id: str):
+        """Mark a worker alive; called by probes and by worker heartbeat messages"""
+        worker = self.workers.get(worker_id)
+        if not worker:
+            return
+        worker.healthy = True
+        worker.last_heartbeat = time.time()
+
+    async def _requeue(self, worker: BotWorker):
+        """A worker died: put its interviews back at the front of the queue"""
+        async with self._lock:
+            worker.healthy = False
+            for session_id in sorted(worker.sessions, reverse=True):
+                self.assignments.pop(session_id, None)
+                if session_id in self.active_bots:
+                    self.waiting.appendleft(session_id)
+            worker.sessions.clear()
+
+    # --- Scheduling ---
+    def _pick_worker(self) -> Optional[BotWorker]:
+        candidates = [w for w in self.workers.values() if w.has_capacity()]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda w: (w.load, w.worker_id))
+
+    def _assign_locked(self, session_id: int) -> Optional[BotWorker]:
+        worker = self._pick_worker()
+        if worker is None:
+            return None
+        worker.sessions.add(session_id)
+        self.assignments[session_id] = worker.worker_id
+        return worker
+
+    async def _assign(self, session_id: int) -> Optional[BotWorker]:
+        async with self._lock:
+            return self._assign_locked(session_id)
+
+    async def _pick_and_pop(self):
+        """Take the next queued interview and assign it, atomically.
+
+        Returns (session_id, worker), or None when the queue is empty or
+        no worker has capacity.
+        """
+        async with self._lock:
+            while self.waiting and self.waiting[0] not in self.active_bots:
+                self.waiting.popleft()
+            if not self.waiting:
+                return None
+            worker = self._assign_locked(self.waiting[0])
+            if worker is None:
+                return None
+            return self.waiting.popleft(), worker
+
+    async def _dispatch(self, session_id: int, worker: Optional[BotWorker]):
+        """Tell the bot(s) about the interview"""
+        from app.services.websocket_service import manager
+        from app.core.database import get_db
+
+        # Get candidate_id from interview
+        candidate_id = None
+        db = get_db()
+        if db:
+            interview = await db.table("interview").select("candidate_id").eq("id", session_id).execute()
+            candidate_id = interview.data[0]["candidate_id"] if interview.data else None
+
+        await manager.send_to_pipecat({
+            "type": "start_interview",
+            "interview_id": session_id,
+            "candidate_id": candidate_id,
+            "worker_id": worker.worker_id if worker else None,
+            "config": self.active_bots[session_id]
+        })
+
+    async def _drain_waiting(self):
+        """Assign queued interviews as soon as capacity frees up"""
+        from app.core.database import get_db
+        while True:
+            picked = await self._pick_and_pop()
+            if picked is None:
+                return
+            session_id, worker = picked
+            try:
+                db = get_db()
+                if db:
+                    await db.table("interview").update({"bot_url": worker.url}).eq("id", session_id).execute()
+                await self._dispatch(session_id, worker)
+            except Exception as e:
+                print(f"Failed to dispatch queued interview {session_id}: {e}")
+
     async def start_bot(self, session_id: str, config: dict) -> dict:
-        """Start a Pipecat bot for an interview session"""
+        """Assign an interview session to a Pipecat bot worker"""
         try:
             # Store session config for bot customization
             self.active_bots[session_id] = {
@@ -18,50 +227,76 @@ class PipecatService:
                 "required_skills": ", ".join(config.get("required_skills", [])),
                 "language": config.get("language", "en")
             }
-            
-            # Set environment variable for bot to access
-            os.environ["INTERVIEW_ID"] = str(session_id)
-            
-            # Notify Pipecat about new interview
-            from app.services.websocket_service import manager
-            from app.core.database import supabase
-            
-            # Get candidate_id from interview
-            interview = supabase.table("interview").select("candidate_id").eq("id", session_id).execute()
-            candidate_id = interview.data[0]["candidate_id"] if interview.data else None
-            
-            await manager.send_to_pipecat({
-                "type": "start_interview",
-                "interview_id": session_id,
-                "candidate_id": candidate_id,
-                "config": self.active_bots[session_id]
-            })
-            
-            # Bot is already running, just return connection details
-            # In production, you'd start a new bot instance per session
+
+            if not self.workers:
+                # No pool configured: a single externally started bot serves everything
+                await self._dispatch(session_id, None)
+                return {
+                    "session_id": session_id,
+                    "bot_url": self.bot_base_url,
+                    "status": "ready",
+                    "config": self.active_bots[session_id]
+                }
+
+            worker = await self._assign(session_id)
+            if worker is None:
+                if session_id not in self.waiting:
+                    self.waiting.append(session_id)
+                return {
+                    "session_id": session_id,
+                    "bot_url": None,
+                    "status": "queued",
+                    "queue_position": list(self.waiting).index(session_id) + 1,
+                    "config": self.active_bots[session_id]
+                }
+
+            await self._dispatch(session_id, worker)
             return {
                 "session_id": session_id,
-                "bot_url": self.bot_base_url,
+                "bot_url": worker.url,
+                "worker_id": worker.worker_id,
                 "status": "ready",
                 "config": self.active_bots[session_id]
             }
         except Exception as e:
             raise Exception(f"Failed to start bot: {str(e)}")
-    
+
     async def stop_bot(self, session_id: str) -> bool:
-        """Stop a Pipecat bot and retrieve transcript"""
+        """Release the session's worker slot"""
         if session_id in self.active_bots:
             # In production, retrieve transcript from bot before stopping
-            config = self.active_bots[session_id]
             del self.active_bots[session_id]
+            async with self._lock:
+                worker_id = self.assignments.pop(session_id, None)
+                if worker_id in self.workers:
+                    self.workers[worker_id].sessions.discard(session_id)
+            await self._drain_waiting()
             return True
         return False
-    
+
     async def get_transcript(self, session_id: str) -> Optional[list]:
         """Get interview transcript for a session"""
         # In production, fetch from bot or database
         return None
-    
+
     def get_bot_status(self, session_id: str) -> Optional[dict]:
         """Get bot status for a session"""
-        return self.active_bots.get(session_id)
+        config = self.active_bots.get(session_id)
+        if config is None:
+            return None
+        worker_id = self.assignments.get(session_id)
+        return {
+            **config,
+            "worker_id": worker_id,
+            "bot_url": self.workers[worker_id].url if worker_id else None,
+            "queued": session_id in self.waiting,
+        }
+
+    def pool_status(self) -> dict:
+        return {
+            "workers": [w.to_dict() for w in self.workers.values()],
+            "queued_sessions": list(self.waiting),
+        }
+
+# Singleton
+pipecat_service = PipecatService()
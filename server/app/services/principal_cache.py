@@ -0,0 +1,62 @@
+"""Short-lived cache of authenticated users, keyed by email"""
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# User columns a request needs once authenticated; never the password hash
+PRINCIPAL_FIELDS = ("_id", "email", "name", "role", "token_version", "must_reset_password")
+
+
+def to_principal(user: dict) -> dict:
+    principal = {field: user.get(field) for field in PRINCIPAL_FIELDS}
+    principal["token_version"] = principal["token_version"] or 0
+    return principal
+
+
+class PrincipalCache:
+    """LRU of principals that expire after `ttl` seconds.
+
+    Lets token checks skip the User lookup on the hot path. Entries are
+    dropped explicitly when a user's credentials change; other processes
+    pick the change up within `ttl`.
+    """
+
+    def __init__(self, max_entries: int = settings.AUTH_PRINCIPAL_CACHE_SIZE,
+                 ttl: float = settings.AUTH_PRINCIPAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> Optional[dict]:
+        entry = self._data.get(email)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._data.move_to_end(email)
+                self.hits += 1
+                return entry[1]
+            del self._data[email]
+        self.misses += 1
+        return None
+
+    def set(self, principal: dict):
+        email = principal["email"]
+        self._data[email] = (time.monotonic() + self.ttl, principal)
+        self._data.move_to_end(email)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def invalidate(self, email: str):
+        self._data.pop(email, None)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,250 @@
+"""Chunks uploaded resumes and stores their embeddings in ai_context"""
+import asyncio
+import hashlib
+import re
+import sqlite3
+import threading
+from typing import List, Optional, Set, Tuple
+
+from google import generativeai as genai
+
+from app.core.config import settings
+from app.core.database import get_admin_db
+
+# Must match the RAG service's model so queries and chunks share a vector space
+EMBEDDING_MODEL = "models/text-embedding-004"
+# Most texts the embedding API accepts in one request
+MAX_EMBED_BATCH = 100
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+# ai_context source for resume chunks: source_id is the candidate id and
+# chunk_index the chunk number, so one resume is filtered by source_id
+RESUME_SOURCE = "resume"
+
+
+def chunk_text(text: str, size: int = settings.RESUME_CHUNK_CHARS,
+               overlap: int = settings.RESUME_CHUNK_OVERLAP) -> List[str]:
+    """Split text into ~`size`-character chunks that overlap by ~`overlap`
+    characters, breaking on whitespace so words are never cut in half"""
+    text = _WHITESPACE.sub(" ", text).strip()
+    overlap = min(overlap, size // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Searching past start + overlap guarantees the next chunk moves forward
+            space = text.rfind(" ", start + overlap + 1, end)
+            if space != -1:
+                end = space
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        # Back up by the overlap, then forward to the start of a word
+        space = text.find(" ", end - overlap, end)
+        start = space + 1 if space != -1 else end
+    return [chunk for chunk in chunks if chunk]
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ResumeIngestionQueue:
+    """Background workers that chunk, embed and store uploaded resumes.
+
+    Uploads only enqueue; the embedding requests run on the worker pool.
+    Pending work is kept in a SQLite file, one row per candidate, so it
+    survives restarts and a resume replaced before its predecessor was
+    processed is only embedded once. Chunks whose text is unchanged since
+    the last upload keep their stored embedding.
+    """
+
+    def __init__(
+        self,
+        db_path: str = settings.RESUME_INGEST_QUEUE_PATH,
+        workers: int = settings.RESUME_INGEST_WORKERS,
+        max_attempts: int = settings.RESUME_INGEST_MAX_ATTEMPTS,
+        retry_delay: float = settings.RESUME_INGEST_RETRY_DELAY,
+        embed_batch: int = settings.RESUME_EMBED_BATCH,
+    ):
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        self.db_path = db_path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.embed_batch = min(embed_batch, MAX_EMBED_BATCH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Candidates waiting in the asyncio queue or being worked on
+        self._queued: Set[int] = set()
+        self._active: Set[int] = set()
+
+    # --- Storage ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # text NULL = remove the candidate's chunks; version grows on every upload
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resume_ingest_jobs (
+                    candidate_id INTEGER PRIMARY KEY,
+                    text TEXT,
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return rows
+
+    async def _run(self, sql: str, params: tuple = ()) -> List[tuple]:
+        return await asyncio.to_thread(self._execute, sql, params)
+
+    # --- Public API ---
+    async def enqueue(self, candidate_id: int, text: Optional[str]):
+        """Schedule (re)ingestion of a resume; text=None deletes its chunks"""
+        await self._run(
+            "INSERT INTO resume_ingest_jobs (candidate_id, text, version) VALUES (?, ?, 1) "
+            "ON CONFLICT(candidate_id) DO UPDATE SET text = excluded.text, version = version + 1",
+            (candidate_id, text),
+        )
+        self._schedule(candidate_id)
+
+    def _schedule(self, candidate_id: int):
+        # An active candidate is re-queued by its worker once it finishes
+        if self._queue is None or candidate_id in self._queued or candidate_id in self._active:
+            return
+        self._queued.add(candidate_id)
+        self._queue.put_nowait(candidate_id)
+
+    async def start(self):
+        """Start workers and resume anything left pending by the last run"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        for (candidate_id,) in await self._run("SELECT candidate_id FROM resume_ingest_jobs"):
+            self._schedule(candidate_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop workers; pending resumes are picked up again on next start()"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+        self._active.clear()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # --- Workers ---
+    async def _take(self, candidate_id: int) -> Optional[Tuple[Optional[str], int]]:
+        rows = await self._run(
+            "SELECT text, version FROM resume_ingest_jobs WHERE candidate_id = ?", (candidate_id,)
+        )
+        return rows[0] if rows else None
+
+    async def _worker(self):
+        while True:
+            candidate_id = await self._queue.get()
+            self._queued.discard(candidate_id)
+            self._active.add(candidate_id)
+            job = None
+            try:
+                job = await self._take(candidate_id)
+                if job is not None:
+                    await self._process(candidate_id, job[0])
+            except Exception as e:
+                print(f"Resume ingestion failed for candidate {candidate_id}: {e}")
+            finally:
+                self._active.discard(candidate_id)
+                try:
+                    if job is not None:
+                        # Done (or given up) with this version; a newer upload keeps its row
+                        await self._run(
+                            "DELETE FROM resume_ingest_jobs WHERE candidate_id = ? AND version = ?",
+                            (candidate_id, job[1]),
+                        )
+                        if await self._take(candidate_id) is not None:
+                            # Re-uploaded while we were working on the previous version
+                            self._schedule(candidate_id)
+                except Exception as e:
+                    print(f"Resume ingestion bookkeeping failed for candidate {candidate_id}: {e}")
+                self._queue.task_done()
+
+    async def _process(self, candidate_id: int, text: Optional[str]):
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                stored = await self.ingest(candidate_id, text or "")
+                print(f"Stored {stored} resume chunks for candidate {candidate_id}")
+                return
+            except Exception:
+                if attempts >= self.max_attempts:
+                    raise
+                await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
+
+    # --- Ingestion ---
+    async def _embed(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i:i + self.embed_batch] for i in range(0, len(texts), self.embed_batch)]
+        results = await asyncio.gather(*(
+            genai.embed_content_async(model=EMBEDDING_MODEL, content=batch) for batch in batches
+        ))
+        return [embedding for result in results for embedding in result["embedding"]]
+
+    async def ingest(self, candidate_id: int, text: str) -> int:
+        """Replace the candidate's resume chunks in ai_context; returns the chunk count"""
+        db = get_admin_db()
+        if db is None:
+            raise RuntimeError("Database is not configured")
+        chunks = [f"[Resume] {chunk}" for chunk in chunk_text(text)]
+
+        existing = await db.table("ai_context").select("chunk_index, content_hash").eq(
+            "source", RESUME_SOURCE
+        ).eq("source_id", candidate_id).execute()
+        stored_hashes = {row["chunk_index"]: row["content_hash"] for row in existing.data}
+        changed = [
+            (index, chunk, content_hash(chunk))
+            for index, chunk in enumerate(chunks)
+            if stored_hashes.get(index) != content_hash(chunk)
+        ]
+
+        if changed:
+            embeddings = await self._embed([chunk for _, chunk, _ in changed])
+            rows = [
+                {
+                    "source": RESUME_SOURCE,
+                    "source_id": candidate_id,
+                    "chunk_index": index,
+                    "content": chunk,
+                    "content_hash": digest,
+                    "embedding": embedding,
+                }
+                for (index, chunk, digest), embedding in zip(changed, embeddings)
+            ]
+            await db.table("ai_context").upsert(rows, on_conflict="source,source_id,chunk_index").execute()
+        if any(index >= len(chunks) for index in stored_hashes):
+            # The new resume is shorter; drop the old tail
+            await db.table("ai_context").delete().eq("source", RESUME_SOURCE).eq(
+                "source_id", candidate_id
+            ).gte("chunk_index", len(chunks)).execute()
+        return len(chunks)
+
+
+# Singleton
+resume_ingestion = ResumeIngestionQueue()
@@ -0,0 +1,132 @@
+"""PDF resume text extraction on a process pool, cached by file hash"""
+import asyncio
+import hashlib
+import io
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Bytes read from the upload per await, so oversized files are rejected early
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class ResumeTooLarge(Exception):
+    """The upload exceeds RESUME_MAX_BYTES or RESUME_MAX_PAGES"""
+
+
+class ResumeParseError(Exception):
+    """The upload is not a readable PDF"""
+
+
+def extract_pdf_text(data: bytes, max_pages: int) -> str:
+    """Text of every page, in order (runs in a worker process).
+
+    pdfminer lays out one page at a time, so only the current page's
+    layout objects are held in memory rather than the whole document.
+    """
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    from pdfminer.pdfdocument import PDFEncryptionError, PDFTextExtractionNotAllowed
+    from pdfminer.pdfparser import PDFSyntaxError
+    from pdfminer.pdftypes import PDFException
+    from pdfminer.psparser import PSException
+
+    # Not every pdfminer release roots these in PSException, so name each base
+    malformed = (PSException, PDFException, PDFSyntaxError, PDFEncryptionError)
+
+    texts = []
+    try:
+        # One page past the limit tells us the document is too long
+        for page_number, page in enumerate(extract_pages(io.BytesIO(data), maxpages=max_pages + 1), 1):
+            if page_number > max_pages:
+                raise ResumeTooLarge(f"Resume should be at most {max_pages} pages")
+            for element in page:
+                if isinstance(element, LTTextContainer):
+                    text = element.get_text().strip()
+                    if text:
+                        texts.append(text)
+    except PDFTextExtractionNotAllowed:
+        raise ResumeParseError("PDF does not allow text extraction")
+    except malformed as e:
+        raise ResumeParseError(f"Could not read PDF: {e}")
+    return " ".join(texts)
+
+
+class ResumeParser:
+    """Parses uploaded PDFs in a process pool so the event loop and the
+    request threadpool never run pdfminer.
+
+    Uploads are read from their spooled temp file in size-checked chunks;
+    nothing is written to a shared folder. Parsed
+    text is cached by the file's SHA-256, so re-uploading the same PDF
+    skips parsing, and concurrent uploads of one file share a single parse.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.RESUME_PARSE_WORKERS,
+        max_bytes: int = settings.RESUME_MAX_BYTES,
+        max_pages: int = settings.RESUME_MAX_PAGES,
+        cache_size: int = settings.RESUME_PARSE_CACHE_SIZE,
+    ):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def read_upload(self, file) -> bytes:
+        """Read an UploadFile, rejecting it as soon as it passes max_bytes"""
+        too_large = ResumeTooLarge(f"Resume should be at most {self.max_bytes / (1024 * 1024):g} MB")
+        if file.size is not None and file.size > self.max_bytes:
+            raise too_large
+        buffer = io.BytesIO()
+        while True:
+            chunk = await file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return buffer.getvalue()
+            if buffer.tell() + len(chunk) > self.max_bytes:
+                raise too_large
+            buffer.write(chunk)
+
+    async def parse(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        text = self._cache.get(digest)
+        if text is not None:
+            self._cache.move_to_end(digest)
+            return text
+
+        future = self._inflight.get(digest)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._pool(), extract_pdf_text, data, self.max_pages)
+            self._inflight[digest] = future
+            future.add_done_callback(lambda _: self._inflight.pop(digest, None))
+        text = await asyncio.shield(future)
+
+        self._cache[digest] = text
+        self._cache.move_to_end(digest)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    async def parse_upload(self, file) -> str:
+        return await self.parse(await self.read_upload(file))
+
+
+# Singleton
+resume_parser = ResumeParser()
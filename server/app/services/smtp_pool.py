@@ -0,0 +1,142 @@
+"""Persistent SMTP connections shared by all outgoing mail"""
+import asyncio
+from email.message import Message
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+
+from app.core.config import settings
+
+# Worth reconnecting and trying again
+RETRYABLE_ERRORS = (
+    aiosmtplib.SMTPServerDisconnected,
+    aiosmtplib.SMTPConnectError,
+    aiosmtplib.SMTPTimeoutError,
+    ConnectionError,
+    asyncio.TimeoutError,
+)
+
+
+class SMTPPool:
+    """Up to `size` logged-in connections to one SMTP server.
+
+    Connections are opened lazily, kept open between messages and handed
+    out one message at a time, so at most `size` sends run against the
+    host concurrently. A connection the server dropped is reopened and the
+    message retried with exponential backoff; 4xx replies are retried too,
+    5xx (permanent) failures are not.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: bool = True,
+        size: int = settings.SMTP_POOL_SIZE,
+        max_attempts: int = settings.SMTP_MAX_ATTEMPTS,
+        retry_delay: float = settings.SMTP_RETRY_DELAY,
+        timeout: float = settings.SMTP_TIMEOUT,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._slots = asyncio.Semaphore(size)
+        self._all: List[aiosmtplib.SMTP] = []
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname, port=self.port, timeout=self.timeout, start_tls=self.start_tls,
+        )
+        try:
+            await client.connect()
+            if self.username:
+                await client.login(self.username, self.password)
+        except Exception:
+            client.close()
+            raise
+        self._all.append(client)
+        return client
+
+    async def _acquire(self) -> aiosmtplib.SMTP:
+        while self._idle:
+            client = self._idle.pop()
+            if client.is_connected:
+                return client
+            self._forget(client)
+        return await self._connect()
+
+    def _forget(self, client: aiosmtplib.SMTP):
+        if client in self._all:
+            self._all.remove(client)
+        client.close()
+
+    async def send(self, message: Message):
+        async with self._slots:
+            attempts = 0
+            while True:
+                attempts += 1
+                client = None
+                try:
+                    client = await self._acquire()
+                    await client.send_message(message)
+                    self._idle.append(client)
+                    return
+                except aiosmtplib.SMTPResponseException as e:
+                    # The connection is still usable after an error reply
+                    if client is not None and client.is_connected:
+                        self._idle.append(client)
+                    if not 400 <= e.code < 500 or attempts >= self.max_attempts:
+                        raise
+                except RETRYABLE_ERRORS:
+                    if client is not None:
+                        self._forget(client)
+                    if attempts >= self.max_attempts:
+                        raise
+                except aiosmtplib.SMTPException:
+                    # e.g. every recipient refused; don't trust the session's state
+                    if client is not None:
+                        self._forget(client)
+                    raise
+                except Exception:
+                    # Rejected before anything was sent (e.g. no From header)
+                    if client is not None and client.is_connected:
+                        self._idle.append(client)
+                    raise
+                await asyncio.sleep(self.retry_delay * 2 ** (attempts - 1))
+
+    async def close(self):
+        clients, self._all, self._idle = self._all, [], []
+        for client in clients:
+            try:
+                await client.quit()
+            except Exception:
+                client.close()
+
+
+_pools: Dict[Tuple[str, int, Optional[str]], SMTPPool] = {}
+
+
+def get_pool(hostname: str, port: int, username: Optional[str] = None,
+             password: Optional[str] = None, start_tls: bool = True) -> SMTPPool:
+    """The shared pool for a host/port/login, created on first use"""
+    key = (hostname, port, username)
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = SMTPPool(hostname, port, username, password, start_tls)
+    return pool
+
+
+async def close_pools():
+    """Close every pooled connection (called on app shutdown)"""
+    pools = list(_pools.values())
+    _pools.clear()
+    await asyncio.gather(*(pool.close() for pool in pools), return_exceptions=True)
@@ -0,0 +1,130 @@
+"""Local SMTP stand-in for invite throughput tests.
+
+Accepts any login and message and discards it, optionally after a
+simulated per-message delay. Replies queued in `failures` are sent
+instead of "250" for the next messages (None drops the connection). Run it and point the mailer at it:
+
+    python -m app.services.smtp_sink --port 1025 --latency 0.05
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_START_TLS=false SMTP_USER= ...
+
+`--bench N` instead starts the sink in-process, sends N messages through
+the SMTP pool and prints the throughput.
+"""
+import argparse
+import asyncio
+import time
+from collections import deque
+from email.mime.text import MIMEText
+
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 1025, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.messages = 0
+        self.connections = 0
+        self.failures = deque()
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._session, self.host, self.port)
+        # Port 0 picks a free port
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+
+        async def reply(line: str):
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        try:
+            await reply("220 smtp-sink ready")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                command = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+                if command == "EHLO":
+                    writer.write(b"250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n")
+                    await reply("250 8BITMIME")
+                elif command == "AUTH":
+                    await reply("235 Authentication successful")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b".\n", b""):
+                        pass
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    if self.failures:
+                        failure = self.failures.popleft()
+                        if failure is None:
+                            return
+                        await reply(failure)
+                        continue
+                    self.messages += 1
+                    await reply("250 OK queued")
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    return
+                elif command in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                    await reply("250 OK")
+                else:
+                    await reply("502 Command not implemented")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def _bench(count: int, latency: float, pool_size: int):
+    from app.services.smtp_pool import SMTPPool
+
+    sink = SMTPSink(port=0, latency=latency)
+    await sink.start()
+    pool = SMTPPool("127.0.0.1", sink.port, start_tls=False, size=pool_size)
+
+    def message(i: int) -> MIMEText:
+        msg = MIMEText(f"<p>Invite {i}</p>", "html")
+        msg["From"] = "bench@localhost"
+        msg["To"] = f"candidate{i}@localhost"
+        msg["Subject"] = "TalentLoop - Interview Invite"
+        return msg
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.send(message(i)) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    await pool.close()
+    await sink.stop()
+    print(f"{sink.messages} messages over {sink.connections} connections in {elapsed:.2f}s "
+          f"({sink.messages / elapsed:.0f} msg/s, pool size {pool_size}, latency {latency}s)")
+
+
+async def _serve(host: str, port: int, latency: float):
+    sink = SMTPSink(host, port, latency)
+    await sink.start()
+    print(f"SMTP sink listening on {host}:{sink.port}")
+    while True:
+        await asyncio.sleep(10)
+        print(f"{sink.messages} messages over {sink.connections} connections")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per message")
+    parser.add_argument("--bench", type=int, default=0, help="send this many messages and exit")
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+    if args.bench:
+        asyncio.run(_bench(args.bench, args.latency, args.pool_size))
+    else:
+        asyncio.run(_serve(args.host, args.port, args.latency))
@@ -1,49 +1,201 @@
 from fastapi import WebSocket
-from typing import Dict, Set
-import json
+from typing import Dict, Optional
+from collections import OrderedDict
+import asyncio
+import time
+import uuid
+from app.core.config import settings
+
+class WorkerConnection:
+    """One connected pipecat worker with its own bounded outbound queue"""
+
+    def __init__(self, worker_id: str, websocket: WebSocket):
+        self.worker_id = worker_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.last_seen = time.time()
+        self.active_sessions = 0
+        # start_interview messages sent but not yet picked up by a client
+        self.inflight: Dict[int, dict] = {}
+        self.sender: Optional[asyncio.Task] = None
+
+    @property
+    def load(self) -> int:
+        return self.active_sessions + len(self.inflight)
 
 class WebSocketManager:
+    """Hub for many pipecat workers on /ws/pipecat.
+
+    Workers are keyed by the worker_id query parameter. start_interview
+    messages go to the requested worker, or the least-loaded one, and are
+    re-dispatched if that worker drops before a client picks them up.
+    Each connection has a bounded send queue: a worker that can't keep up
+    applies backpressure to senders and is dropped after WS_SEND_TIMEOUT.
+    """
+
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.pipecat_connection: WebSocket = None
-        self.pending_interviews: Dict[int, dict] = {}
-    
-    async def connect_pipecat(self, websocket: WebSocket):
+        self.active_connections: Dict[str, WorkerConnection] = {}
+        self.pending_interviews: "OrderedDict[int, dict]" = OrderedDict()
+        self._ping_task: Optional[asyncio.Task] = None
+
+    @property
+    def pipecat_connection(self) -> Optional[WebSocket]:
+        """Any connected worker (kept for single-bot callers)"""
+        conn = next(iter(self.active_connections.values()), None)
+        return conn.websocket if conn else None
+
+    async def connect_pipecat(self, websocket: WebSocket) -> WorkerConnection:
         await websocket.accept()
-        self.pipecat_connection = websocket
-        
-        # Send any pending interviews
+        worker_id = websocket.query_params.get("worker_id") or f"anon-{uuid.uuid4().hex[:8]}"
+
+        previous = self.active_connections.get(worker_id)
+        if previous:
+            await self._drop(previous, redispatch=False)
+
+        conn = WorkerConnection(worker_id, websocket)
+        conn.sender = asyncio.create_task(self._send_loop(conn))
+        self.active_connections[worker_id] = conn
+        if self._ping_task is None or self._ping_task.done():
+            self._ping_task = asyncio.create_task(self._ping_loop())
+
+        # Send any pending interviews this worker can take
         for interview_id, message in list(self.pending_interviews.items()):
-            await self.send_to_pipecat(message)
-            del self.pending_interviews[interview_id]
-    
-    async def disconnect_pipecat(self):
-        self.pipecat_connection = None
-    
+            if message.get("worker_id") in (None, worker_id):
+                del self.pending_interviews[interview_id]
+                await self.send_to_pipecat(message)
+        return conn
+
+    async def disconnect_pipecat(self, conn: WorkerConnection):
+        # By identity: a reconnect under the same worker_id must not be dropped
+        # when the replaced socket's handler unwinds
+        await self._drop(conn)
+
+    async def _drop(self, conn: WorkerConnection, redispatch: bool = True):
+        if self.active_connections.get(conn.worker_id) is conn:
+            del self.active_connections[conn.worker_id]
+        if conn.sender:
+            conn.sender.cancel()
+        try:
+            await conn.websocket.close()
+        except Exception:
+            pass
+
+        inflight = list(conn.inflight.values())
+        conn.inflight.clear()
+        for message in inflight:
+            if redispatch and message.get("worker_id") == conn.worker_id:
+                # Pinned to this worker: wait for it to reconnect
+                self._hold(message)
+            elif redispatch:
+                print(f"Re-dispatching interview {message.get('interview_id')} from {conn.worker_id}")
+                await self.send_to_pipecat(message)
+            else:
+                self._hold(message)
+
+    def _hold(self, message: dict):
+        interview_id = message.get("interview_id")
+        self.pending_interviews[interview_id] = message
+        self.pending_interviews.move_to_end(interview_id)
+        while len(self.pending_interviews) > settings.WS_MAX_PENDING:
+            dropped, _ = self.pending_interviews.popitem(last=False)
+            print(f"Pending interview queue full, dropped interview {dropped}")
+
+    def _pick(self, worker_id: Optional[str]) -> Optional[WorkerConnection]:
+        if worker_id:
+            return self.active_connections.get(worker_id)
+        if not self.active_connections:
+            return None
+        return min(self.active_connections.values(), key=lambda c: (c.load, c.worker_id))
+
     async def send_to_pipecat(self, message: dict):
-        if self.pipecat_connection:
-            await self.pipecat_connection.send_json(message)
-        else:
-            # Store for when Pipecat connects
-            if message.get("type") == "start_interview":
-                interview_id = message.get("interview_id")
-                self.pending_interviews[interview_id] = message
-    
-    async def handle_pipecat_message(self, message: dict):
+        if message.get("type") != "start_interview":
+            # Notifications go to every worker and are dropped where the queue is full
+            for conn in list(self.active_connections.values()):
+                try:
+                    conn.queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    print(f"Send queue full for {conn.worker_id}, dropping {message.get('type')}")
+            return
+
+        # A fresh dispatch supersedes anything still held for this interview
+        self.pending_interviews.pop(message.get("interview_id"), None)
+        conn = self._pick(message.get("worker_id"))
+        if conn is None:
+            # Store for when a suitable worker connects
+            self._hold(message)
+            return
+
+        conn.inflight[message.get("interview_id")] = message
+        try:
+            await asyncio.wait_for(conn.queue.put(message), timeout=settings.WS_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Worker {conn.worker_id} is not draining its queue, disconnecting")
+            await self._drop(conn)
+
+    async def notify_context_changed(self, **ids):
+        """Tell bots to drop cached interview context for these candidate/job/company ids"""
+        await self.send_to_pipecat({"type": "context_invalidated", **ids})
+
+    async def _send_loop(self, conn: WorkerConnection):
+        try:
+            while True:
+                message = await conn.queue.get()
+                await conn.websocket.send_json(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Send to {conn.worker_id} failed: {e}")
+            asyncio.create_task(self._drop(conn))
+
+    async def _ping_loop(self):
+        while self.active_connections:
+            await asyncio.sleep(settings.WS_PING_INTERVAL)
+            now = time.time()
+            for conn in list(self.active_connections.values()):
+                if now - conn.last_seen > settings.WS_PING_TIMEOUT:
+                    print(f"Worker {conn.worker_id} missed pings, disconnecting")
+                    await self._drop(conn)
+                    continue
+                try:
+                    conn.queue.put_nowait({"type": "ping", "ts": now})
+                except asyncio.QueueFull:
+                    pass
+
+    async def handle_pipecat_message(self, message: dict, worker_id: Optional[str] = None):
         """Handle messages from Pipecat"""
         event_type = message.get("type")
-        
-        if event_type == "client_connected":
+        conn = self.active_connections.get(worker_id) if worker_id else None
+        if conn:
+            conn.last_seen = time.time()
+
+        if event_type == "pong":
+            return
+
+        if event_type == "heartbeat":
+            if conn and message.get("active_sessions") is not None:
+                conn.active_sessions = message["active_sessions"]
+            from app.services.pipecat_service import pipecat_service
+            pipecat_service.record_heartbeat(message.get("worker_id") or worker_id)
+
+        elif event_type == "client_connected":
             interview_id = message.get("interview_id")
             print(f"Client connected to interview {interview_id}")
-        
+            if conn:
+                conn.inflight.pop(interview_id, None)
+
         elif event_type == "client_disconnected":
             interview_id = message.get("interview_id")
             print(f"Client disconnected from interview {interview_id}")
+            if conn:
+                conn.inflight.pop(interview_id, None)
+            # Free the worker slot for queued interviews
+            from app.services.pipecat_service import pipecat_service
+            await pipecat_service.stop_bot(interview_id)
             # Update interview status
-            from app.core.database import supabase
-            if supabase:
-                supabase.table('interview').update({
+            from app.core.database import get_db
+            db = get_db()
+            if db:
+                await db.table('interview').update({
                     'status': 'completed'
                 }).eq('id', interview_id).execute()
 
@@ -7,9 +7,27 @@ CREATE TABLE "User" (
     email VARCHAR(255) NOT NULL UNIQUE,
     password VARCHAR(255) NOT NULL,
     role VARCHAR(50) NOT NULL,
+    -- Bumped on password change; tokens carrying an older value are rejected
+    token_version INTEGER NOT NULL DEFAULT 0,
     "creadtedAt" TIMESTAMP NOT NULL DEFAULT NOW(),
     "updatedAt" TIMESTAMP
 );
+-- Upgrading an existing User table
+ALTER TABLE "User" ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE "User" ADD COLUMN IF NOT EXISTS must_reset_password BOOLEAN NOT NULL DEFAULT FALSE;
+
+-- Replace a user's password and revoke their outstanding tokens. The bump
+-- happens in the database so concurrent resets never reuse a version.
+CREATE OR REPLACE FUNCTION set_user_password(p_user_id INTEGER, p_password TEXT, p_must_reset BOOLEAN)
+RETURNS SETOF "User" LANGUAGE sql AS $$
+    UPDATE "User"
+       SET password = p_password,
+           must_reset_password = p_must_reset,
+           token_version = token_version + 1,
+           "updatedAt" = NOW()
+     WHERE _id = p_user_id
+    RETURNING *;
+$$;
 
 -- Company Table
 CREATE TABLE "Company" (
@@ -21,17 +39,63 @@ CREATE TABLE "Company" (
     industry VARCHAR(100)
 );
 
+-- One row per embedded text, keyed by the row it came from. Only resumes
+-- have several chunks: source 'resume', the candidate id as source_id and
+-- the chunk number in chunk_index (written at upload time by the API server).
+-- Every other source has a single chunk 0.
 CREATE TABLE IF NOT EXISTS ai_context (
   id bigserial PRIMARY KEY,
   source text NOT NULL,
   source_id bigint NOT NULL,
+  chunk_index integer NOT NULL DEFAULT 0,
   content text NOT NULL,
-  embedding vector(1536) NOT NULL 
+  content_hash text,
+  embedding vector(1536) NOT NULL
 ); 
 CREATE index on ai_context
 using ivfflat (embedding vector_cosine_ops)
 with (lists = 100);
 
+-- Upgrading an existing ai_context: add the hash and chunk columns, move
+-- resume chunks stored as source 'resume:<candidate id>' to the keyed
+-- layout, drop duplicate rows from older full syncs, then add the key
+-- sync and resume ingestion upsert on
+ALTER TABLE ai_context ADD COLUMN IF NOT EXISTS content_hash text;
+ALTER TABLE ai_context ADD COLUMN IF NOT EXISTS chunk_index integer NOT NULL DEFAULT 0;
+ALTER TABLE ai_context DROP CONSTRAINT IF EXISTS ai_context_source_source_id_key;
+DROP INDEX IF EXISTS ai_context_source_key;
+UPDATE ai_context
+   SET chunk_index = source_id, source_id = split_part(source, ':', 2)::bigint, source = 'resume'
+ WHERE source LIKE 'resume:%';
+DELETE FROM ai_context a USING ai_context b
+WHERE a.source = b.source AND a.source_id = b.source_id AND a.chunk_index = b.chunk_index AND a.id < b.id;
+CREATE UNIQUE INDEX IF NOT EXISTS ai_context_source_chunk_key ON ai_context (source, source_id, chunk_index);
+
+-- Similarity search restricted to one source and/or specific rows
+-- (filter_source / filter_source_ids may be NULL to skip that filter)
+CREATE OR REPLACE FUNCTION match_ai_contexts_filtered(
+  query_embedding vector(1536),
+  match_limit int,
+  filter_source text,
+  filter_source_ids bigint[]
+)
+RETURNS TABLE (id bigint, source text, source_id bigint, content text, similarity float)
+LANGUAGE sql STABLE AS $$
+  SELECT id, source, source_id, content, 1 - (embedding <=> query_embedding) AS similarity
+  FROM ai_context
+  WHERE (filter_source IS NULL OR ai_context.source = filter_source)
+    AND (filter_source_ids IS NULL OR ai_context.source_id = ANY (filter_source_ids))
+  ORDER BY embedding <=> query_embedding
+  LIMIT match_limit;
+$$;
+
+-- Per-source high-water mark for incremental RAG sync
+CREATE TABLE IF NOT EXISTS rag_sync_state (
+  source text PRIMARY KEY,
+  watermark text,
+  synced_at timestamptz
+);
+
 -- Job Table
 CREATE TABLE "Job" (
     _id SERIAL PRIMARY KEY,
@@ -107,3 +171,233 @@ CREATE INDEX idx_interview_candidate ON interview(candidate_id);
 CREATE INDEX idx_interview_company ON interview(company_id);
 CREATE INDEX idx_interview_job ON interview(job_id);
 CREATE INDEX idx_report_interview ON "Report"(interview_id);
+
+-- Report aggregates, kept current by a trigger on "skill score" so summaries
+-- never rescan raw scores. The application writes skill scores by
+-- interview_id (see reportroute / analysis_queue).
+ALTER TABLE "skill score" ADD COLUMN IF NOT EXISTS interview_id INTEGER REFERENCES interview(id);
+
+-- Per-skill weights for the weighted leaderboard score
+ALTER TABLE "Job_Requirements" ADD COLUMN IF NOT EXISTS weight NUMERIC NOT NULL DEFAULT 1;
+
+-- One row per interview: how many skills were scored, their plain and
+-- weighted totals, and the report's overall score. Doubles as the
+-- per-job ranking index behind the leaderboard.
+CREATE TABLE IF NOT EXISTS interview_score_summary (
+    interview_id INTEGER PRIMARY KEY REFERENCES interview(id),
+    job_id INTEGER,
+    skill_count INTEGER NOT NULL DEFAULT 0,
+    score_total BIGINT NOT NULL DEFAULT 0,
+    average_score NUMERIC GENERATED ALWAYS AS (
+        CASE WHEN skill_count > 0 THEN score_total::numeric / skill_count END
+    ) STORED
+);
+-- Upgrading a summary table created before the leaderboard
+ALTER TABLE interview_score_summary ADD COLUMN IF NOT EXISTS overall_score INTEGER;
+ALTER TABLE interview_score_summary ADD COLUMN IF NOT EXISTS weighted_total NUMERIC NOT NULL DEFAULT 0;
+ALTER TABLE interview_score_summary ADD COLUMN IF NOT EXISTS weight_total NUMERIC NOT NULL DEFAULT 0;
+-- Rounded so it survives the JSON round trip in leaderboard cursors exactly
+ALTER TABLE interview_score_summary ADD COLUMN IF NOT EXISTS weighted_score NUMERIC GENERATED ALWAYS AS (
+    CASE WHEN weight_total > 0 THEN round(weighted_total / weight_total, 4) END
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_interview_score_summary_job
+    ON interview_score_summary (job_id, average_score);
+-- Keyset pagination for the leaderboard: (score DESC, interview_id DESC) within a job
+CREATE INDEX IF NOT EXISTS idx_interview_score_summary_overall
+    ON interview_score_summary (job_id, overall_score DESC, interview_id DESC) WHERE overall_score IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_interview_score_summary_weighted
+    ON interview_score_summary (job_id, weighted_score DESC, interview_id DESC) WHERE weighted_score IS NOT NULL;
+
+-- One row per (job, skill): running sums and a 10-bucket histogram
+-- (0-9, 10-19, ..., 90-100)
+CREATE TABLE IF NOT EXISTS job_skill_stats (
+    job_id INTEGER NOT NULL,
+    skill VARCHAR(255) NOT NULL,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    score_total BIGINT NOT NULL DEFAULT 0,
+    score_sq_total BIGINT NOT NULL DEFAULT 0,
+    histogram INTEGER[] NOT NULL DEFAULT array_fill(0, ARRAY[10]),
+    PRIMARY KEY (job_id, skill)
+);
+
+-- Add (sign = 1) or remove (sign = -1) one score from the aggregates
+CREATE OR REPLACE FUNCTION apply_skill_score(p_interview_id INTEGER, p_skill TEXT, p_score INTEGER, p_sign INTEGER)
+RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    v_job_id INTEGER;
+    v_weight NUMERIC;
+    v_bucket INTEGER := LEAST(GREATEST(p_score, 0) / 10, 9) + 1;
+BEGIN
+    IF p_interview_id IS NULL THEN
+        RETURN;
+    END IF;
+    SELECT job_id INTO v_job_id FROM interview WHERE id = p_interview_id;
+    SELECT weight INTO v_weight FROM "Job_Requirements" WHERE job_id = v_job_id AND skill = p_skill;
+    v_weight := COALESCE(v_weight, 1);
+    INSERT INTO interview_score_summary (interview_id, job_id, skill_count, score_total, weighted_total, weight_total)
+    VALUES (p_interview_id, v_job_id, p_sign, p_sign * p_score, p_sign * p_score * v_weight, p_sign * v_weight)
+    ON CONFLICT (interview_id) DO UPDATE
+        SET skill_count = interview_score_summary.skill_count + EXCLUDED.skill_count,
+            score_total = interview_score_summary.score_total + EXCLUDED.score_total,
+            weighted_total = interview_score_summary.weighted_total + EXCLUDED.weighted_total,
+            weight_total = interview_score_summary.weight_total + EXCLUDED.weight_total;
+    IF v_job_id IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO job_skill_stats (job_id, skill) VALUES (v_job_id, p_skill)
+    ON CONFLICT (job_id, skill) DO NOTHING;
+    UPDATE job_skill_stats
+       SET score_count = score_count + p_sign,
+           score_total = score_total + p_sign * p_score,
+           score_sq_total = score_sq_total + p_sign * p_score * p_score,
+           histogram[v_bucket] = histogram[v_bucket] + p_sign
+     WHERE job_id = v_job_id AND skill = p_skill;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION skill_score_aggregate_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_skill_score(OLD.interview_id, OLD.skill, OLD.score, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_skill_score(NEW.interview_id, NEW.skill, NEW.score, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS skill_score_aggregate ON "skill score";
+CREATE TRIGGER skill_score_aggregate
+    AFTER INSERT OR UPDATE OR DELETE ON "skill score"
+    FOR EACH ROW EXECUTE FUNCTION skill_score_aggregate_trigger();
+
+-- Keep the latest report's overall score on the interview's summary row
+CREATE OR REPLACE FUNCTION apply_report_score(p_interview_id INTEGER, p_overall_score INTEGER)
+RETURNS void LANGUAGE plpgsql AS $$
+BEGIN
+    INSERT INTO interview_score_summary (interview_id, job_id, overall_score)
+    SELECT p_interview_id, job_id, p_overall_score FROM interview WHERE id = p_interview_id
+    ON CONFLICT (interview_id) DO UPDATE SET overall_score = EXCLUDED.overall_score;
+END;
+$$;
+
+-- Re-read the interview's latest remaining report (NULL when none is left)
+CREATE OR REPLACE FUNCTION refresh_report_score(p_interview_id INTEGER)
+RETURNS void LANGUAGE sql AS $$
+    SELECT apply_report_score(p_interview_id, (
+        SELECT overallscore FROM "Report"
+         WHERE interview_id = p_interview_id
+         ORDER BY _id DESC LIMIT 1
+    ));
+$$;
+
+CREATE OR REPLACE FUNCTION report_score_trigger()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM refresh_report_score(OLD.interview_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND NEW.interview_id IS DISTINCT FROM OLD.interview_id) THEN
+        PERFORM refresh_report_score(NEW.interview_id);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS report_score ON "Report";
+CREATE TRIGGER report_score
+    AFTER INSERT OR UPDATE OF overallscore, interview_id OR DELETE ON "Report"
+    FOR EACH ROW EXECUTE FUNCTION report_score_trigger();
+
+-- Recompute a job's weighted scores after its skill weights change
+CREATE OR REPLACE FUNCTION rebuild_job_weighted_scores(p_job_id INTEGER)
+RETURNS void LANGUAGE sql AS $$
+    UPDATE interview_score_summary s
+       SET weighted_total = w.weighted_total,
+           weight_total = w.weight_total
+      FROM (
+        SELECT ss.interview_id,
+               sum(ss.score * COALESCE(r.weight, 1)) AS weighted_total,
+               sum(COALESCE(r.weight, 1)) AS weight_total
+          FROM "skill score" ss
+          JOIN interview i ON i.id = ss.interview_id
+          LEFT JOIN "Job_Requirements" r ON r.job_id = i.job_id AND r.skill = ss.skill
+         WHERE i.job_id = p_job_id
+         GROUP BY ss.interview_id
+      ) w
+     WHERE s.interview_id = w.interview_id;
+$$;
+
+-- Rebuild the aggregates from scratch (also backfills scores and reports written before the triggers existed)
+TRUNCATE interview_score_summary, job_skill_stats;
+SELECT apply_skill_score(interview_id, skill, score, 1) FROM "skill score" WHERE interview_id IS NOT NULL;
+SELECT apply_report_score(interview_id, overallscore)
+  FROM (SELECT DISTINCT ON (interview_id) interview_id, overallscore FROM "Report" ORDER BY interview_id, _id DESC) latest;
+
+-- Candidates of a job ranked by average skill score; reads only the job's summary rows
+CREATE OR REPLACE FUNCTION job_score_ranking(p_job_id INTEGER)
+RETURNS TABLE (interview_id INTEGER, average_score NUMERIC, rank BIGINT, percentile_rank DOUBLE PRECISION)
+LANGUAGE sql STABLE AS $$
+    SELECT s.interview_id,
+           s.average_score,
+           rank() OVER (ORDER BY s.average_score DESC),
+           percent_rank() OVER (ORDER BY s.average_score)
+      FROM interview_score_summary s
+     WHERE s.job_id = p_job_id AND s.skill_count > 0;
+$$;
+
+-- Job-level headline numbers: candidate count, mean and quartiles of the averages
+CREATE OR REPLACE FUNCTION job_score_overview(p_job_id INTEGER)
+RETURNS TABLE (candidates BIGINT, average_score NUMERIC, p25 DOUBLE PRECISION, median DOUBLE PRECISION, p75 DOUBLE PRECISION)
+LANGUAGE sql STABLE AS $$
+    SELECT count(*),
+           avg(s.average_score),
+           percentile_cont(0.25) WITHIN GROUP (ORDER BY s.average_score),
+           percentile_cont(0.5) WITHIN GROUP (ORDER BY s.average_score),
+           percentile_cont(0.75) WITHIN GROUP (ORDER BY s.average_score)
+      FROM interview_score_summary s
+     WHERE s.job_id = p_job_id AND s.skill_count > 0;
+$$;
+
+-- Persist one interview analysis atomically: the interview keeps a single
+-- report (reused on re-analysis) and its skill scores are replaced, so a
+-- retried analysis job never duplicates rows or double-counts aggregates
+CREATE OR REPLACE FUNCTION store_interview_analysis(
+    p_interview_id INTEGER,
+    p_overall_score INTEGER,
+    p_recommendation TEXT,
+    p_feedback TEXT,
+    p_transcripturl TEXT,
+    p_skill_scores JSONB
+)
+RETURNS SETOF "Report" LANGUAGE plpgsql AS $$
+DECLARE
+    v_report_id INTEGER;
+BEGIN
+    SELECT _id INTO v_report_id FROM "Report"
+     WHERE interview_id = p_interview_id ORDER BY _id DESC LIMIT 1 FOR UPDATE;
+    IF v_report_id IS NULL THEN
+        INSERT INTO "Report" (interview_id, overallscore, recommondation, feedback, transcripturl)
+        VALUES (p_interview_id, p_overall_score, p_recommendation, p_feedback, p_transcripturl)
+        RETURNING _id INTO v_report_id;
+    ELSE
+        UPDATE "Report"
+           SET overallscore = p_overall_score,
+               recommondation = p_recommendation,
+               feedback = p_feedback,
+               transcripturl = p_transcripturl
+         WHERE _id = v_report_id;
+    END IF;
+
+    DELETE FROM "skill score" WHERE interview_id = p_interview_id;
+    INSERT INTO "skill score" (skill, report_id, interview_id, score)
+    SELECT s->>'skill', v_report_id, p_interview_id, (s->>'score')::INTEGER
+      FROM jsonb_array_elements(p_skill_scores) s;
+
+    UPDATE interview SET status = 'completed' WHERE id = p_interview_id;
+
+    RETURN QUERY SELECT * FROM "Report" WHERE _id = v_report_id;
+END;
+$$;
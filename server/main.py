@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import router
@@ -10,10 +11,34 @@ from app.api.reportroute import router as report_router
 from app.api.jobskillsroute import router as jobskill_router
 from app.api.mailroutes import router as mail_router
 from app.services.websocket_service import manager
+from app.core.database import init_db, close_db
+from app.services.analysis_queue import analysis_queue
+from app.services.pipecat_service import pipecat_service
+from app.services.resume_ingestion import resume_ingestion
+from app.services.resume_parser import resume_parser
+from app.services.smtp_pool import close_pools
+from app.services.password_hasher import password_hasher
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_db()
+    await analysis_queue.start()
+    await resume_ingestion.start()
+    await pipecat_service.start()
+    yield
+    await pipecat_service.stop()
+    await resume_ingestion.stop()
+    resume_parser.shutdown()
+    await close_pools()
+    password_hasher.shutdown()
+    await analysis_queue.stop()
+    await close_db()
+
 app = FastAPI(
     title="AI Avatar Interview API",
     description="Backend API for AI-powered interview system",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -40,13 +65,13 @@ async def root():
 
 @app.websocket("/ws/pipecat")
 async def pipecat_websocket(websocket: WebSocket):
-    await manager.connect_pipecat(websocket)
+    conn = await manager.connect_pipecat(websocket)
     try:
         while True:
             data = await websocket.receive_json()
-            await manager.handle_pipecat_message(data)
+            await manager.handle_pipecat_message(data, conn.worker_id)
     except WebSocketDisconnect:
-        await manager.disconnect_pipecat()
+        await manager.disconnect_pipecat(conn)
 
 if __name__ == "__main__":
     import uvicorn
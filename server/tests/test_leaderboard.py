@@ -0,0 +1,149 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.reportroute import _decode_cursor, _encode_cursor, getLeaderboard
+from app.models.report import LeaderboardOrder
+
+
+class FakeQuery:
+    """Just enough of the PostgREST builder for the leaderboard query"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.count = None
+        self.negate = False
+        self.limit_to = None
+        self.orderings = []
+
+    def select(self, columns, count=None):
+        self.count = count
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r.get(column) == value]
+        return self
+
+    def in_(self, column, values):
+        self.rows = [r for r in self.rows if r.get(column) in values]
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def is_(self, column, value):
+        assert self.negate and value == "null"
+        self.negate = False
+        self.rows = [r for r in self.rows if r.get(column) is not None]
+        return self
+
+    def or_(self, condition):
+        column, score, _, score_again, lastid = re.fullmatch(
+            r"(\w+)\.lt\.([\d.]+),and\((\w+)\.eq\.([\d.]+),interview_id\.lt\.(\d+)\)", condition
+        ).groups()
+        score, lastid = float(score), int(lastid)
+        assert float(score_again) == score
+        self.rows = [
+            r for r in self.rows
+            if r[column] < score or (r[column] == score and r["interview_id"] < lastid)
+        ]
+        return self
+
+    def order(self, column, desc=False):
+        # Called most significant first; Python's sort is stable, so re-sort on every call
+        self.orderings.append((column, desc))
+        for name, descending in reversed(self.orderings):
+            self.rows.sort(key=lambda r: r[name], reverse=descending)
+        return self
+
+    def limit(self, n):
+        self.limit_to = n
+        return self
+
+    async def execute(self):
+        rows = [dict(r) for r in self.rows]
+        count = len(rows) if self.count else None
+        return SimpleNamespace(data=rows[:self.limit_to] if self.limit_to else rows, count=count)
+
+
+class FakeDB:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return FakeQuery([dict(r) for r in self.tables[name]]).select("*")
+
+
+def summary(interview_id, overall, weighted=None, job_id=1):
+    return {
+        "interview_id": interview_id, "job_id": job_id, "overall_score": overall,
+        "weighted_score": weighted, "average_score": overall,
+        "interview": {"candidate_id": interview_id * 10, "status": "completed",
+                      "Candidate_Info": {"name": f"C{interview_id}", "email": None}},
+    }
+
+
+def leaderboard(db, cursor=None, limit=2, order=LeaderboardOrder.overall, job=1):
+    return asyncio.run(getLeaderboard(job, order=order, limit=limit, cursor=cursor, db=db))
+
+
+def test_cursor_round_trip():
+    assert _decode_cursor(_encode_cursor(87.5, 12, 40)) == (87.5, 12, 40)
+    assert _decode_cursor(_encode_cursor(0, 1, 0)) == (0, 1, 0)
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    _encode_cursor("90", 1, 0),
+    _encode_cursor(True, 1, 0),
+    _encode_cursor(90, "x", 0),
+    "WzEsMl0=",  # [1,2]: too few fields
+])
+def test_bad_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as err:
+        _decode_cursor(cursor)
+    assert err.value.status_code == 400
+
+
+def test_pages_cover_every_candidate_once_in_rank_order():
+    rows = [summary(1, 70), summary(2, 90), summary(3, 70), summary(4, 50), summary(5, 70),
+            summary(6, None), summary(7, 99, job_id=2)]
+    db = FakeDB({"interview_score_summary": rows,
+                 "skill score": [{"skill": "SQL", "interview_id": 2, "score": 9}]})
+
+    first = leaderboard(db)
+    assert first.total == 5
+    seen = list(first.items)
+    cursor = first.next_cursor
+    while cursor:
+        page = leaderboard(db, cursor)
+        assert page.total is None
+        seen.extend(page.items)
+        cursor = page.next_cursor
+
+    # Ties on score are broken by interview_id, descending
+    assert [e.interview_id for e in seen] == [2, 5, 3, 1, 4]
+    assert [e.position for e in seen] == [1, 2, 3, 4, 5]
+    assert seen[0].name == "C2" and seen[0].candidate_id == 20
+    assert [s.skill for s in seen[0].skill_scores] == ["SQL"]
+
+
+def test_last_full_page_has_no_cursor():
+    db = FakeDB({"interview_score_summary": [summary(1, 80), summary(2, 60)], "skill score": []})
+    page = leaderboard(db, limit=2)
+    assert [e.interview_id for e in page.items] == [1, 2]
+    assert page.next_cursor is None
+
+
+def test_weighted_order_skips_unscored_rows():
+    rows = [summary(1, 90, 40.5), summary(2, 10, 80.25), summary(3, 50)]
+    db = FakeDB({"interview_score_summary": rows, "skill score": []})
+    first = leaderboard(db, limit=1, order=LeaderboardOrder.weighted)
+    second = leaderboard(db, first.next_cursor, limit=1, order=LeaderboardOrder.weighted)
+    assert [e.interview_id for e in first.items + second.items] == [2, 1]
+    assert first.total == 2 and second.next_cursor is None
@@ -0,0 +1,85 @@
+from app.services.interview_analyzer import (
+    InterviewAnalysis,
+    SentimentAnalysis,
+    SkillAssessment,
+    merge_analyses,
+)
+
+
+def analysis(score, skills, recommendation="maybe - unsure", sentiment="neutral", **extra):
+    fields = dict(
+        interview_id=0,
+        overall_score=score,
+        skill_scores=[SkillAssessment(skill=name, score=s, evidence=evidence) for name, s, evidence in skills],
+        sentiment=SentimentAnalysis(overall_sentiment=sentiment, confidence_level="medium"),
+        recommendation=recommendation,
+        feedback="Feedback",
+        key_strengths=[],
+        areas_for_improvement=[],
+        response_quality={},
+    )
+    fields.update(extra)
+    return InterviewAnalysis(**fields)
+
+
+def test_scores_are_weighted_by_window_tokens():
+    merged = merge_analyses(7, [
+        (300, analysis(90, [("Python", 90, "good")])),
+        (100, analysis(50, [("python ", 50, "weak")])),
+    ])
+    assert merged.interview_id == 7
+    assert merged.overall_score == 80
+    assert len(merged.skill_scores) == 1
+    assert merged.skill_scores[0].skill == "Python"
+    assert merged.skill_scores[0].score == 80
+    # Evidence behind the stronger score comes first
+    assert merged.skill_scores[0].evidence == "good ... weak"
+
+
+def test_skills_seen_in_one_window_keep_their_score():
+    merged = merge_analyses(1, [
+        (100, analysis(60, [("SQL", 70, "joins")])),
+        (100, analysis(80, [("React", 40, "")])),
+    ])
+    assert {s.skill: s.score for s in merged.skill_scores} == {"SQL": 70, "React": 40}
+    assert {s.skill: s.evidence for s in merged.skill_scores} == {"SQL": "joins", "React": ""}
+
+
+def test_recommendation_and_sentiment_follow_the_weighted_majority():
+    merged = merge_analyses(1, [
+        (100, analysis(70, [], "hire - strong answers", "positive")),
+        (50, analysis(40, [], "reject - shaky", "negative")),
+        (80, analysis(70, [], "Hire - solid", "positive")),
+    ])
+    # The heaviest window's reasoning is kept for the winning verdict
+    assert merged.recommendation == "hire - strong answers"
+    assert merged.sentiment.overall_sentiment == "positive"
+
+
+def test_ties_resolve_to_the_first_label_in_transcript_order():
+    merged = merge_analyses(1, [
+        (100, analysis(50, [], "reject - a", "negative")),
+        (100, analysis(50, [], "hire - b", "positive")),
+    ])
+    assert merged.recommendation == "reject - a"
+    assert merged.sentiment.overall_sentiment == "negative"
+
+
+def test_lists_are_deduplicated_and_metrics_averaged():
+    merged = merge_analyses(1, [
+        (100, analysis(50, [], key_strengths=["Clear", "Fast"], feedback="Same",
+                       response_quality={"clarity": 80, "depth": 40, "note": "n/a"})),
+        (300, analysis(50, [], key_strengths=["clear ", "Calm"], feedback="same",
+                       response_quality={"clarity": 40})),
+    ])
+    assert merged.key_strengths == ["Clear", "Fast", "Calm"]
+    assert merged.feedback == "Same"
+    assert merged.response_quality == {"clarity": 50, "depth": 40}
+
+
+def test_merge_is_deterministic():
+    parts = [
+        (120, analysis(61, [("Go", 55, "a"), ("SQL", 70, "b")], "maybe - ok")),
+        (80, analysis(74, [("sql", 90, "c")], "hire - good")),
+    ]
+    assert merge_analyses(3, parts) == merge_analyses(3, parts)
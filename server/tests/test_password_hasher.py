@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from passlib.context import CryptContext
+
+from app.services.password_hasher import HasherBusy, PasswordHasher
+
+# A cheap scheme keeps the tests fast; the pool logic is what's under test
+FAST = dict(schemes=["sha256_crypt"], sha256_crypt__rounds=1000)
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    hasher.context = CryptContext(**FAST)
+    yield hasher
+    hasher.shutdown()
+
+
+def test_calls_past_max_pending_fail_fast(hasher):
+    async def run():
+        first = asyncio.ensure_future(hasher.hash("one"))
+        await asyncio.sleep(0)
+        with pytest.raises(HasherBusy):
+            await hasher.hash("two")
+        return await first
+
+    assert hasher.context.verify("one", asyncio.run(run()))
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["pending"] == 0
+
+
+def test_hash_many_backs_off_instead_of_failing(hasher):
+    async def run():
+        # An interactive call holds the only slot when the batch starts
+        interactive = asyncio.ensure_future(hasher.hash("login"))
+        await asyncio.sleep(0)
+        hashes = await hasher.hash_many(["a", "b", "c"])
+        return await interactive, hashes
+
+    login, hashes = asyncio.run(run())
+    assert hasher.context.verify("login", login)
+    assert [hasher.context.verify(p, h) for p, h in zip("abc", hashes)] == [True, True, True]
+    stats = hasher.stats()
+    assert stats["rejected"] >= 1
+    assert stats["hash"]["count"] == 4
+    assert stats["pending"] == 0
+
+
+def test_hash_many_leaves_room_for_interactive_calls():
+    hasher = PasswordHasher(workers=2, max_pending=3)
+    hasher.context = CryptContext(**FAST)
+    peak = 0
+    hash_one = hasher.context.hash
+
+    def tracked(password):
+        nonlocal peak
+        peak = max(peak, hasher._pending)
+        return hash_one(password)
+
+    hasher.context.hash = tracked
+
+    async def run():
+        batch = asyncio.ensure_future(hasher.hash_many([str(i) for i in range(10)]))
+        await asyncio.sleep(0)
+        # Only `workers` batch hashes are queued, so this one is admitted
+        await hasher.hash("interactive")
+        return await batch
+
+    try:
+        assert len(asyncio.run(run())) == 10
+    finally:
+        hasher.shutdown()
+    assert peak <= hasher.max_pending
+    assert hasher.stats()["rejected"] == 0
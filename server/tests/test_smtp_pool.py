@@ -0,0 +1,98 @@
+import asyncio
+from email.mime.text import MIMEText
+
+import aiosmtplib
+import pytest
+
+from app.services.smtp_pool import SMTPPool
+from app.services.smtp_sink import SMTPSink
+
+
+def message(i=0):
+    msg = MIMEText(f"<p>Invite {i}</p>", "html")
+    msg["From"] = "test@localhost"
+    msg["To"] = f"candidate{i}@localhost"
+    msg["Subject"] = "TalentLoop - Interview Invite"
+    return msg
+
+
+def run(scenario, failures=(), **pool_options):
+    """Run scenario(pool, sink) against a fresh sink; returns (result, sink)"""
+    async def main():
+        sink = SMTPSink(port=0)
+        sink.failures.extend(failures)
+        await sink.start()
+        options = dict(start_tls=False, size=2, max_attempts=3, retry_delay=0.01, timeout=5)
+        options.update(pool_options)
+        pool = SMTPPool("127.0.0.1", sink.port, **options)
+        try:
+            return await scenario(pool, sink), sink
+        finally:
+            await pool.close()
+            await sink.stop()
+
+    return asyncio.run(main())
+
+
+def test_connections_are_reused():
+    async def scenario(pool, sink):
+        for i in range(5):
+            await pool.send(message(i))
+
+    _, sink = run(scenario)
+    assert sink.messages == 5
+    assert sink.connections == 1
+
+
+def test_dropped_connection_is_reopened_and_retried():
+    async def scenario(pool, sink):
+        await pool.send(message())
+        return len(pool._all)
+
+    open_connections, sink = run(scenario, failures=[None])
+    assert sink.messages == 1
+    assert sink.connections == 2
+    assert open_connections == 1
+
+
+def test_transient_reply_is_retried_on_the_same_connection():
+    async def scenario(pool, sink):
+        await pool.send(message())
+
+    _, sink = run(scenario, failures=["451 Try again later"])
+    assert sink.messages == 1
+    assert sink.connections == 1
+
+
+def test_permanent_reply_is_not_retried():
+    async def scenario(pool, sink):
+        with pytest.raises(aiosmtplib.SMTPResponseException) as err:
+            await pool.send(message())
+        assert err.value.code == 554
+        # The connection stays usable for the next message
+        await pool.send(message(1))
+
+    _, sink = run(scenario, failures=["554 Rejected"])
+    assert sink.messages == 1
+    assert sink.connections == 1
+
+
+def test_gives_up_after_max_attempts():
+    async def scenario(pool, sink):
+        with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+            await pool.send(message())
+        return len(pool._all)
+
+    open_connections, sink = run(scenario, failures=[None, None], max_attempts=2)
+    assert sink.messages == 0
+    assert sink.connections == 2
+    assert open_connections == 0
+
+
+def test_concurrent_sends_stay_within_pool_size():
+    async def scenario(pool, sink):
+        await asyncio.gather(*(pool.send(message(i)) for i in range(20)))
+
+    _, sink = run(scenario, size=3)
+    assert sink.messages == 20
+    assert sink.connections <= 3